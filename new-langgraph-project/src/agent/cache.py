@@ -0,0 +1,402 @@
+"""In-process response cache for upstream fetches.
+
+Entries are keyed by normalized URL + params and live for a per-endpoint
+TTL. Once expired, an entry is still served for a short stale window while a
+single background refresh runs. Concurrent misses for the same key share one
+upstream call (single-flight).
+
+``ValidatorStore`` remembers ETag / Last-Modified per key together with the
+normalized result, so fetchers can send conditional requests and reuse the
+previous result on ``304 Not Modified``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Mapping, Optional, Set, Tuple, cast
+from urllib.parse import urlencode, urlsplit
+
+from agent.config import Settings
+
+log = logging.getLogger(__name__)
+
+# Params that identify the caller rather than the resource.
+_CREDENTIAL_PARAMS = frozenset({"apikey", "api_key", "key", "token"})
+
+
+def normalize_key(url: str, params: Optional[Mapping[str, Any]] = None) -> str:
+    """Build a stable cache key from ``url`` and ``params``.
+
+    Scheme and host are lowercased, params are sorted and credentials are
+    dropped so that equivalent requests share one entry.
+    """
+    parts = urlsplit(url)
+    base = f"{parts.scheme.lower()}://{parts.netloc.lower()}{parts.path}"
+    items = sorted(
+        (str(k), str(v))
+        for k, v in (params or {}).items()
+        if str(k).lower() not in _CREDENTIAL_PARAMS
+    )
+    return f"{base}?{urlencode(items)}" if items else base
+
+
+@dataclass
+class _Entry:
+    value: Any
+    expires_at: float
+    stale_until: float
+
+
+class _Flight:
+    """A sync fetch in progress that other threads can wait on."""
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class ResponseCache:
+    """Bounded LRU cache with per-endpoint TTL and stale-while-revalidate.
+
+    Cached values are shared between callers and must be treated as
+    read-only.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_entries: int = 512,
+        ttls: Optional[Mapping[str, float]] = None,
+        default_ttl_s: float = 30.0,
+        stale_s: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Hold up to ``max_entries``; ``ttls`` maps endpoints to seconds fresh.
+
+        Expired entries are still served for ``stale_s`` while a refresh runs.
+        """
+        self.max_entries = max_entries
+        self.ttls: Dict[str, float] = dict(ttls or {})
+        self.default_ttl_s = default_ttl_s
+        self.stale_s = stale_s
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._flights: Dict[str, _Flight] = {}
+        self._aflights: Dict[Tuple[int, str], asyncio.Future[Any]] = {}
+        self._tasks: Set[asyncio.Task[Any]] = set()
+        self._stats: Dict[str, int] = {
+            "hits": 0,
+            "stale_hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "evictions": 0,
+            "refreshes": 0,
+            "refresh_errors": 0,
+        }
+
+    # ---- bookkeeping ----
+    def stats(self) -> Dict[str, int]:
+        """Return a snapshot of the hit/miss/evict counters and current size."""
+        with self._lock:
+            out = dict(self._stats)
+            out["size"] = len(self._entries)
+        return out
+
+    def clear(self) -> None:
+        """Drop every entry; counters are kept."""
+        with self._lock:
+            self._entries.clear()
+
+    def _lookup(self, key: str) -> Tuple[Optional[_Entry], bool]:
+        """Return ``(entry, fresh)`` and count the hit; caller holds the lock."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None, False
+        now = self._clock()
+        if now < entry.expires_at:
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return entry, True
+        if now < entry.stale_until:
+            self._entries.move_to_end(key)
+            self._stats["stale_hits"] += 1
+            return entry, False
+        del self._entries[key]
+        return None, False
+
+    def _store(self, endpoint: str, key: str, value: Any) -> None:
+        ttl = self.ttls.get(endpoint, self.default_ttl_s)
+        now = self._clock()
+        with self._lock:
+            self._entries[key] = _Entry(value, now + ttl, now + ttl + self.stale_s)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    # ---- sync API ----
+    def get_or_fetch(self, endpoint: str, key: str, fetch: Callable[[], Any]) -> Any:
+        """Return the cached value for ``key`` or call ``fetch`` once to fill it."""
+        with self._lock:
+            entry, fresh = self._lookup(key)
+            if entry is not None:
+                if not fresh and key not in self._flights:
+                    self._flights[key] = _Flight()
+                    self._stats["refreshes"] += 1
+                    threading.Thread(
+                        target=self._refresh, args=(endpoint, key, fetch), daemon=True
+                    ).start()
+                return entry.value
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+                self._stats["misses"] += 1
+            else:
+                self._stats["coalesced"] += 1
+        assert flight is not None
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+        try:
+            flight.value = fetch()
+            self._store(endpoint, key, flight.value)
+            return flight.value
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.done.set()
+
+    def _refresh(self, endpoint: str, key: str, fetch: Callable[[], Any]) -> None:
+        flight = self._flights[key]
+        try:
+            flight.value = fetch()
+            self._store(endpoint, key, flight.value)
+        except Exception as e:
+            flight.error = e
+            with self._lock:
+                self._stats["refresh_errors"] += 1
+            log.warning("cache_refresh_failed", extra={"key": key, "error": str(e)})
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.done.set()
+
+    # ---- async API ----
+    async def aget_or_fetch(
+        self, endpoint: str, key: str, fetch: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """Async counterpart of ``get_or_fetch`` for coroutine fetchers."""
+        loop = asyncio.get_running_loop()
+        fkey = (id(loop), key)
+        with self._lock:
+            entry, fresh = self._lookup(key)
+            if entry is not None:
+                if not fresh and fkey not in self._aflights:
+                    self._aflights[fkey] = loop.create_future()
+                    self._stats["refreshes"] += 1
+                    task = loop.create_task(self._arefresh(endpoint, fkey, fetch))
+                    self._tasks.add(task)
+                    task.add_done_callback(self._tasks.discard)
+                return entry.value
+            fut = self._aflights.get(fkey)
+            leader = fut is None
+            if leader:
+                fut = self._aflights[fkey] = loop.create_future()
+                self._stats["misses"] += 1
+            else:
+                self._stats["coalesced"] += 1
+        assert fut is not None
+        if not leader:
+            try:
+                return await asyncio.shield(fut)
+            except asyncio.CancelledError:
+                current = asyncio.current_task()
+                if not fut.cancelled() or (
+                    current is not None and getattr(current, "cancelling", lambda: 0)()
+                ):
+                    raise  # this waiter itself was cancelled
+            # The leader was cancelled, not this caller: retry (and possibly lead).
+            return await self.aget_or_fetch(endpoint, key, fetch)
+        try:
+            value = await fetch()
+            self._store(endpoint, key, value)
+            fut.set_result(value)
+            return value
+        except asyncio.CancelledError:
+            fut.cancel()
+            raise
+        except BaseException as e:
+            fut.set_exception(e)
+            # Retrieve it so an unobserved failure does not warn on GC.
+            fut.exception()
+            raise
+        finally:
+            with self._lock:
+                self._aflights.pop(fkey, None)
+
+    async def _arefresh(
+        self, endpoint: str, fkey: Tuple[int, str], fetch: Callable[[], Awaitable[Any]]
+    ) -> None:
+        fut = self._aflights[fkey]
+        try:
+            value = await fetch()
+            self._store(endpoint, fkey[1], value)
+            fut.set_result(value)
+        except Exception as e:
+            fut.set_exception(e)
+            fut.exception()
+            with self._lock:
+                self._stats["refresh_errors"] += 1
+            log.warning("cache_refresh_failed", extra={"key": fkey[1], "error": str(e)})
+        finally:
+            with self._lock:
+                self._aflights.pop(fkey, None)
+            if not fut.done():
+                # Cancelled mid-refresh: waiters see a cancelled flight and retry.
+                fut.cancel()
+
+
+@dataclass
+class _Validated:
+    etag: Optional[str]
+    last_modified: Optional[str]
+    value: Any
+
+
+class ValidatorStore:
+    """Bounded LRU of HTTP validators and the results they validate."""
+
+    def __init__(self, max_entries: int = 256) -> None:
+        """Remember validators for at most ``max_entries`` keys."""
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, _Validated] = OrderedDict()
+        self._stats: Dict[str, int] = {"conditional": 0, "not_modified": 0, "stored": 0}
+
+    def headers(self, key: str) -> Dict[str, str]:
+        """Return the conditional request headers for ``key`` (may be empty)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return {}
+            self._stats["conditional"] += 1
+        out: Dict[str, str] = {}
+        if entry.etag:
+            out["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            out["If-Modified-Since"] = entry.last_modified
+        return out
+
+    def not_modified(self, key: str) -> Tuple[bool, Any]:
+        """Return ``(found, value)`` for a 304 response on ``key``."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+            self._entries.move_to_end(key)
+            self._stats["not_modified"] += 1
+            return True, entry.value
+
+    def remember(self, key: str, headers: Mapping[str, str], value: Any) -> None:
+        """Store ``value`` under the validators found in response ``headers``."""
+        etag = headers.get("etag")
+        last_modified = headers.get("last-modified")
+        with self._lock:
+            if not etag and not last_modified:
+                self._entries.pop(key, None)
+                return
+            self._entries[key] = _Validated(etag, last_modified, value)
+            self._entries.move_to_end(key)
+            self._stats["stored"] += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, int]:
+        """Return conditional-request counters and current size."""
+        with self._lock:
+            out = dict(self._stats)
+            out["size"] = len(self._entries)
+        return out
+
+
+def cache_from_settings(cfg: Settings) -> Optional[ResponseCache]:
+    """Build the response cache described by ``cfg``; ``None`` when disabled."""
+    if not cfg.cache_enabled:
+        return None
+    return ResponseCache(
+        max_entries=cfg.cache_max_entries,
+        ttls={
+            "odds_events": cfg.cache_ttl_events_s,
+            "odds_markets": cfg.cache_ttl_markets_s,
+            "espn_scoreboard": cfg.cache_ttl_scoreboard_s,
+        },
+        stale_s=cfg.cache_stale_s,
+    )
+
+
+_UNSET: Any = object()
+_cache: Any = _UNSET
+_validators: Any = _UNSET
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> Optional[ResponseCache]:
+    """Return the process-wide response cache, creating it from ``Settings``."""
+    global _cache
+    if _cache is _UNSET:
+        with _cache_lock:
+            if _cache is _UNSET:
+                _cache = cache_from_settings(Settings.load())
+    return cast(Optional[ResponseCache], _cache)
+
+
+def configure_cache(cache: Optional[ResponseCache] = _UNSET) -> Optional[ResponseCache]:
+    """Install ``cache`` process-wide (``None`` disables caching).
+
+    Called without arguments, the cache is rebuilt from ``Settings`` on next use.
+    """
+    global _cache
+    with _cache_lock:
+        _cache = cache
+    return None if cache is _UNSET else cache
+
+
+def get_validators() -> Optional[ValidatorStore]:
+    """Return the process-wide validator store; ``None`` when disabled."""
+    global _validators
+    if _validators is _UNSET:
+        with _cache_lock:
+            if _validators is _UNSET:
+                cfg = Settings.load()
+                _validators = (
+                    ValidatorStore(cfg.validator_max_entries)
+                    if cfg.conditional_requests
+                    else None
+                )
+    return cast(Optional[ValidatorStore], _validators)
+
+
+def configure_validators(
+    store: Optional[ValidatorStore] = _UNSET,
+) -> Optional[ValidatorStore]:
+    """Install ``store`` process-wide (``None`` disables conditional requests)."""
+    global _validators
+    with _cache_lock:
+        _validators = store
+    return None if store is _UNSET else store
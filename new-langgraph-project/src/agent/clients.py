@@ -0,0 +1,184 @@
+"""Shared, pooled HTTP clients for upstream APIs.
+
+One ``httpx.Client`` is kept per upstream host so keep-alive connections are
+reused across calls instead of paying TCP/TLS setup on every fetch. Async
+clients are pooled the same way, per host and per running event loop.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import atexit
+import threading
+import weakref
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from agent.config import Settings
+
+try:
+    import h2  # type: ignore  # noqa: F401
+
+    _HAS_H2 = True
+except Exception:  # pragma: no cover - optional dependency
+    _HAS_H2 = False
+
+
+def _host_key(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}".lower()
+
+
+class ClientRegistry:
+    """Lazily create and cache one pooled client per upstream host.
+
+    Pool limits, keep-alive expiry and HTTP/2 come from ``Settings``; the
+    settings are read on first use so importing this module stays cheap.
+    """
+
+    def __init__(
+        self,
+        settings: Optional[Settings] = None,
+        *,
+        transport: Optional[httpx.BaseTransport] = None,
+        async_transport: Optional[httpx.AsyncBaseTransport] = None,
+    ) -> None:
+        """Use ``settings`` (default: loaded on first use) and optional test transports."""
+        self._settings = settings
+        self._transport = transport
+        self._async_transport = async_transport
+        self._lock = threading.Lock()
+        self._clients: Dict[str, httpx.Client] = {}
+        # AsyncClient connections are bound to the loop that opened them.
+        self._async_clients: weakref.WeakKeyDictionary[
+            asyncio.AbstractEventLoop, Dict[str, httpx.AsyncClient]
+        ] = weakref.WeakKeyDictionary()
+
+    @property
+    def settings(self) -> Settings:
+        """Settings used to build new clients."""
+        if self._settings is None:
+            self._settings = Settings.load()
+        return self._settings
+
+    def _client_kwargs(self) -> Dict[str, Any]:
+        cfg = self.settings
+        limits = httpx.Limits(
+            max_connections=cfg.http_max_connections,
+            max_keepalive_connections=cfg.http_max_keepalive,
+            keepalive_expiry=cfg.http_keepalive_expiry_s,
+        )
+        return {
+            "timeout": cfg.http_timeout_s,
+            "limits": limits,
+            "http2": cfg.http2 and _HAS_H2,
+        }
+
+    def _new_client(self) -> httpx.Client:
+        return httpx.Client(transport=self._transport, **self._client_kwargs())
+
+    def _new_async_client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            transport=self._async_transport, **self._client_kwargs()
+        )
+
+    def get(self, url: str) -> httpx.Client:
+        """Return the shared client for the host of ``url``."""
+        key = _host_key(url)
+        client = self._clients.get(key)
+        if client is not None and not client.is_closed:
+            return client
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None or client.is_closed:
+                client = self._new_client()
+                self._clients[key] = client
+            return client
+
+    def get_async(self, url: str) -> httpx.AsyncClient:
+        """Return the shared async client for ``url``'s host on the running loop."""
+        loop = asyncio.get_running_loop()
+        key = _host_key(url)
+        with self._lock:
+            per_loop = self._async_clients.get(loop)
+            if per_loop is None:
+                per_loop = self._async_clients[loop] = {}
+            client = per_loop.get(key)
+            if client is None or client.is_closed:
+                client = per_loop[key] = self._new_async_client()
+            return client
+
+    def close(self) -> None:
+        """Close every pooled client; later calls to ``get`` reopen lazily.
+
+        Async clients are dropped rather than awaited; use ``aclose`` from
+        inside the loop for a graceful shutdown of those.
+        """
+        with self._lock:
+            clients = list(self._clients.values())
+            self._clients.clear()
+            self._async_clients.clear()
+        for client in clients:
+            try:
+                client.close()
+            except Exception:  # pragma: no cover - best effort on shutdown
+                pass
+
+    async def aclose(self) -> None:
+        """Close the async clients owned by the running loop."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            per_loop = self._async_clients.pop(loop, None) or {}
+        for client in per_loop.values():
+            try:
+                await client.aclose()
+            except Exception:  # pragma: no cover - best effort on shutdown
+                pass
+
+
+_registry = ClientRegistry()
+_registry_lock = threading.Lock()
+
+
+def get_client(url: str) -> httpx.Client:
+    """Return the process-wide pooled client for ``url``'s host."""
+    return _registry.get(url)
+
+
+def get_async_client(url: str) -> httpx.AsyncClient:
+    """Return the pooled async client for ``url``'s host on the running loop."""
+    return _registry.get_async(url)
+
+
+def configure_clients(
+    settings: Optional[Settings] = None,
+    *,
+    transport: Optional[httpx.BaseTransport] = None,
+    async_transport: Optional[httpx.AsyncBaseTransport] = None,
+) -> ClientRegistry:
+    """Replace the process-wide registry, closing the previous clients."""
+    global _registry
+    with _registry_lock:
+        old, _registry = (
+            _registry,
+            ClientRegistry(
+                settings, transport=transport, async_transport=async_transport
+            ),
+        )
+    old.close()
+    return _registry
+
+
+def close_clients() -> None:
+    """Close all pooled clients. Registered with ``atexit``."""
+    _registry.close()
+
+
+async def aclose_clients() -> None:
+    """Close the pooled async clients of the running loop."""
+    await _registry.aclose()
+
+
+atexit.register(close_clients)
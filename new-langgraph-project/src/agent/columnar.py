@@ -0,0 +1,235 @@
+"""Columnar representation of normalized odds markets.
+
+``fetch_odds_markets`` returns bookmaker -> market -> outcomes as nested dicts.
+``ColumnarMarkets`` stores one row per outcome in parallel typed arrays with
+interned string tables, which is several times smaller and lets cross-book
+comparisons run as single passes over flat arrays.
+
+Prices are decimal odds (The Odds API default), so ``1 / price`` is the
+implied probability.
+"""
+
+from __future__ import annotations
+
+import math
+import sys
+from array import array
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+_NAN = float("nan")
+
+
+class StringTable:
+    """Append-only table mapping interned strings to dense indices."""
+
+    def __init__(self, values: Optional[List[str]] = None) -> None:
+        """Start with ``values`` interned in order."""
+        self.values: List[str] = []
+        self._index: Dict[str, int] = {}
+        for v in values or []:
+            self.add(v)
+
+    def add(self, value: Optional[str]) -> int:
+        """Return the index of ``value``, adding it if needed."""
+        key = sys.intern(value if value is not None else "")
+        idx = self._index.get(key)
+        if idx is None:
+            idx = self._index[key] = len(self.values)
+            self.values.append(key)
+        return idx
+
+    def __getitem__(self, idx: int) -> str:
+        """Return the string at ``idx``."""
+        return self.values[idx]
+
+    def __len__(self) -> int:
+        """Return the number of distinct strings."""
+        return len(self.values)
+
+
+@dataclass
+class ColumnarMarkets:
+    """One row per outcome: bookmaker/market/name indices plus price and point.
+
+    ``point`` is NaN where the outcome has no line (for example h2h).
+    """
+
+    event_id: Optional[str] = None
+    sport_key: Optional[str] = None
+    bookmakers: StringTable = field(default_factory=StringTable)
+    markets: StringTable = field(default_factory=StringTable)
+    names: StringTable = field(default_factory=StringTable)
+    book_idx: array[int] = field(default_factory=lambda: array("i"))
+    market_idx: array[int] = field(default_factory=lambda: array("i"))
+    name_idx: array[int] = field(default_factory=lambda: array("i"))
+    price: array[float] = field(default_factory=lambda: array("d"))
+    point: array[float] = field(default_factory=lambda: array("d"))
+
+    def __len__(self) -> int:
+        """Return the number of outcome rows."""
+        return len(self.price)
+
+    # ---- conversion ----
+    def append(
+        self,
+        bookmaker: Optional[str],
+        market: Optional[str],
+        name: Optional[str],
+        price: Optional[float],
+        point: Optional[float],
+    ) -> None:
+        """Append a single outcome row."""
+        self.book_idx.append(self.bookmakers.add(bookmaker))
+        self.market_idx.append(self.markets.add(market))
+        self.name_idx.append(self.names.add(name))
+        self.price.append(_NAN if price is None else float(price))
+        self.point.append(_NAN if point is None else float(point))
+
+    @classmethod
+    def from_markets(cls, data: Dict[str, Any]) -> ColumnarMarkets:
+        """Build from the dict shape returned by ``fetch_odds_markets``."""
+        out = cls(event_id=data.get("event_id"), sport_key=data.get("sport_key"))
+        for mk in data.get("markets", []) or []:
+            for o in mk.get("outcomes", []) or []:
+                out.append(
+                    mk.get("bookmaker"),
+                    mk.get("market"),
+                    o.get("name"),
+                    o.get("price"),
+                    o.get("point"),
+                )
+        return out
+
+    def to_markets(self) -> Dict[str, Any]:
+        """Rebuild the dict shape returned by ``fetch_odds_markets``."""
+        out_markets: List[Dict[str, Any]] = []
+        current: Optional[Tuple[int, int]] = None
+        for i in range(len(self.price)):
+            group = (self.book_idx[i], self.market_idx[i])
+            if group != current:
+                current = group
+                out_markets.append(
+                    {
+                        "bookmaker": self.bookmakers[group[0]] or None,
+                        "market": self.markets[group[1]] or None,
+                        "outcomes": [],
+                    }
+                )
+            price, point = self.price[i], self.point[i]
+            out_markets[-1]["outcomes"].append(
+                {
+                    "name": self.names[self.name_idx[i]] or None,
+                    "price": None if math.isnan(price) else price,
+                    "point": None if math.isnan(point) else point,
+                }
+            )
+        return {
+            "event_id": self.event_id,
+            "sport_key": self.sport_key,
+            "markets": out_markets,
+        }
+
+    def to_json(self) -> Dict[str, Any]:
+        """Return a JSON-serializable columnar dict (NaN encoded as ``None``)."""
+
+        def _floats(values: array[float]) -> List[Optional[float]]:
+            return [None if math.isnan(v) else v for v in values]
+
+        return {
+            "format": "columnar",
+            "event_id": self.event_id,
+            "sport_key": self.sport_key,
+            "bookmakers": list(self.bookmakers.values),
+            "markets": list(self.markets.values),
+            "names": list(self.names.values),
+            "book_idx": self.book_idx.tolist(),
+            "market_idx": self.market_idx.tolist(),
+            "name_idx": self.name_idx.tolist(),
+            "price": _floats(self.price),
+            "point": _floats(self.point),
+        }
+
+    @classmethod
+    def from_json(cls, data: Dict[str, Any]) -> ColumnarMarkets:
+        """Inverse of ``to_json``."""
+
+        def _floats(values: List[Optional[float]]) -> array[float]:
+            return array("d", (_NAN if v is None else v for v in values))
+
+        return cls(
+            event_id=data.get("event_id"),
+            sport_key=data.get("sport_key"),
+            bookmakers=StringTable(data.get("bookmakers")),
+            markets=StringTable(data.get("markets")),
+            names=StringTable(data.get("names")),
+            book_idx=array("i", data.get("book_idx", [])),
+            market_idx=array("i", data.get("market_idx", [])),
+            name_idx=array("i", data.get("name_idx", [])),
+            price=_floats(data.get("price", [])),
+            point=_floats(data.get("point", [])),
+        )
+
+    # ---- analytics ----
+    def best_prices(self) -> List[Dict[str, Any]]:
+        """Return the best (highest) price per market/outcome/line across books."""
+        best: Dict[Tuple[int, int, Optional[float]], int] = {}
+        price, point = self.price, self.point
+        for i in range(len(price)):
+            p = price[i]
+            if math.isnan(p):
+                continue
+            line = point[i]
+            key = (
+                self.market_idx[i],
+                self.name_idx[i],
+                None if math.isnan(line) else line,
+            )
+            j = best.get(key)
+            if j is None or p > price[j]:
+                best[key] = i
+        return [
+            {
+                "market": self.markets[m],
+                "name": self.names[n],
+                "point": None if math.isnan(point[i]) else point[i],
+                "price": price[i],
+                "bookmaker": self.bookmakers[self.book_idx[i]],
+            }
+            for (m, n, _), i in best.items()
+        ]
+
+    def _book_market_sums(self) -> Dict[Tuple[int, int], float]:
+        sums: Dict[Tuple[int, int], float] = {}
+        price = self.price
+        for i in range(len(price)):
+            p = price[i]
+            if p > 0:
+                key = (self.book_idx[i], self.market_idx[i])
+                sums[key] = sums.get(key, 0.0) + 1.0 / p
+        return sums
+
+    def implied_probabilities(self, *, remove_vig: bool = True) -> array[float]:
+        """Return per-row implied probability, optionally normalized per book/market."""
+        sums = self._book_market_sums() if remove_vig else {}
+        out = array("d", bytes(8 * len(self.price)))
+        for i, p in enumerate(self.price):
+            if not p > 0:
+                out[i] = _NAN
+                continue
+            raw = 1.0 / p
+            if remove_vig:
+                raw /= sums[(self.book_idx[i], self.market_idx[i])]
+            out[i] = raw
+        return out
+
+    def overround(self) -> List[Dict[str, Any]]:
+        """Return the bookmaker margin (sum of implied probabilities - 1) per book/market."""
+        return [
+            {
+                "bookmaker": self.bookmakers[b],
+                "market": self.markets[m],
+                "overround": total - 1.0,
+            }
+            for (b, m), total in self._book_market_sums().items()
+        ]
@@ -28,6 +28,84 @@ class Settings:
     http_timeout_s: float
     http_retries: int
 
+    # Upstream base URLs (point at local stand-ins for offline benchmarks)
+    odds_api_base: str = "https://api.the-odds-api.com/v4"
+    espn_api_base: str = "https://site.api.espn.com/apis/site/v2/sports"
+
+    # Connection pooling (shared clients in agent.clients)
+    http_max_connections: int = 20
+    http_max_keepalive: int = 10
+    http_keepalive_expiry_s: float = 30.0
+    http2: bool = False
+
+    # Retry policy and circuit breaker (agent.retry)
+    http_backoff_base_s: float = 0.25
+    http_backoff_max_s: float = 8.0
+    http_retry_after_max_s: float = 60.0
+    breaker_failure_threshold: int = 5
+    breaker_reset_s: float = 30.0
+
+    # Response cache (agent.cache)
+    cache_enabled: bool = True
+    cache_max_entries: int = 512
+    cache_ttl_events_s: float = 60.0
+    cache_ttl_markets_s: float = 15.0
+    cache_ttl_scoreboard_s: float = 10.0
+    cache_stale_s: float = 30.0
+    conditional_requests: bool = True
+    validator_max_entries: int = 256
+
+    # Batched markets fan-out
+    odds_batch_concurrency: int = 8
+
+    # The Odds API pacing (agent.ratelimit)
+    odds_rate_per_s: float = 5.0
+    odds_burst: int = 10
+    odds_quota_slow_below: int = 100
+    odds_quota_reserve: int = 20
+
+    # Line-movement snapshots (agent.snapshots); disabled when unset
+    snapshot_db_path: Optional[str] = None
+
+    # Note store behind the mem0 graphs (agent.notes)
+    notes_backend: str = "sqlite"
+    notes_db_path: Optional[str] = None
+
+    # In-process metrics (agent.metrics)
+    metrics_enabled: bool = True
+
+    # Opt-in profiling of graph nodes (agent.profiling)
+    profile_mode: str = ""  # cprofile | sample; empty disables
+    profile_nodes: str = ""  # comma separated node names; empty means all
+    profile_rate: float = 1.0
+    profile_interval_ms: float = 5.0
+    profile_dir: Optional[str] = None
+
+    # JSON logging (agent.logs)
+    log_queue: bool = True
+    log_queue_size: int = 10000
+    log_drop_policy: str = "drop_new"  # drop_new | drop_oldest | block
+    log_sampling: bool = True
+    log_sample_burst: int = 10
+    log_sample_rate: float = 0.0
+    log_sample_window_s: float = 10.0
+    log_sample_keys: str = "url"
+
+    # Dashboard log-file catalog (agent.logfiles)
+    log_catalog_roots: str = ""  # os.pathsep separated; empty means the repository root
+    log_catalog_exclude: str = ""  # os.pathsep separated directories to skip
+    log_catalog_ttl_s: float = 5.0
+    log_catalog_max_files: int = 500
+
+    # Dashboard console job output (agent.console)
+    console_log_max_bytes: int = 10 * 1024 * 1024
+    console_log_backups: int = 3
+    console_keep_jobs: int = 200  # per-job log files kept
+    console_buffer_max_bytes: int = 8 * 1024 * 1024  # in-memory output across all jobs
+    console_buffer_lines: int = 5000  # per job
+    console_keep_finished: int = 20  # finished jobs kept in memory
+    process_registry_debounce_s: float = 0.5
+
     @staticmethod
     def load() -> "Settings":
         def getenv_bool(name: str, default: bool = False) -> bool:
@@ -45,5 +123,57 @@ class Settings:
             langchain_tracing_v2=getenv_bool("LANGCHAIN_TRACING_V2", False),
             http_timeout_s=float(os.getenv("HTTP_TIMEOUT_S", "20")),
             http_retries=int(os.getenv("HTTP_RETRIES", "2")),
+            odds_api_base=os.getenv("ODDS_API_BASE", "https://api.the-odds-api.com/v4").rstrip("/"),
+            espn_api_base=os.getenv("ESPN_API_BASE", "https://site.api.espn.com/apis/site/v2/sports").rstrip("/"),
+            http_max_connections=int(os.getenv("HTTP_MAX_CONNECTIONS", "20")),
+            http_max_keepalive=int(os.getenv("HTTP_MAX_KEEPALIVE", "10")),
+            http_keepalive_expiry_s=float(os.getenv("HTTP_KEEPALIVE_EXPIRY_S", "30")),
+            http2=getenv_bool("HTTP2", False),
+            http_backoff_base_s=float(os.getenv("HTTP_BACKOFF_BASE_S", "0.25")),
+            http_backoff_max_s=float(os.getenv("HTTP_BACKOFF_MAX_S", "8")),
+            http_retry_after_max_s=float(os.getenv("HTTP_RETRY_AFTER_MAX_S", "60")),
+            breaker_failure_threshold=int(os.getenv("BREAKER_FAILURE_THRESHOLD", "5")),
+            breaker_reset_s=float(os.getenv("BREAKER_RESET_S", "30")),
+            cache_enabled=getenv_bool("CACHE_ENABLED", True),
+            cache_max_entries=int(os.getenv("CACHE_MAX_ENTRIES", "512")),
+            cache_ttl_events_s=float(os.getenv("CACHE_TTL_EVENTS_S", "60")),
+            cache_ttl_markets_s=float(os.getenv("CACHE_TTL_MARKETS_S", "15")),
+            cache_ttl_scoreboard_s=float(os.getenv("CACHE_TTL_SCOREBOARD_S", "10")),
+            cache_stale_s=float(os.getenv("CACHE_STALE_S", "30")),
+            conditional_requests=getenv_bool("HTTP_CONDITIONAL_REQUESTS", True),
+            validator_max_entries=int(os.getenv("HTTP_VALIDATOR_MAX_ENTRIES", "256")),
+            odds_batch_concurrency=int(os.getenv("ODDS_BATCH_CONCURRENCY", "8")),
+            odds_rate_per_s=float(os.getenv("ODDS_RATE_PER_S", "5")),
+            odds_burst=int(os.getenv("ODDS_BURST", "10")),
+            odds_quota_slow_below=int(os.getenv("ODDS_QUOTA_SLOW_BELOW", "100")),
+            odds_quota_reserve=int(os.getenv("ODDS_QUOTA_RESERVE", "20")),
+            snapshot_db_path=os.getenv("SNAPSHOT_DB_PATH") or None,
+            notes_backend=os.getenv("NOTES_BACKEND", "sqlite").strip().lower(),
+            notes_db_path=os.getenv("NOTES_DB_PATH") or None,
+            metrics_enabled=getenv_bool("METRICS_ENABLED", True),
+            profile_mode=os.getenv("PROFILE_MODE", "").strip().lower(),
+            profile_nodes=os.getenv("PROFILE_NODES", ""),
+            profile_rate=float(os.getenv("PROFILE_RATE", "1")),
+            profile_interval_ms=float(os.getenv("PROFILE_INTERVAL_MS", "5")),
+            profile_dir=os.getenv("PROFILE_DIR") or None,
+            log_queue=getenv_bool("LOG_QUEUE", True),
+            log_queue_size=int(os.getenv("LOG_QUEUE_SIZE", "10000")),
+            log_drop_policy=os.getenv("LOG_DROP_POLICY", "drop_new").strip().lower(),
+            log_sampling=getenv_bool("LOG_SAMPLING", True),
+            log_sample_burst=int(os.getenv("LOG_SAMPLE_BURST", "10")),
+            log_sample_rate=float(os.getenv("LOG_SAMPLE_RATE", "0")),
+            log_sample_window_s=float(os.getenv("LOG_SAMPLE_WINDOW_S", "10")),
+            log_sample_keys=os.getenv("LOG_SAMPLE_KEYS", "url"),
+            log_catalog_roots=os.getenv("LOG_CATALOG_ROOTS", ""),
+            log_catalog_exclude=os.getenv("LOG_CATALOG_EXCLUDE", ""),
+            log_catalog_ttl_s=float(os.getenv("LOG_CATALOG_TTL_S", "5")),
+            log_catalog_max_files=int(os.getenv("LOG_CATALOG_MAX_FILES", "500")),
+            console_log_max_bytes=int(os.getenv("CONSOLE_LOG_MAX_BYTES", str(10 * 1024 * 1024))),
+            console_log_backups=int(os.getenv("CONSOLE_LOG_BACKUPS", "3")),
+            console_keep_jobs=int(os.getenv("CONSOLE_KEEP_JOBS", "200")),
+            console_buffer_max_bytes=int(os.getenv("CONSOLE_BUFFER_MAX_BYTES", str(8 * 1024 * 1024))),
+            console_buffer_lines=int(os.getenv("CONSOLE_BUFFER_LINES", "5000")),
+            console_keep_finished=int(os.getenv("CONSOLE_KEEP_FINISHED", "20")),
+            process_registry_debounce_s=float(os.getenv("PROCESS_REGISTRY_DEBOUNCE_S", "0.5")),
         )
 
@@ -0,0 +1,585 @@
+"""Output of the dashboard's console jobs.
+
+``ConsoleLog`` is the single writer for ``codex_console.log``: writes are
+append-only under one lock (job threads never interleave partial writes), the
+file is rotated by size to ``.1`` .. ``.<backups>``, and every job's output is
+also written to ``jobs/<job id>.log`` next to it. Job ids are allocated here,
+so they are unique across sessions and restarts. The view tails either file
+with ``agent.logtail.LogTailer``, which follows rotation by inode.
+
+``ConsoleJobs`` is the in-memory side: every job's process plus a bounded
+buffer of its recent lines, capped in total across jobs, so a job's view
+never has to parse the shared file.
+
+``ProcessRegistry`` tracks named long-running processes (dev servers). The
+in-memory copy is authoritative; ``process_registry.json`` is rewritten
+atomically after a short debounce and reconciled with live PIDs on load.
+"""
+
+from __future__ import annotations
+
+import atexit
+import itertools
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Deque, Dict, List, Optional, Tuple, Union
+
+from agent.config import Settings
+
+try:
+    import psutil  # type: ignore
+except Exception:  # pragma: no cover - optional dependency
+    psutil = None
+
+log = logging.getLogger(__name__)
+
+_JOB_FILE_RE = re.compile(r"^(\d+)\.log$")
+
+
+class _Sink:
+    """One append-only file with size-based rotation (not thread-safe on its own)."""
+
+    def __init__(self, path: Path, max_bytes: int, backups: int) -> None:
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self._fh: Optional[BinaryIO] = None
+        self._size = 0
+
+    def _open(self) -> BinaryIO:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fh = self._fh = open(self.path, "ab")
+        self._size = os.fstat(fh.fileno()).st_size
+        return fh
+
+    def _rotate(self) -> None:
+        self.close()
+        if self.backups > 0:
+            for i in range(self.backups - 1, 0, -1):
+                src = self.path.with_name(f"{self.path.name}.{i}")
+                if src.exists():
+                    os.replace(src, self.path.with_name(f"{self.path.name}.{i + 1}"))
+            os.replace(self.path, self.path.with_name(f"{self.path.name}.1"))
+        else:
+            self.path.unlink()
+
+    def write(self, data: bytes) -> None:
+        fh = self._fh if self._fh is not None else self._open()
+        if (
+            self.max_bytes > 0
+            and self._size
+            and self._size + len(data) > self.max_bytes
+        ):
+            self._rotate()
+            fh = self._open()
+        fh.write(data)
+        fh.flush()
+        self._size += len(data)
+
+    def close(self) -> None:
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+
+
+class ConsoleLog:
+    """Append-only console log with per-job files under ``jobs_dir``."""
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        *,
+        max_bytes: int = 10 * 1024 * 1024,
+        backups: int = 3,
+        jobs_dir: Optional[Union[str, Path]] = None,
+        keep_jobs: int = 200,
+    ) -> None:
+        """Open ``path`` (rotated past ``max_bytes``); keep ``keep_jobs`` job files."""
+        self.path = Path(path)
+        self.jobs_dir = Path(jobs_dir) if jobs_dir else self.path.parent / "jobs"
+        self.max_bytes = max_bytes
+        self.keep_jobs = keep_jobs
+        self._lock = threading.Lock()
+        self._main = _Sink(self.path, max_bytes, backups)
+        self._jobs: Dict[int, _Sink] = {}
+        self._next_id = max(self.job_ids(), default=0) + 1
+
+    def job_ids(self) -> List[int]:
+        """Return the ids of jobs with a log file, oldest first."""
+        if not self.jobs_dir.is_dir():
+            return []
+        return sorted(
+            int(m.group(1))
+            for p in self.jobs_dir.iterdir()
+            if (m := _JOB_FILE_RE.match(p.name))
+        )
+
+    def _prune_jobs(self) -> None:
+        ids = [i for i in self.job_ids() if i not in self._jobs]
+        for job_id in ids[: max(0, len(ids) - self.keep_jobs)]:
+            for p in self.jobs_dir.glob(f"{job_id}.log*"):
+                try:
+                    p.unlink()
+                except OSError:
+                    pass
+
+    def job_path(self, job_id: int) -> Path:
+        """Return the log file of ``job_id``."""
+        return self.jobs_dir / f"{job_id}.log"
+
+    def start_job(self, header: str = "") -> int:
+        """Allocate a job id, open its log and write ``header`` to both logs."""
+        with self._lock:
+            job_id = self._next_id
+            self._next_id += 1
+            self._prune_jobs()
+            # Job logs keep one backup so a long-running server cannot fill the disk.
+            self._jobs[job_id] = _Sink(self.job_path(job_id), self.max_bytes, 1)
+            if header:
+                self._write(header, job_id)
+            return job_id
+
+    def _write(self, text: str, job_id: Optional[int]) -> None:
+        data = text.encode("utf-8", errors="replace")
+        self._main.write(data)
+        sink = self._jobs.get(job_id) if job_id is not None else None
+        if sink is not None:
+            sink.write(data)
+
+    def write(self, text: str, job_id: Optional[int] = None) -> None:
+        """Append ``text`` to the console log (and to ``job_id``'s log)."""
+        with self._lock:
+            self._write(text, job_id)
+
+    def end_job(self, job_id: int, footer: str = "") -> None:
+        """Write ``footer`` and close ``job_id``'s log."""
+        with self._lock:
+            if footer:
+                self._write(footer, job_id)
+            sink = self._jobs.pop(job_id, None)
+            if sink is not None:
+                sink.close()
+
+    def close(self) -> None:
+        """Close the console log and every open job file."""
+        with self._lock:
+            for sink in self._jobs.values():
+                sink.close()
+            self._jobs.clear()
+            self._main.close()
+
+
+_logs: Dict[str, ConsoleLog] = {}
+_logs_lock = threading.Lock()
+
+
+def get_console_log(path: Union[str, Path]) -> ConsoleLog:
+    """Return the process-wide writer for ``path`` (``CONSOLE_LOG_MAX_BYTES`` / ``CONSOLE_LOG_BACKUPS``)."""
+    key = os.path.abspath(path)
+    with _logs_lock:
+        log = _logs.get(key)
+        if log is None:
+            cfg = Settings.load()
+            log = _logs[key] = ConsoleLog(
+                path,
+                max_bytes=cfg.console_log_max_bytes,
+                backups=cfg.console_log_backups,
+                keep_jobs=cfg.console_keep_jobs,
+            )
+        return log
+
+
+class ConsoleJob:
+    """One console job: its process and a bounded buffer of recent output lines.
+
+    Lines are numbered from 0 in arrival order; ``read(since)`` returns the
+    ones after a caller's cursor so a view only handles what is new. A trailing
+    fragment without its newline is kept apart and reported as ``partial``.
+    """
+
+    def __init__(
+        self, job_id: int, *, cmd: str = "", name: Optional[str] = None
+    ) -> None:
+        """Create an empty job; ``proc`` is attached once the process starts."""
+        self.job_id = job_id
+        self.cmd = cmd
+        self.name = name
+        self.proc: Any = None
+        self.started_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.returncode: Optional[int] = None
+        self.dropped = 0  # lines evicted to respect the caps
+        self._lines: Deque[str] = deque()
+        self._first = 0  # number of the oldest buffered line
+        self._partial = ""
+        self.nbytes = 0
+
+    @property
+    def pid(self) -> Optional[int]:
+        """PID of the job's process, if it has started."""
+        return getattr(self.proc, "pid", None)
+
+    @property
+    def running(self) -> bool:
+        """Whether the job has not been finished yet."""
+        return self.finished_at is None
+
+    def _push(self, line: str) -> None:
+        self._lines.append(line)
+        self.nbytes += len(line) + 1
+
+    def _evict(self, count: int = 1) -> int:
+        freed = 0
+        for _ in range(min(count, len(self._lines))):
+            freed += len(self._lines.popleft()) + 1
+            self._first += 1
+            self.dropped += 1
+        self.nbytes -= freed
+        return freed
+
+
+class ConsoleJobs:
+    """Registry of console jobs with bounded in-memory output.
+
+    Each job keeps at most ``max_lines`` lines, and all jobs together at most
+    ``max_bytes`` characters: finished jobs are dropped oldest first, then the
+    largest running job loses its oldest lines. Only ``keep_finished`` finished
+    jobs stay listed. Thread-safe; job threads call ``append``/``finish`` and
+    the dashboard reads.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_bytes: int = 8 * 1024 * 1024,
+        max_lines: int = 5000,
+        keep_finished: int = 20,
+    ) -> None:
+        """Set the per-job line cap, the shared byte budget and the finished-job count."""
+        self.max_bytes = max_bytes
+        self.max_lines = max_lines
+        self.keep_finished = keep_finished
+        self._jobs: Dict[int, ConsoleJob] = {}
+        self._lock = threading.Lock()
+        self.nbytes = 0
+
+    # mapping-style reads (job id -> ConsoleJob)
+    def __contains__(self, job_id: object) -> bool:
+        """Return whether ``job_id`` is still listed."""
+        return job_id in self._jobs
+
+    def __len__(self) -> int:
+        """Return the number of listed jobs."""
+        return len(self._jobs)
+
+    def get(self, job_id: int) -> Optional[ConsoleJob]:
+        """Return the job with ``job_id``, or ``None`` once it is no longer listed."""
+        return self._jobs.get(job_id)
+
+    def items(self) -> List[Tuple[int, ConsoleJob]]:
+        """Return ``(job id, job)`` pairs, oldest first."""
+        with self._lock:
+            return list(self._jobs.items())
+
+    def running(self) -> List[ConsoleJob]:
+        """Return jobs whose process has not finished, oldest first."""
+        with self._lock:
+            return [j for j in self._jobs.values() if j.running]
+
+    def start(
+        self, job_id: int, *, cmd: str = "", name: Optional[str] = None
+    ) -> ConsoleJob:
+        """Register a new job (its process is attached later via ``job.proc``)."""
+        job = ConsoleJob(job_id, cmd=cmd, name=name)
+        with self._lock:
+            self._jobs[job_id] = job
+        return job
+
+    def append(self, job: ConsoleJob, text: str) -> List[str]:
+        """Buffer ``text`` for ``job``; return the lines it completed (without newlines)."""
+        text = text.replace("\r\n", "\n")
+        with self._lock:
+            head, sep, job._partial = (job._partial + text).rpartition("\n")
+            if not sep:
+                return []
+            lines = [line.rstrip("\r") for line in head.split("\n")]
+            before = job.nbytes
+            for line in lines:
+                job._push(line)
+            if len(job._lines) > self.max_lines:
+                job._evict(len(job._lines) - self.max_lines)
+            self.nbytes += job.nbytes - before
+            self._enforce()
+            return lines
+
+    def finish(self, job: ConsoleJob, returncode: Optional[int] = None) -> str:
+        """Mark ``job`` finished; return (and buffer) its unterminated last fragment."""
+        with self._lock:
+            tail, job._partial = job._partial, ""
+            if tail:
+                job._push(tail)
+                self.nbytes += len(tail) + 1
+            job.returncode = returncode
+            job.finished_at = time.time()
+            finished = [j for j in self._jobs.values() if not j.running]
+            for old in finished[: max(0, len(finished) - self.keep_finished)]:
+                self._drop(old.job_id)
+            self._enforce()
+            return tail
+
+    def _drop(self, job_id: int) -> None:
+        job = self._jobs.pop(job_id, None)
+        if job is not None:
+            self.nbytes -= job.nbytes
+
+    def _enforce(self) -> None:
+        if self.nbytes <= self.max_bytes:
+            return
+        for job in [j for j in self._jobs.values() if not j.running]:
+            self._drop(job.job_id)
+            if self.nbytes <= self.max_bytes:
+                return
+        while self.nbytes > self.max_bytes:
+            largest = max(self._jobs.values(), key=lambda j: j.nbytes, default=None)
+            if largest is None or not largest._lines:
+                return
+            # Evict a chunk at a time so one chatty job does not cost a max() per line.
+            self.nbytes -= largest._evict(max(1, len(largest._lines) // 8))
+
+    def read(self, job_id: int, since: int = 0) -> Dict[str, Any]:
+        """Return lines numbered ``since`` onwards.
+
+        The result has ``lines``, ``next`` (the cursor for the next call),
+        ``partial`` (the current unterminated fragment), ``gap`` (lines evicted
+        before the caller saw them), ``running`` and ``returncode``.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return {
+                    "lines": [],
+                    "next": since,
+                    "partial": "",
+                    "gap": 0,
+                    "running": False,
+                    "returncode": None,
+                }
+            end = job._first + len(job._lines)
+            start = min(max(since, job._first), end)
+            lines = list(itertools.islice(job._lines, start - job._first, None))
+            return {
+                "lines": lines,
+                "next": end,
+                "partial": job._partial,
+                "gap": max(0, job._first - since),
+                "running": job.running,
+                "returncode": job.returncode,
+            }
+
+    def tail(self, job_id: int, n: int = 500) -> List[str]:
+        """Return the last ``n`` buffered lines of ``job_id`` (plus its partial line)."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return []
+            lines = list(
+                itertools.islice(job._lines, max(0, len(job._lines) - n), None)
+            )
+            if job._partial:
+                lines.append(job._partial)
+            return lines[-n:] if n > 0 else []
+
+
+_jobs: Optional[ConsoleJobs] = None
+_jobs_lock = threading.Lock()
+
+
+def get_console_jobs() -> ConsoleJobs:
+    """Return the process-wide job registry (``CONSOLE_BUFFER_*`` settings)."""
+    global _jobs
+    with _jobs_lock:
+        if _jobs is None:
+            cfg = Settings.load()
+            _jobs = ConsoleJobs(
+                max_bytes=cfg.console_buffer_max_bytes,
+                max_lines=cfg.console_buffer_lines,
+                keep_finished=cfg.console_keep_finished,
+            )
+        return _jobs
+
+
+def pid_alive(pid: Any) -> bool:
+    """Return whether a process with ``pid`` exists (never signals it)."""
+    try:
+        pid = int(pid)
+    except (TypeError, ValueError):
+        return False
+    if pid <= 0:
+        return False
+    if psutil is not None:
+        return bool(psutil.pid_exists(pid))
+    if (
+        os.name == "nt"
+    ):  # pragma: no cover - Windows only; os.kill would terminate the process
+        import ctypes
+
+        kernel32 = ctypes.windll.kernel32  # type: ignore[attr-defined]
+        handle = kernel32.OpenProcess(
+            0x1000, False, pid
+        )  # PROCESS_QUERY_LIMITED_INFORMATION
+        if not handle:
+            return False
+        try:
+            code = ctypes.c_ulong()
+            return (
+                bool(kernel32.GetExitCodeProcess(handle, ctypes.byref(code)))
+                and code.value == 259
+            )  # STILL_ACTIVE
+        finally:
+            kernel32.CloseHandle(handle)
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    except OSError:
+        return False
+    return True
+
+
+class ProcessRegistry:
+    """Named processes (``name -> {pid, cmd, cwd, started_at}``) with debounced persistence.
+
+    Reads and writes go to the in-memory copy under a lock; ``flush`` (run
+    ``debounce_s`` after the first unsaved change, and at exit) writes the file
+    through a temporary file and ``os.replace``. On load, entries whose PID is
+    gone are dropped.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        *,
+        debounce_s: float = 0.5,
+        is_alive: Callable[[Any], bool] = pid_alive,
+    ) -> None:
+        """Load ``path``, dropping entries whose PID ``is_alive`` rejects."""
+        self.path = Path(path)
+        self.debounce_s = debounce_s
+        self._is_alive = is_alive
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()  # serializes file writes
+        self._data: Dict[str, Dict[str, Any]] = {}
+        self._version = 0  # bumped on every change
+        self._saved = 0  # version last written
+        self._timer: Optional[threading.Timer] = None
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            log.warning(
+                "process_registry_unreadable",
+                extra={"path": str(self.path), "error": str(e)},
+            )
+            return
+        if not isinstance(data, dict):
+            return
+        live = {
+            k: v
+            for k, v in data.items()
+            if isinstance(v, dict) and self._is_alive(v.get("pid"))
+        }
+        with self._lock:
+            self._data = live
+            if len(live) != len(data):
+                self._changed()
+        if self.debounce_s <= 0:
+            self.flush()
+
+    def _changed(self) -> None:
+        # Caller holds self._lock; with no debounce the caller flushes after releasing it.
+        self._version += 1
+        if self._timer is None and self.debounce_s > 0:
+            self._timer = threading.Timer(self.debounce_s, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def get(self, name: str) -> Optional[Dict[str, Any]]:
+        """Return a copy of the entry for ``name`` (no disk access)."""
+        with self._lock:
+            info = self._data.get(name)
+            return dict(info) if info is not None else None
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Return a copy of every entry (no disk access)."""
+        with self._lock:
+            return {k: dict(v) for k, v in self._data.items()}
+
+    def set(self, name: str, info: Dict[str, Any]) -> None:
+        """Register ``name``; the file is rewritten after the debounce."""
+        with self._lock:
+            self._data[name] = dict(info)
+            self._changed()
+        if self.debounce_s <= 0:
+            self.flush()
+
+    def remove(self, name: str) -> Optional[Dict[str, Any]]:
+        """Remove ``name``; return its entry if it was registered."""
+        with self._lock:
+            info = self._data.pop(name, None)
+            if info is not None:
+                self._changed()
+        if self.debounce_s <= 0:
+            self.flush()
+        return info
+
+    def flush(self) -> None:
+        """Write pending changes now (atomically)."""
+        with self._write_lock:
+            with self._lock:
+                self._timer = None
+                if self._saved == self._version:
+                    return
+                version = self._version
+                payload = json.dumps(self._data, indent=2)
+            tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                tmp.write_text(payload, encoding="utf-8")
+                os.replace(tmp, self.path)
+            except OSError as e:
+                log.warning(
+                    "process_registry_write_failed",
+                    extra={"path": str(self.path), "error": str(e)},
+                )
+                return
+            with self._lock:
+                self._saved = max(self._saved, version)
+
+
+_registries: Dict[str, ProcessRegistry] = {}
+_registries_lock = threading.Lock()
+
+
+def get_process_registry(path: Union[str, Path]) -> ProcessRegistry:
+    """Return the process-wide registry for ``path`` (``PROCESS_REGISTRY_DEBOUNCE_S``)."""
+    key = os.path.abspath(path)
+    with _registries_lock:
+        registry = _registries.get(key)
+        if registry is None:
+            registry = _registries[key] = ProcessRegistry(
+                path, debounce_s=Settings.load().process_registry_debounce_s
+            )
+            atexit.register(registry.flush)
+        return registry
@@ -6,11 +6,22 @@ Returns a predefined response. Replace logic and configuration as needed.
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Any, Dict, TypedDict
+from typing import Any, Dict, List, Optional, TypedDict
 
 from langgraph.graph import StateGraph
 from langgraph.runtime import Runtime
 
+from agent.notes import (
+    DEFAULT_BULK_BATCH,
+    DEFAULT_PAGE_SIZE,
+    NoteStore,
+    bulk_add,
+    get_note_store,
+    iter_bulk_items,
+    iter_pages,
+    parse_tags,
+)
+
 
 class Context(TypedDict):
     """Context parameters for the agent.
@@ -52,24 +63,56 @@ graph = (
     .compile(name="New Graph")
 )
 
-# ---- mem0 integration graphs (optional) ----
-try:
-    from mem0_mcp import store as _mem0_store  # type: ignore
-except Exception:  # pragma: no cover - optional dependency
-    _mem0_store = None  # type: ignore
+# ---- mem0 integration graphs ----
+# Backed by agent.notes: SQLite by default, or the legacy mem0_mcp JSON file
+# with NOTES_BACKEND=mem0. Outputs are declared on the states so that runs
+# return them.
+
+
+def _note_store() -> NoteStore:
+    return get_note_store()
 
 
 @dataclass
 class MemListState:
-    pass
+    # limit=0 returns everything at once; a limit returns one page from cursor;
+    # stream=True emits every page as a custom stream chunk instead.
+    cursor: Optional[int] = None
+    limit: int = 0
+    stream: bool = False
+    notes: Optional[List[str]] = None
+    next_cursor: Optional[int] = None
+    count: Optional[int] = None
+    error: Optional[str] = None
+
+
+def _paged(
+    store: NoteStore, state: Any, runtime: Runtime[Context], *, titles_only: bool
+) -> Dict[str, Any]:
+    """Serve one page, or stream all pages through ``runtime.stream_writer``."""
+    if state.stream:
+        sent = 0
+        for page in iter_pages(
+            store,
+            cursor=state.cursor,
+            limit=state.limit or DEFAULT_PAGE_SIZE,
+            titles_only=titles_only,
+        ):
+            sent += len(page["notes"])
+            runtime.stream_writer({**page, "done": sent})
+        return {"count": sent, "next_cursor": None}
+    page = store.page(state.cursor, state.limit, titles_only=titles_only)
+    return {**page, "count": len(page["notes"])}
 
 
 def mem_list_node(state: MemListState, runtime: Runtime[Context]) -> Dict[str, Any]:
-    if _mem0_store is None:
-        return {"error": "mem0_mcp not installed. Install D:/mem0 or pip install mem0-mcp."}
-    data = _mem0_store.load_mem()
-    titles = [n.get("title", "(untitled)") for n in data.get("notes", [])]
-    return {"notes": titles}
+    try:
+        store = _note_store()
+    except RuntimeError as e:
+        return {"error": str(e)}
+    if state.limit or state.stream:
+        return _paged(store, state, runtime, titles_only=True)
+    return {"notes": store.list_titles()}
 
 
 mem_list_graph = (
@@ -82,13 +125,28 @@ mem_list_graph = (
 
 @dataclass
 class MemDumpState:
-    pass
+    # Same paging/streaming inputs as MemListState; pages come back as mem={"notes": [...]}.
+    cursor: Optional[int] = None
+    limit: int = 0
+    stream: bool = False
+    mem: Optional[Dict[str, Any]] = None
+    next_cursor: Optional[int] = None
+    count: Optional[int] = None
+    error: Optional[str] = None
 
 
 def mem_dump_node(state: MemDumpState, runtime: Runtime[Context]) -> Dict[str, Any]:
-    if _mem0_store is None:
-        return {"error": "mem0_mcp not installed. Install D:/mem0 or pip install mem0-mcp."}
-    return {"mem": _mem0_store.load_mem()}
+    try:
+        store = _note_store()
+    except RuntimeError as e:
+        return {"error": str(e)}
+    if state.limit or state.stream:
+        out = _paged(store, state, runtime, titles_only=False)
+        notes = out.pop("notes", None)
+        if notes is not None:
+            out["mem"] = {"notes": notes}
+        return out
+    return {"mem": store.dump()}
 
 
 mem_dump_graph = (
@@ -104,13 +162,16 @@ class MemAddState:
     title: str
     content: str
     tags: str = ""
+    ok: Optional[bool] = None
+    error: Optional[str] = None
 
 
 def mem_add_node(state: MemAddState, runtime: Runtime[Context]) -> Dict[str, Any]:
-    if _mem0_store is None:
-        return {"error": "mem0_mcp not installed. Install D:/mem0 or pip install mem0-mcp."}
-    tag_list = [t.strip() for t in (state.tags or "").split(",") if t.strip()]
-    _mem0_store.add_note(state.title or "(untitled)", state.content or "", tag_list)
+    try:
+        store = _note_store()
+    except RuntimeError as e:
+        return {"error": str(e)}
+    store.add(state.title or "(untitled)", state.content or "", parse_tags(state.tags))
     return {"ok": True, "title": state.title}
 
 
@@ -120,3 +181,92 @@ mem_add_graph = (
     .add_edge("__start__", "mem_add_node")
     .compile(name="Mem0 Add Note")
 )
+
+
+@dataclass
+class MemBulkAddState:
+    """Batched import of notes from a list and/or a JSONL file."""
+
+    # Notes as [{"title", "content", "tags"}, ...] and/or a JSONL file with one such object per line.
+    notes: Optional[List[Dict[str, Any]]] = None
+    path: str = ""
+    batch_size: int = DEFAULT_BULK_BATCH
+    added: Optional[int] = None
+    failed: Optional[int] = None
+    failures: Optional[List[Dict[str, Any]]] = None
+    error: Optional[str] = None
+
+
+def mem_bulk_add_node(
+    state: MemBulkAddState, runtime: Runtime[Context]
+) -> Dict[str, Any]:
+    """Add notes in batches, streaming progress after each one."""
+    try:
+        store = _note_store()
+    except RuntimeError as e:
+        return {"error": str(e)}
+    added = failed = 0
+    failures: List[Dict[str, Any]] = []
+    try:
+        for progress in bulk_add(
+            store,
+            iter_bulk_items(state.notes, state.path or None),
+            batch_size=state.batch_size,
+        ):
+            added, failed = progress["added"], progress["failed"]
+            failures.extend(progress["failures"])
+            runtime.stream_writer(progress)
+    except OSError as e:
+        return {
+            "added": added,
+            "failed": failed,
+            "failures": failures,
+            "error": f"cannot read {state.path}: {e}",
+        }
+    return {"added": added, "failed": failed, "failures": failures}
+
+
+mem_bulk_add_graph = (
+    StateGraph(MemBulkAddState, context_schema=Context)
+    .add_node(mem_bulk_add_node)
+    .add_edge("__start__", "mem_bulk_add_node")
+    .compile(name="Mem0 Bulk Add Notes")
+)
+
+
+@dataclass
+class MemSearchState:
+    """Full-text and tag search over the note store."""
+
+    query: str = ""
+    tags: str = ""
+    match: str = "all"  # "all" or "any" of the tags
+    limit: int = 20
+    offset: int = 0
+    results: Optional[List[Dict[str, Any]]] = None
+    total: Optional[int] = None
+    next_offset: Optional[int] = None
+    error: Optional[str] = None
+
+
+def mem_search_node(state: MemSearchState, runtime: Runtime[Context]) -> Dict[str, Any]:
+    """Return one page of matches for ``query`` and ``tags``."""
+    try:
+        store = _note_store()
+    except RuntimeError as e:
+        return {"error": str(e)}
+    return store.search(
+        state.query,
+        tags=parse_tags(state.tags),
+        match_all=(state.match or "all").lower() != "any",
+        limit=state.limit,
+        offset=state.offset,
+    )
+
+
+mem_search_graph = (
+    StateGraph(MemSearchState, context_schema=Context)
+    .add_node(mem_search_node)
+    .add_edge("__start__", "mem_search_node")
+    .compile(name="Mem0 Search Notes")
+)
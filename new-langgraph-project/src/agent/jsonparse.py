@@ -0,0 +1,69 @@
+"""JSON decoding backends for upstream payloads.
+
+``loads`` uses orjson when it is installed and falls back to the stdlib.
+``iter_items`` yields the elements of one array inside a document; with ijson
+installed, large bodies are parsed incrementally so only one element's object
+tree is alive at a time instead of the whole document.
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Any, Iterator, cast
+
+try:
+    import orjson
+except Exception:  # pragma: no cover - optional dependency
+    orjson = None  # type: ignore
+
+try:
+    import ijson  # type: ignore
+except Exception:  # pragma: no cover - optional dependency
+    ijson = None
+
+# Below this size a single fast parse beats incremental parsing.
+STREAM_THRESHOLD_BYTES = 256 * 1024
+
+
+def backend() -> str:
+    """Return the name of the active decoder (``orjson`` or ``json``)."""
+    return "orjson" if orjson is not None else "json"
+
+
+def loads(raw: bytes) -> Any:
+    """Decode a whole JSON document from ``raw``."""
+    if not raw:
+        return None
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def _walk(doc: Any, path: str) -> Iterator[Any]:
+    """Resolve an ijson-style prefix (``events.item``) on a decoded document."""
+    nodes = [doc]
+    for part in path.split(".") if path else []:
+        nxt = []
+        for node in nodes:
+            if part == "item":
+                if isinstance(node, list):
+                    nxt.extend(node)
+            elif isinstance(node, dict) and node.get(part) is not None:
+                nxt.append(node[part])
+        nodes = nxt
+    return iter(nodes)
+
+
+def iter_items(
+    raw: bytes, path: str, *, stream_threshold: int = STREAM_THRESHOLD_BYTES
+) -> Iterator[Any]:
+    """Yield the values at ijson-style ``path`` (for example ``events.item``).
+
+    Missing keys and ``null`` values yield nothing, matching the defensive
+    ``.get(...) or []`` style of the normalizers.
+    """
+    if not raw:
+        return iter(())
+    if ijson is not None and len(raw) >= stream_threshold:
+        return cast(Iterator[Any], ijson.items(raw, path, use_float=True))
+    return _walk(loads(raw), path)
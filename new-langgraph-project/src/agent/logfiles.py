@@ -0,0 +1,220 @@
+"""Cached discovery of log files for the dashboard's Logs section.
+
+``LogCatalog`` walks its include roots once and remembers, per directory, the
+directory mtime together with its matching files and subdirectories. Later
+refreshes (at most every ``ttl_s``) stat each known directory and only list
+the ones whose mtime changed. Virtualenvs (any directory holding
+``pyvenv.cfg``), VCS metadata, caches and ``node_modules`` are never entered,
+nor are the exclude roots. Each entry carries size and mtime so callers can
+sort by recency without stat calls of their own.
+"""
+
+from __future__ import annotations
+
+import fnmatch
+import os
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import (
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from agent.config import Settings
+
+SKIP_DIRS: FrozenSet[str] = frozenset(
+    {
+        ".git",
+        ".hg",
+        ".svn",
+        ".venv",
+        "venv",
+        ".tox",
+        ".nox",
+        "node_modules",
+        "__pycache__",
+        ".mypy_cache",
+        ".pytest_cache",
+        ".ruff_cache",
+        "site-packages",
+    }
+)
+
+
+@dataclass(frozen=True)
+class LogFile:
+    """One cataloged log file with its size and mtime at the last refresh."""
+
+    path: Path
+    size: int
+    mtime: float
+
+
+@dataclass
+class _Dir:
+    mtime_ns: int
+    files: List[str]
+    subdirs: List[str]
+
+
+def _split_paths(value: str) -> List[str]:
+    return [p for p in value.split(os.pathsep) if p.strip()]
+
+
+class LogCatalog:
+    """Log files under ``roots`` (minus ``exclude``), refreshed at most every ``ttl_s``."""
+
+    def __init__(
+        self,
+        roots: Iterable[Union[str, Path]],
+        *,
+        exclude: Iterable[Union[str, Path]] = (),
+        patterns: Sequence[str] = ("*.log",),
+        skip_dirs: FrozenSet[str] = SKIP_DIRS,
+        max_files: int = 500,
+        ttl_s: float = 5.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Scan at most ``max_files`` matches of ``patterns``, skipping ``skip_dirs``."""
+        self.roots = tuple(os.path.abspath(r) for r in roots)
+        self.exclude = frozenset(os.path.normcase(os.path.abspath(e)) for e in exclude)
+        self.patterns = tuple(patterns)
+        self.skip_dirs = skip_dirs
+        self.max_files = max_files
+        self.ttl_s = ttl_s
+        self.truncated = False  # max_files was reached on the last refresh
+        self.scans = 0  # directory listings performed (cache misses)
+        self._clock = clock
+        self._dirs: Dict[str, _Dir] = {}
+        self._files: List[LogFile] = []
+        self._refreshed_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def _matches(self, name: str) -> bool:
+        return any(fnmatch.fnmatch(name, pat) for pat in self.patterns)
+
+    def _skipped(self, name: str, path: str) -> bool:
+        return name in self.skip_dirs or os.path.normcase(path) in self.exclude
+
+    def _list(self, path: str, mtime_ns: int) -> _Dir:
+        self.scans += 1
+        files: List[str] = []
+        subdirs: List[str] = []
+        with os.scandir(path) as it:
+            entries = sorted(it, key=lambda e: e.name)
+        if any(e.name == "pyvenv.cfg" for e in entries):
+            return _Dir(mtime_ns, [], [])  # a virtualenv root
+        for e in entries:
+            try:
+                if e.is_dir(follow_symlinks=False):
+                    if not self._skipped(e.name, e.path):
+                        subdirs.append(e.name)
+                elif e.is_file() and self._matches(e.name):
+                    files.append(e.name)
+            except OSError:
+                continue
+        return _Dir(mtime_ns, files, subdirs)
+
+    def _walk(self) -> Tuple[List[LogFile], Dict[str, _Dir], bool]:
+        seen: Dict[str, _Dir] = {}
+        found: List[LogFile] = []
+        stack = [
+            r for r in reversed(self.roots) if os.path.normcase(r) not in self.exclude
+        ]
+        while stack:
+            path = stack.pop()
+            if path in seen:
+                continue
+            try:
+                mtime_ns = os.stat(path).st_mtime_ns
+                cached = self._dirs.get(path)
+                entry = (
+                    cached
+                    if cached is not None and cached.mtime_ns == mtime_ns
+                    else self._list(path, mtime_ns)
+                )
+            except OSError:
+                continue
+            seen[path] = entry
+            for name in entry.files:
+                fp = os.path.join(path, name)
+                try:
+                    st = os.stat(fp)  # appends do not touch the directory mtime
+                except OSError:
+                    continue
+                found.append(LogFile(Path(fp), st.st_size, st.st_mtime))
+                if len(found) >= self.max_files:
+                    return found, {**self._dirs, **seen}, True
+            stack.extend(os.path.join(path, d) for d in reversed(entry.subdirs))
+        return found, seen, False
+
+    def refresh(self, *, force: bool = False) -> None:
+        """Re-validate the cache if it is older than ``ttl_s`` (or ``force``)."""
+        with self._lock:
+            now = self._clock()
+            if (
+                not force
+                and self._refreshed_at is not None
+                and now - self._refreshed_at < self.ttl_s
+            ):
+                return
+            self._files, self._dirs, self.truncated = self._walk()
+            self._refreshed_at = now
+
+    def files(self, *, sort: str = "mtime") -> List[LogFile]:
+        """Return the catalog, newest first (``sort="mtime"``) or by ``path``."""
+        self.refresh()
+        with self._lock:
+            files = list(self._files)
+        if sort == "path":
+            files.sort(key=lambda f: str(f.path))
+        else:
+            files.sort(key=lambda f: f.mtime, reverse=True)
+        return files
+
+
+def repo_root() -> Path:
+    """Return the repository root (the folder holding the project directory)."""
+    return Path(__file__).resolve().parents[3]
+
+
+_catalogs: Dict[Tuple[Tuple[str, ...], FrozenSet[str]], LogCatalog] = {}
+_catalogs_lock = threading.Lock()
+
+
+def get_log_catalog(roots: Optional[Sequence[Union[str, Path]]] = None) -> LogCatalog:
+    """Return the shared catalog for ``roots`` (default: ``LOG_CATALOG_ROOTS`` or the repo root).
+
+    ``LOG_CATALOG_EXCLUDE``, ``LOG_CATALOG_TTL_S`` and ``LOG_CATALOG_MAX_FILES``
+    apply. Catalogs are shared across dashboard sessions.
+    """
+    cfg = Settings.load()
+    chosen = (
+        [str(r) for r in roots]
+        if roots
+        else _split_paths(cfg.log_catalog_roots) or [str(repo_root())]
+    )
+    exclude = _split_paths(cfg.log_catalog_exclude)
+    key = (
+        tuple(os.path.abspath(r) for r in chosen),
+        frozenset(os.path.abspath(e) for e in exclude),
+    )
+    with _catalogs_lock:
+        catalog = _catalogs.get(key)
+        if catalog is None:
+            catalog = _catalogs[key] = LogCatalog(
+                chosen,
+                exclude=exclude,
+                max_files=cfg.log_catalog_max_files,
+                ttl_s=cfg.log_catalog_ttl_s,
+            )
+        return catalog
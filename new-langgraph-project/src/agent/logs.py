@@ -1,9 +1,50 @@
+"""JSON logging for the graphs and services.
+
+``setup_json_logging`` emits one JSON object per record (extras included) and,
+by default, hands records to a background thread through a bounded queue so
+logging never does I/O or JSON encoding on an event loop. A ``SamplingFilter``
+caps repeats of the same record per time window and reports what it dropped.
+"""
+
 from __future__ import annotations
 
+import atexit
+import copy
 import json
 import logging
+import logging.handlers
+import queue
+import random
 import sys
-from typing import Any, Dict
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Tuple, cast
+
+from agent.config import Settings
+
+try:
+    import orjson
+except Exception:  # pragma: no cover - optional dependency
+    orjson = None  # type: ignore
+
+# Attributes every LogRecord has; anything else was passed via ``extra=``.
+_RESERVED = frozenset(vars(logging.makeLogRecord({}))) | {
+    "message",
+    "asctime",
+    "taskName",
+}
+
+DROP_POLICIES = ("drop_new", "drop_oldest", "block")
+
+
+def _dumps(data: Dict[str, Any]) -> str:
+    if orjson is not None:
+        try:
+            return orjson.dumps(data, default=str).decode()
+        except TypeError:  # e.g. non-str dict keys nested in an extra
+            pass
+    return json.dumps(data, ensure_ascii=False, default=str)
 
 
 class _JsonFormatter(logging.Formatter):
@@ -13,17 +54,292 @@ class _JsonFormatter(logging.Formatter):
             "name": record.name,
             "message": record.getMessage(),
         }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED and not key.startswith("_") and key not in data:
+                data[key] = value
         if record.exc_info:
             data["exc_info"] = self.formatException(record.exc_info)
-        return json.dumps(data, ensure_ascii=False)
+        elif record.exc_text:
+            data["exc_info"] = record.exc_text
+        return _dumps(data)
+
+
+class BoundedQueueHandler(logging.handlers.QueueHandler):
+    """``QueueHandler`` over a bounded queue that never blocks the caller indefinitely.
+
+    When the queue is full, ``drop_new`` discards the incoming record,
+    ``drop_oldest`` evicts the oldest queued one, and ``block`` waits up to
+    ``block_timeout_s`` before dropping. Drops are counted and reported by a
+    ``log_records_dropped`` record once the queue has room again.
+    """
+
+    def __init__(
+        self,
+        q: queue.Queue[logging.LogRecord],
+        *,
+        policy: str = "drop_new",
+        block_timeout_s: float = 0.5,
+    ) -> None:
+        """Wrap ``q``; ``policy`` is one of ``DROP_POLICIES``."""
+        if policy not in DROP_POLICIES:
+            raise ValueError(
+                f"unknown drop policy {policy!r}; expected one of {DROP_POLICIES}"
+            )
+        super().__init__(q)
+        # QueueHandler declares a protocol without put/get_nowait.
+        self.queue: queue.Queue[logging.LogRecord] = q
+        self.policy = policy
+        self.block_timeout_s = block_timeout_s
+        self.dropped = 0
+        self._pending_drops = 0
+        self._drop_lock = threading.Lock()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Return a picklable copy of ``record`` with its message resolved."""
+        # Only resolve the message here; JSON formatting happens on the listener thread.
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.exc_info = None
+        return record
+
+    def _put(self, record: logging.LogRecord) -> bool:
+        try:
+            if self.policy == "block":
+                self.queue.put(record, timeout=self.block_timeout_s)
+            else:
+                self.queue.put_nowait(record)
+            return True
+        except queue.Full:
+            pass
+        if self.policy == "drop_oldest":
+            try:
+                self.queue.get_nowait()
+                self._count_drop()
+                self.queue.put_nowait(record)
+                return True
+            except (queue.Empty, queue.Full):
+                pass
+        self._count_drop()
+        return False
+
+    def _count_drop(self) -> None:
+        with self._drop_lock:
+            self.dropped += 1
+            self._pending_drops += 1
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        """Queue ``record`` per the drop policy, then report any pending drops."""
+        if not self._put(record) or not self._pending_drops:
+            return
+        with self._drop_lock:
+            n, self._pending_drops = self._pending_drops, 0
+        notice = logging.makeLogRecord(
+            {
+                "name": __name__,
+                "levelno": logging.WARNING,
+                "levelname": "WARNING",
+                "msg": "log_records_dropped",
+                "dropped": n,
+            }
+        )
+        try:
+            self.queue.put_nowait(notice)  # never evict or wait for a notice
+        except queue.Full:
+            with self._drop_lock:
+                self._pending_drops += n
+
+
+def _hashable(value: Any) -> Hashable:
+    try:
+        hash(value)
+        return cast(Hashable, value)
+    except TypeError:
+        return repr(value)
+
+
+class _Window:
+    __slots__ = ("start", "seen", "suppressed", "record")
 
+    def __init__(self, start: float, record: logging.LogRecord) -> None:
+        self.start = start
+        self.seen = 0
+        self.suppressed = 0
+        self.record = record
 
-def setup_json_logging(level: int = logging.INFO) -> None:
-    """Configure root logger to emit JSON to stdout."""
-    handler = logging.StreamHandler(stream=sys.stdout)
-    handler.setFormatter(_JsonFormatter())
+
+class SamplingFilter(logging.Filter):
+    """Pass the first ``burst`` records per key and window, then sample at ``rate``.
+
+    The key is the logger name, the unformatted message and the ``key_extras``
+    attributes (for ``http_retry``: ``url``), so retries against one flapping
+    host collapse together while other hosts still log. When a window with
+    suppressed records ends, a ``suppressed N similar`` record carrying the
+    key and count is emitted. At most ``max_keys`` windows are tracked, so with
+    ``rate=0`` output is bounded by ``max_keys * (burst + 1)`` per window.
+    """
+
+    def __init__(
+        self,
+        *,
+        burst: int = 10,
+        rate: float = 0.0,
+        window_s: float = 10.0,
+        key_extras: Iterable[str] = ("url",),
+        max_keys: int = 1024,
+        emit: Optional[Callable[[logging.LogRecord], None]] = None,
+        clock: Callable[[], float] = time.monotonic,
+        rng: Optional[random.Random] = None,
+    ) -> None:
+        """Configure sampling; ``emit`` receives the ``suppressed N similar`` records."""
+        super().__init__()
+        self.burst = max(0, burst)
+        self.rate = min(1.0, max(0.0, rate))
+        self.window_s = window_s
+        self.key_extras = tuple(key_extras)
+        self.max_keys = max(1, max_keys)
+        self.suppressed_total = 0
+        self._emit = emit or (lambda rec: logging.getLogger(rec.name).handle(rec))
+        self._clock = clock
+        self._rng = rng or random.Random()
+        self._lock = threading.Lock()
+        self._windows: OrderedDict[Tuple[Any, ...], _Window] = OrderedDict()
+        self._next_sweep = 0.0
+
+    @staticmethod
+    def from_settings(cfg: Settings) -> SamplingFilter:
+        """Build a filter from the ``LOG_SAMPLE_*`` settings."""
+        return SamplingFilter(
+            burst=cfg.log_sample_burst,
+            rate=cfg.log_sample_rate,
+            window_s=cfg.log_sample_window_s,
+            key_extras=[k.strip() for k in cfg.log_sample_keys.split(",") if k.strip()],
+        )
+
+    def _summary(self, w: _Window) -> logging.LogRecord:
+        src = w.record
+        attrs: Dict[str, Any] = {
+            "name": src.name,
+            "levelno": src.levelno,
+            "levelname": src.levelname,
+            "msg": "suppressed %d similar: %s",
+            "args": (w.suppressed, src.msg),
+            "suppressed": w.suppressed,
+            "window_s": self.window_s,
+            "_sampling_summary": True,
+        }
+        for k in self.key_extras:
+            if hasattr(src, k):
+                attrs[k] = getattr(src, k)
+        return logging.makeLogRecord(attrs)
+
+    def _sweep(self, now: float, due: List[logging.LogRecord]) -> None:
+        for key in [
+            k for k, w in self._windows.items() if now - w.start >= self.window_s
+        ]:
+            w = self._windows.pop(key)
+            if w.suppressed:
+                due.append(self._summary(w))
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        """Return whether ``record`` passes, flushing summaries for ended windows."""
+        if getattr(record, "_sampling_summary", False):
+            return True
+        now = self._clock()
+        key = (
+            record.name,
+            record.msg,
+            *(_hashable(getattr(record, k, None)) for k in self.key_extras),
+        )
+        due: List[logging.LogRecord] = []
+        with self._lock:
+            if now >= self._next_sweep:
+                self._sweep(now, due)
+                self._next_sweep = now + self.window_s
+            w = self._windows.get(key)
+            if w is not None and now - w.start >= self.window_s:
+                del self._windows[key]
+                if w.suppressed:
+                    due.append(self._summary(w))
+                w = None
+            if w is None:
+                w = self._windows[key] = _Window(now, record)
+                if len(self._windows) > self.max_keys:
+                    _, old = self._windows.popitem(last=False)
+                    if old.suppressed:
+                        due.append(self._summary(old))
+            w.seen += 1
+            keep = w.seen <= self.burst or (
+                self.rate > 0 and self._rng.random() < self.rate
+            )
+            if not keep:
+                w.suppressed += 1
+                self.suppressed_total += 1
+        for rec in due:
+            self._emit(rec)
+        return keep
+
+    def flush(self) -> None:
+        """Emit summaries for every open window (for shutdown)."""
+        due: List[logging.LogRecord] = []
+        with self._lock:
+            self._sweep(float("inf"), due)
+        for rec in due:
+            self._emit(rec)
+
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_sampler: Optional[SamplingFilter] = None
+
+
+def stop_json_logging() -> None:
+    """Flush and stop the background log writer, if one is running."""
+    global _listener, _sampler
+    if _sampler is not None:
+        _sampler.flush()
+        _sampler = None
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(stop_json_logging)
+
+
+def setup_json_logging(
+    level: int = logging.INFO, *, settings: Optional[Settings] = None
+) -> logging.Handler:
+    """Configure root logger to emit JSON to stdout.
+
+    With ``LOG_QUEUE`` (default on) records are only copied into a bounded
+    queue on the calling thread; formatting and the stdout write happen on a
+    background ``QueueListener`` thread. With ``LOG_SAMPLING`` (default on) a
+    ``SamplingFilter`` on that handler caps repeated records. Returns the
+    handler attached to root.
+    """
+    cfg = settings or Settings.load()
+    stop_json_logging()
+    stream = logging.StreamHandler(stream=sys.stdout)
+    stream.setFormatter(_JsonFormatter())
+    handler: logging.Handler = stream
+    if cfg.log_queue:
+        q: queue.Queue[logging.LogRecord] = queue.Queue(
+            maxsize=max(1, cfg.log_queue_size)
+        )
+        handler = BoundedQueueHandler(q, policy=cfg.log_drop_policy)
+        global _listener
+        _listener = logging.handlers.QueueListener(
+            q, stream, respect_handler_level=True
+        )
+        _listener.start()
+    if cfg.log_sampling:
+        global _sampler
+        _sampler = SamplingFilter.from_settings(cfg)
+        handler.addFilter(_sampler)
     root = logging.getLogger()
     root.handlers.clear()
     root.addHandler(handler)
     root.setLevel(level)
-
+    return handler
@@ -0,0 +1,165 @@
+"""Incremental tailing of log files for the dashboard.
+
+``LogTailer`` remembers the byte offset and file identity (device, inode) of
+one file. The first read walks backwards from the end in fixed blocks until it
+has the requested number of lines; later reads only decode the bytes appended
+since. Rotation (a new inode at the path) and truncation (size below the
+offset) reset it. Recent lines are kept in a bounded ring buffer, so a refresh
+with nothing new costs one ``stat``.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from collections import deque
+from pathlib import Path
+from typing import BinaryIO, Deque, List, MutableMapping, Optional, Tuple, Union
+
+DEFAULT_BLOCK_SIZE = 64 * 1024
+DEFAULT_MAX_LINES = 10000
+# Appends larger than this are not decoded in full; the tail is re-read instead.
+DEFAULT_MAX_APPEND = 8 * 1024 * 1024
+
+
+def _decode(line: bytes, encoding: str) -> str:
+    return line.rstrip(b"\r").decode(encoding, errors="replace")
+
+
+def read_last_lines(
+    fh: BinaryIO,
+    n: int,
+    *,
+    end: Optional[int] = None,
+    block_size: int = DEFAULT_BLOCK_SIZE,
+) -> Tuple[List[bytes], bytes, bool]:
+    """Return ``(lines, partial, at_start)`` for the last ``n`` lines before ``end``.
+
+    ``fh`` is a binary file object. Blocks are read backwards until ``n``
+    complete lines are found or the start of the file is reached (``at_start``).
+    ``partial`` is a trailing fragment without its newline yet.
+    """
+    if end is None:
+        fh.seek(0, os.SEEK_END)
+        end = fh.tell()
+    pos = end
+    buf = b""
+    # One extra newline is needed to know the earliest line is complete.
+    while pos > 0 and buf.count(b"\n") <= n:
+        step = min(block_size, pos)
+        pos -= step
+        fh.seek(pos)
+        buf = fh.read(step) + buf
+    body, sep, partial = buf.rpartition(b"\n")
+    if not sep:
+        body, partial = b"", buf
+    lines = body.split(b"\n") if sep else []
+    at_start = pos == 0 and len(lines) <= n
+    return lines[-n:] if n > 0 else [], partial, at_start
+
+
+class LogTailer:
+    """Follow one file, keeping up to ``max_lines`` recent lines in memory."""
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        *,
+        max_lines: int = DEFAULT_MAX_LINES,
+        block_size: int = DEFAULT_BLOCK_SIZE,
+        max_append: int = DEFAULT_MAX_APPEND,
+        encoding: str = "utf-8",
+    ) -> None:
+        """Tail ``path``, reading backwards in ``block_size`` chunks on first load."""
+        self.path = Path(path)
+        self.max_lines = max_lines
+        self.block_size = block_size
+        self.max_append = max_append
+        self.encoding = encoding
+        self.offset = 0
+        self.identity: Optional[Tuple[int, int]] = None
+        self.resets = 0  # rotations/truncations seen
+        self._lines: Deque[str] = deque(maxlen=max_lines)
+        self._partial = b""
+        self._from_start = False  # the ring holds every line from byte 0
+        self._lock = threading.Lock()
+
+    def _reset(self) -> None:
+        self.offset = 0
+        self.identity = None
+        self._lines.clear()
+        self._partial = b""
+        self._from_start = False
+
+    def _seed(self, fh: BinaryIO, size: int, n: int) -> None:
+        want = min(max(n, 1), self.max_lines)
+        lines, partial, at_start = read_last_lines(
+            fh, want, end=size, block_size=self.block_size
+        )
+        self._lines.clear()
+        self._lines.extend(_decode(b, self.encoding) for b in lines)
+        self._partial = partial
+        self._from_start = at_start
+        self.offset = size
+
+    def _append(self, fh: BinaryIO, size: int) -> None:
+        fh.seek(self.offset)
+        data = self._partial + fh.read(size - self.offset)
+        self.offset = size
+        body, sep, self._partial = data.rpartition(b"\n")
+        if not sep:
+            return
+        if len(self._lines) + body.count(b"\n") + 1 > self.max_lines:
+            self._from_start = False
+        self._lines.extend(_decode(b, self.encoding) for b in body.split(b"\n"))
+
+    def read(self, n: int = 500) -> List[str]:
+        """Return the last ``n`` lines (a trailing unterminated line included)."""
+        n = min(n, self.max_lines)
+        with self._lock:
+            try:
+                st = self.path.stat()
+            except OSError:
+                self._reset()
+                return []
+            identity = (st.st_dev, st.st_ino)
+            if self.identity is not None and (
+                identity != self.identity or st.st_size < self.offset
+            ):
+                self._reset()
+                self.resets += 1
+            have_enough = self._from_start or len(self._lines) >= n
+            grown = st.st_size - self.offset
+            if self.identity is None or not have_enough or grown > self.max_append:
+                with self.path.open("rb") as fh:
+                    self._seed(fh, st.st_size, n)
+            elif grown > 0:
+                with self.path.open("rb") as fh:
+                    self._append(fh, st.st_size)
+            self.identity = identity
+            out = list(self._lines)
+            if self._partial:
+                out.append(_decode(self._partial, self.encoding))
+            return out[-n:] if n > 0 else []
+
+    def text(self, n: int = 500) -> str:
+        """Return ``read(n)`` joined with newlines."""
+        return "\n".join(self.read(n))
+
+
+def cached_tailer(
+    cache: MutableMapping[str, LogTailer],
+    path: Union[str, Path],
+    *,
+    encoding: str = "utf-8",
+    limit: int = 8,
+) -> LogTailer:
+    """Return the tailer for ``path`` from ``cache`` (e.g. a session's state), keeping the ``limit`` most recent."""
+    key = str(path)
+    tailer = cache.pop(key, None)
+    if tailer is None or tailer.encoding != encoding:
+        tailer = LogTailer(path, encoding=encoding)
+    cache[key] = tailer  # most recently used last
+    while len(cache) > limit:
+        cache.pop(next(iter(cache)))
+    return tailer
@@ -0,0 +1,313 @@
+"""In-process counters and fixed-bucket histograms with Prometheus text output.
+
+Metrics are created on first use from the process-wide registry
+(``get_metrics()``) and keyed by label values. ``timed`` wraps graph nodes
+and fetchers; when ``METRICS_ENABLED`` is off every wrapper and ``observe``
+call returns after a single attribute check.
+"""
+
+from __future__ import annotations
+
+import functools
+import inspect
+import threading
+import time
+from bisect import bisect_left
+from pathlib import Path
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+    Union,
+    cast,
+)
+
+from agent.config import Settings
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+# Seconds; covers cache hits (sub-ms) through slow upstream calls.
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.001,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)
+
+LabelKey = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _fmt(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(
+        self, registry: MetricsRegistry, name: str, help: str, labelnames: Sequence[str]
+    ) -> None:
+        """Declare ``name`` in ``registry`` with the given label names."""
+        self._registry = registry
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, Any]) -> LabelKey:
+        return tuple(str(labels.get(n, "")) for n in self.labelnames)
+
+    def _header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+    def render(self) -> List[str]:
+        """Return this metric's exposition lines."""
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonic counter per label set."""
+
+    kind = "counter"
+
+    def __init__(
+        self, registry: MetricsRegistry, name: str, help: str, labelnames: Sequence[str]
+    ) -> None:
+        """Declare the counter ``name`` in ``registry``."""
+        super().__init__(registry, name, help, labelnames)
+        self._values: Dict[LabelKey, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        """Add ``amount`` to the series for ``labels``."""
+        if not self._registry.enabled:
+            return
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: Any) -> float:
+        """Return the current value for ``labels``."""
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def render(self) -> List[str]:
+        """Return the HELP/TYPE header and one sample line per label set."""
+        with self._lock:
+            items = sorted(self._values.items())
+        return self._header() + [
+            f"{self.name}{_labels(self.labelnames, k)} {_fmt(v)}" for k, v in items
+        ]
+
+
+class Histogram(_Metric):
+    """Fixed-bucket histogram per label set (``le`` buckets are cumulative on output)."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        registry: MetricsRegistry,
+        name: str,
+        help: str,
+        labelnames: Sequence[str],
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        """Declare the histogram ``name`` with upper bounds ``buckets``."""
+        super().__init__(registry, name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label key -> [per-bucket counts (+Inf last), sum, count]
+        self._series: Dict[LabelKey, List[Any]] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        """Record one observation for ``labels``."""
+        if not self._registry.enabled:
+            return
+        key = self._key(labels)
+        idx = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][idx] += 1
+            series[1] += value
+            series[2] += 1
+
+    def count(self, **labels: Any) -> int:
+        """Return the number of observations for ``labels``."""
+        with self._lock:
+            series = self._series.get(self._key(labels))
+            return series[2] if series else 0
+
+    def render(self) -> List[str]:
+        """Return the header plus cumulative buckets, sum and count per label set."""
+        with self._lock:
+            items = sorted(
+                (k, (list(s[0]), s[1], s[2])) for k, s in self._series.items()
+            )
+        lines = self._header()
+        for key, (counts, total, n) in items:
+            running = 0
+            for bound, c in zip((*self.buckets, float("inf")), counts):
+                running += c
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{_fmt(bound)}"'
+                lines.append(
+                    f"{self.name}_bucket{_labels(self.labelnames, key, le)} {running}"
+                )
+            lines.append(
+                f"{self.name}_sum{_labels(self.labelnames, key)} {_fmt(total)}"
+            )
+            lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {n}")
+        return lines
+
+
+class MetricsRegistry:
+    """Named metrics; ``counter``/``histogram`` return the existing metric when re-declared."""
+
+    def __init__(self, *, enabled: bool = True) -> None:
+        """Create an empty registry; ``enabled=False`` makes updates no-ops."""
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._metrics: Dict[str, _Metric] = {}
+
+    def _get(
+        self, cls: type, name: str, help: str, labelnames: Sequence[str], **kw: Any
+    ) -> Any:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(self, name, help, labelnames, **kw)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"metric {name!r} already registered as {metric.kind}")
+            return metric
+
+    def counter(
+        self, name: str, help: str = "", labelnames: Sequence[str] = ()
+    ) -> Counter:
+        """Return (creating if needed) the counter ``name``."""
+        return cast(Counter, self._get(Counter, name, help, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        help: str = "",
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        """Return (creating if needed) the histogram ``name``."""
+        return cast(
+            Histogram, self._get(Histogram, name, help, labelnames, buckets=buckets)
+        )
+
+    def render(self) -> str:
+        """Return every metric in the Prometheus text exposition format."""
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda m: m.name)
+        lines: List[str] = []
+        for m in metrics:
+            lines.extend(m.render())
+        return "\n".join(lines) + "\n" if lines else ""
+
+    def write(self, path: Union[str, Path]) -> Path:
+        """Dump ``render()`` to ``path`` (written atomically)."""
+        dest = Path(path)
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        tmp = dest.with_suffix(dest.suffix + ".tmp")
+        tmp.write_text(self.render(), encoding="utf-8")
+        tmp.replace(dest)
+        return dest
+
+
+_registry: Optional[MetricsRegistry] = None
+_lock = threading.Lock()
+
+
+def get_metrics() -> MetricsRegistry:
+    """Return the process-wide registry (enabled per ``METRICS_ENABLED``)."""
+    global _registry
+    if _registry is None:
+        with _lock:
+            if _registry is None:
+                _registry = MetricsRegistry(enabled=Settings.load().metrics_enabled)
+    return _registry
+
+
+def configure_metrics(registry: Optional[MetricsRegistry] = None) -> None:
+    """Install ``registry`` process-wide (``None`` rebuilds it from ``Settings``)."""
+    global _registry
+    with _lock:
+        _registry = registry
+
+
+def timed(metric: str, help: str = "", **labels: str) -> Callable[[F], F]:
+    """Decorate a sync or async callable to observe its duration in ``metric``.
+
+    The histogram gets the fixed ``labels`` plus ``status`` (``ok`` or the
+    exception class name). The signature is preserved, so graph nodes still
+    receive ``runtime``.
+    """
+    labelnames = (*labels, "status")
+
+    def decorate(fn: F) -> F:
+        def _observe(start: float, status: str) -> None:
+            get_metrics().histogram(metric, help, labelnames).observe(
+                time.perf_counter() - start, status=status, **labels
+            )
+
+        if inspect.iscoroutinefunction(fn):
+
+            @functools.wraps(fn)
+            async def awrapper(*args: Any, **kwargs: Any) -> Any:
+                if not get_metrics().enabled:
+                    return await fn(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    result = await fn(*args, **kwargs)
+                except BaseException as e:
+                    _observe(start, type(e).__name__)
+                    raise
+                _observe(start, "ok")
+                return result
+
+            return awrapper  # type: ignore[return-value]
+
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not get_metrics().enabled:
+                return fn(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                result = fn(*args, **kwargs)
+            except BaseException as e:
+                _observe(start, type(e).__name__)
+                raise
+            _observe(start, "ok")
+            return result
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorate
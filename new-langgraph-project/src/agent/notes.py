@@ -0,0 +1,695 @@
+"""Note store backends behind the mem0 graphs and the dashboard Mem0 section.
+
+``SqliteNoteStore`` (default) keeps one row per note in a WAL-mode SQLite
+file: adds are single-row inserts, listing reads titles only, and several
+processes (API server, dashboard) can write concurrently. ``Mem0NoteStore``
+wraps the legacy ``mem0_mcp`` JSON file store. On first use the SQLite store
+imports an existing mem0 JSON file, so switching backends keeps old notes.
+
+Search uses an FTS5 inverted index over title, content and tags plus a
+``note_tags`` table for tag filters; both are kept current by triggers on
+insert, so every add updates the index incrementally.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Protocol,
+    Tuple,
+    Union,
+    cast,
+)
+
+from agent.config import Settings
+from agent.profiling import default_logs_dir
+
+try:
+    from mem0_mcp import store as _mem0_store  # type: ignore
+except Exception:  # pragma: no cover - optional dependency
+    _mem0_store = None
+
+MEM0_MISSING = "mem0_mcp not installed. Install D:/mem0 or pip install mem0-mcp."
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS notes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    title TEXT NOT NULL,
+    content TEXT NOT NULL DEFAULT '',
+    tags TEXT NOT NULL DEFAULT '[]',
+    created_at REAL NOT NULL,
+    extra TEXT
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# Search index, maintained by triggers. Created separately because FTS5 may be
+# missing from the local SQLite build; search then falls back to LIKE.
+_TAGS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS note_tags (
+    tag TEXT NOT NULL COLLATE NOCASE,
+    note_id INTEGER NOT NULL,
+    PRIMARY KEY (tag, note_id)
+) WITHOUT ROWID;
+CREATE TRIGGER IF NOT EXISTS notes_tags_ai AFTER INSERT ON notes BEGIN
+    INSERT OR IGNORE INTO note_tags (tag, note_id) SELECT value, new.id FROM json_each(new.tags);
+END;
+CREATE TRIGGER IF NOT EXISTS notes_tags_ad AFTER DELETE ON notes BEGIN
+    DELETE FROM note_tags WHERE note_id = old.id;
+END;
+"""
+
+_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS notes_fts USING fts5(
+    title, content, tags, content='notes', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS notes_fts_ai AFTER INSERT ON notes BEGIN
+    INSERT INTO notes_fts (rowid, title, content, tags) VALUES (new.id, new.title, new.content, new.tags);
+END;
+CREATE TRIGGER IF NOT EXISTS notes_fts_ad AFTER DELETE ON notes BEGIN
+    INSERT INTO notes_fts (notes_fts, rowid, title, content, tags) VALUES ('delete', old.id, old.title, old.content, old.tags);
+END;
+"""
+
+DEFAULT_PAGE_SIZE = 100
+DEFAULT_BULK_BATCH = 500
+
+# (title, content, parsed tags) as handed to ``add_many``.
+NoteRecord = Tuple[str, str, List[str]]
+
+# bm25 column weights: title, content, tags.
+_BM25_WEIGHTS = (10.0, 1.0, 5.0)
+
+_NOTE_FIELDS = ("id", "title", "content", "tags", "created_at")
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def fts_query(text: str) -> str:
+    """Turn free text into a safe FTS5 query: all words, last one as a prefix."""
+    tokens = _TOKEN_RE.findall(text or "")
+    if not tokens:
+        return ""
+    quoted = [f'"{t}"' for t in tokens]
+    quoted[-1] += "*"
+    return " ".join(quoted)
+
+
+def parse_tags(tags: Union[str, Iterable[str], None]) -> List[str]:
+    """Split a comma separated string (or clean a list) into tags."""
+    if tags is None:
+        return []
+    parts = tags.split(",") if isinstance(tags, str) else tags
+    return [t.strip() for t in parts if t and t.strip()]
+
+
+class NoteStore(Protocol):
+    """Operations the mem0 graphs and the dashboard need."""
+
+    backend: str
+
+    def add(self, title: str, content: str, tags: Iterable[str] = ()) -> Dict[str, Any]:
+        """Persist one note and return it."""
+        ...
+
+    def add_many(self, records: List[NoteRecord]) -> int:
+        """Insert pre-validated notes together; return how many were added."""
+        ...
+
+    def list_titles(self) -> List[str]:
+        """Return note titles in insertion order."""
+        ...
+
+    def dump(self) -> Dict[str, Any]:
+        """Return ``{"notes": [...]}`` with every note."""
+        ...
+
+    def page(
+        self,
+        cursor: Optional[int] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+        *,
+        titles_only: bool = False,
+    ) -> Dict[str, Any]:
+        """Return ``{"notes": [...], "next_cursor": ...}`` starting after ``cursor``."""
+        ...
+
+    def count(self) -> int:
+        """Return the number of notes."""
+        ...
+
+    def search(
+        self,
+        query: str = "",
+        *,
+        tags: Iterable[str] = (),
+        match_all: bool = True,
+        limit: int = 20,
+        offset: int = 0,
+    ) -> Dict[str, Any]:
+        """Return ranked matches as ``{"total", "results", "next_offset"}``."""
+        ...
+
+
+def iter_pages(
+    store: NoteStore,
+    *,
+    cursor: Optional[int] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    titles_only: bool = False,
+) -> Iterator[Dict[str, Any]]:
+    """Yield successive pages from ``store`` until the cursor runs out."""
+    while True:
+        page = store.page(cursor, limit, titles_only=titles_only)
+        if page["notes"]:
+            yield page
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return
+
+
+def _note_record(raw: Any) -> NoteRecord:
+    """Validate one bulk item; raise ``ValueError`` with a readable reason."""
+    if not isinstance(raw, dict):
+        raise ValueError(f"expected an object, got {type(raw).__name__}")
+    title = str(raw.get("title") or "").strip()
+    content = str(raw.get("content") or "")
+    if not title and not content:
+        raise ValueError("note has neither title nor content")
+    return title or "(untitled)", content, parse_tags(raw.get("tags"))
+
+
+def iter_bulk_items(
+    notes: Optional[Iterable[Any]] = None, path: Optional[Union[str, Path]] = None
+) -> Iterator[Tuple[int, Union[NoteRecord, str]]]:
+    """Yield ``(position, record or error message)`` from a list and/or a JSONL file.
+
+    List items are numbered from 0; JSONL items by their 1-based line number,
+    read lazily so large files are never loaded whole. Blank lines are skipped.
+    """
+    for i, raw in enumerate(notes or ()):
+        try:
+            yield i, _note_record(raw)
+        except ValueError as e:
+            yield i, str(e)
+    if path:
+        with open(path, encoding="utf-8") as fh:
+            for lineno, line in enumerate(fh, 1):
+                if not line.strip():
+                    continue
+                try:
+                    yield lineno, _note_record(json.loads(line))
+                except ValueError as e:  # json.JSONDecodeError is a ValueError
+                    yield lineno, str(e)
+
+
+def bulk_add(
+    store: NoteStore,
+    items: Iterable[Tuple[int, Union[NoteRecord, str]]],
+    *,
+    batch_size: int = DEFAULT_BULK_BATCH,
+) -> Iterator[Dict[str, Any]]:
+    """Write ``items`` (from ``iter_bulk_items``) in batches, yielding progress after each.
+
+    Each progress dict carries running ``added``/``failed`` totals and the
+    ``failures`` (``{"position", "error"}``) of that batch. A batch whose write
+    fails is retried note by note so only the offending notes are reported.
+    """
+    batch_size = max(1, int(batch_size))
+    added = failed = 0
+    batch: List[Tuple[int, NoteRecord]] = []
+    failures: List[Dict[str, Any]] = []
+
+    def flush() -> Dict[str, Any]:
+        nonlocal added, failed, batch, failures
+        if batch:
+            try:
+                added += store.add_many([rec for _, rec in batch])
+            except Exception:
+                for pos, rec in batch:
+                    try:
+                        added += store.add_many([rec])
+                    except Exception as e:
+                        failures.append({"position": pos, "error": str(e)})
+        failed += len(failures)
+        out = {"added": added, "failed": failed, "failures": failures}
+        batch, failures = [], []
+        return out
+
+    for pos, item in items:
+        if isinstance(item, str):
+            failures.append({"position": pos, "error": item})
+        else:
+            batch.append((pos, item))
+        if len(batch) + len(failures) >= batch_size:
+            yield flush()
+    if batch or failures:
+        yield flush()
+
+
+def _legacy_json_path() -> Path:
+    return Path(os.getenv("MEM0_PATH") or "mem0.json")
+
+
+class SqliteNoteStore:
+    """Note store in a single SQLite database (WAL mode)."""
+
+    backend = "sqlite"
+
+    def __init__(
+        self, path: Union[str, Path], *, legacy_json: Optional[Union[str, Path]] = None
+    ) -> None:
+        """Open the database at ``path``; ``legacy_json`` is imported on first use."""
+        self.path = Path(path)
+        if str(path) != ":memory:":
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        # Autocommit; writes open explicit transactions. busy_timeout lets
+        # concurrent writers in other processes wait instead of failing.
+        self._conn = sqlite3.connect(
+            str(path), check_same_thread=False, isolation_level=None, timeout=30.0
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self.has_fts = self._init_index()
+        if legacy_json is not None:
+            self.migrate_json(legacy_json)
+
+    def _init_index(self) -> bool:
+        """Create the search index, backfilling notes written before it existed."""
+        self._conn.executescript(_TAGS_SCHEMA)
+        try:
+            self._conn.executescript(_FTS_SCHEMA)
+            has_fts = True
+        except sqlite3.OperationalError:  # pragma: no cover - SQLite built without FTS5
+            has_fts = False
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                if not self._conn.execute(
+                    "SELECT 1 FROM meta WHERE key = 'index_built'"
+                ).fetchone():
+                    self._conn.execute(
+                        "INSERT OR IGNORE INTO note_tags (tag, note_id) SELECT j.value, n.id FROM notes n, json_each(n.tags) j"
+                    )
+                    if has_fts:
+                        self._conn.execute(
+                            "INSERT INTO notes_fts (notes_fts) VALUES ('rebuild')"
+                        )
+                        self._conn.execute(
+                            "INSERT INTO meta (key, value) VALUES ('index_built', '1')"
+                        )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return has_fts
+
+    def close(self) -> None:
+        """Close the connection."""
+        with self._lock:
+            self._conn.close()
+
+    @staticmethod
+    def _row(row: Any) -> Dict[str, Any]:
+        note_id, title, content, tags, created_at, extra = row
+        note: Dict[str, Any] = json.loads(extra) if extra else {}
+        note.update(
+            {
+                "id": note_id,
+                "title": title,
+                "content": content,
+                "tags": json.loads(tags),
+                "created_at": created_at,
+            }
+        )
+        return note
+
+    def add(self, title: str, content: str, tags: Iterable[str] = ()) -> Dict[str, Any]:
+        """Insert one note (a single-row append)."""
+        tag_list = parse_tags(tags)
+        now = time.time()
+        with self._lock:
+            cur = self._conn.execute(
+                "INSERT INTO notes (title, content, tags, created_at) VALUES (?, ?, ?, ?)",
+                (title or "(untitled)", content or "", json.dumps(tag_list), now),
+            )
+            note_id = cur.lastrowid
+        return {
+            "id": note_id,
+            "title": title or "(untitled)",
+            "content": content or "",
+            "tags": tag_list,
+            "created_at": now,
+        }
+
+    def add_many(self, records: List[NoteRecord]) -> int:
+        """Insert ``records`` in one transaction (all or nothing)."""
+        now = time.time()
+        rows = [
+            (title, content, json.dumps(tags), now) for title, content, tags in records
+        ]
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany(
+                    "INSERT INTO notes (title, content, tags, created_at) VALUES (?, ?, ?, ?)",
+                    rows,
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return len(rows)
+
+    def list_titles(self) -> List[str]:
+        """Return titles only; note bodies are never read."""
+        with self._lock:
+            return [
+                r[0] for r in self._conn.execute("SELECT title FROM notes ORDER BY id")
+            ]
+
+    def dump(self) -> Dict[str, Any]:
+        """Return every note in the mem0 ``{"notes": [...]}`` layout."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, title, content, tags, created_at, extra FROM notes ORDER BY id"
+            ).fetchall()
+        return {"notes": [self._row(r) for r in rows]}
+
+    def page(
+        self,
+        cursor: Optional[int] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+        *,
+        titles_only: bool = False,
+    ) -> Dict[str, Any]:
+        """Keyset page of notes with ``id > cursor``; ``next_cursor`` is ``None`` at the end."""
+        limit = max(1, int(limit))
+        cols = (
+            "id, title"
+            if titles_only
+            else "id, title, content, tags, created_at, extra"
+        )
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {cols} FROM notes WHERE id > ? ORDER BY id LIMIT ?",
+                (cursor or 0, limit + 1),
+            ).fetchall()
+        more = len(rows) > limit
+        rows = rows[:limit]
+        notes = [r[1] for r in rows] if titles_only else [self._row(r) for r in rows]
+        return {"notes": notes, "next_cursor": rows[-1][0] if more else None}
+
+    def count(self) -> int:
+        """Return the number of notes."""
+        with self._lock:
+            return int(self._conn.execute("SELECT count(*) FROM notes").fetchone()[0])
+
+    def search(
+        self,
+        query: str = "",
+        *,
+        tags: Iterable[str] = (),
+        match_all: bool = True,
+        limit: int = 20,
+        offset: int = 0,
+    ) -> Dict[str, Any]:
+        """Rank notes by bm25 (title > tags > content), optionally filtered by tags.
+
+        With ``match_all`` a note must carry every tag, otherwise any of them.
+        Without a query, tag matches are returned newest first.
+        """
+        tag_list = parse_tags(tags)
+        limit = max(1, min(int(limit), 500))
+        offset = max(0, int(offset))
+        where: List[str] = []
+        args: List[Any] = []
+        if tag_list:
+            sub = f"SELECT note_id FROM note_tags WHERE tag IN ({','.join('?' * len(tag_list))})"
+            args.extend(tag_list)
+            if match_all:
+                sub += " GROUP BY note_id HAVING count(*) = ?"
+                args.append(len(tag_list))
+            where.append(f"n.id IN ({sub})")
+        match = fts_query(query)
+        if match and self.has_fts:
+            base = "FROM notes_fts JOIN notes n ON n.id = notes_fts.rowid WHERE notes_fts MATCH ?"
+            args.insert(0, match)
+            select = (
+                "SELECT n.id, n.title, n.tags, n.created_at, bm25(notes_fts, ?, ?, ?) AS score,"
+                " snippet(notes_fts, 1, '[', ']', '…', 12) "
+            )
+            select_args: List[Any] = list(_BM25_WEIGHTS)
+            order = "ORDER BY score, n.id DESC"
+        else:
+            base = "FROM notes n WHERE 1 = 1"
+            if match:  # no FTS5: unranked substring match on every word
+                for tok in _TOKEN_RE.findall(query):
+                    where.append(
+                        "(n.title LIKE ? OR n.content LIKE ? OR n.tags LIKE ?)"
+                    )
+                    args.extend([f"%{tok}%"] * 3)
+            select = "SELECT n.id, n.title, n.tags, n.created_at, 0.0 AS score, substr(n.content, 1, 120) "
+            select_args = []
+            order = "ORDER BY n.id DESC"
+        cond = "".join(f" AND {w}" for w in where)
+        with self._lock:
+            total = int(
+                self._conn.execute(f"SELECT count(*) {base}{cond}", args).fetchone()[0]
+            )
+            rows = self._conn.execute(
+                f"{select}{base}{cond} {order} LIMIT ? OFFSET ?",
+                [*select_args, *args, limit, offset],
+            ).fetchall()
+        results = [
+            {
+                "id": i,
+                "title": t,
+                "tags": json.loads(tg),
+                "created_at": c,
+                "score": -sc if sc else 0.0,
+                "snippet": sn,
+            }
+            for i, t, tg, c, sc, sn in rows
+        ]
+        nxt = offset + len(results)
+        return {
+            "total": total,
+            "results": results,
+            "next_offset": nxt if nxt < total else None,
+        }
+
+    def migrate_json(self, path: Union[str, Path]) -> int:
+        """Import notes from a mem0 JSON file once; return how many were added.
+
+        The file's resolved path is recorded, so calling this again (or from
+        another process) does not duplicate notes.
+        """
+        src = Path(path)
+        if not src.is_file():
+            return 0
+        marker = f"migrated:{src.resolve()}"
+        with self._lock:
+            if self._conn.execute(
+                "SELECT 1 FROM meta WHERE key = ?", (marker,)
+            ).fetchone():
+                return 0
+        try:
+            data = json.loads(src.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return 0
+        notes = data.get("notes", []) if isinstance(data, dict) else []
+        rows = []
+        for n in notes:
+            if not isinstance(n, dict):
+                continue
+            extra = {k: v for k, v in n.items() if k not in _NOTE_FIELDS}
+            created = n.get("created_at")
+            rows.append(
+                (
+                    str(n.get("title") or "(untitled)"),
+                    str(n.get("content") or ""),
+                    json.dumps(parse_tags(n.get("tags"))),
+                    float(created)
+                    if isinstance(created, (int, float))
+                    else time.time(),
+                    json.dumps(extra) if extra else None,
+                )
+            )
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                if self._conn.execute(
+                    "SELECT 1 FROM meta WHERE key = ?", (marker,)
+                ).fetchone():
+                    self._conn.execute("ROLLBACK")
+                    return 0
+                self._conn.executemany(
+                    "INSERT INTO notes (title, content, tags, created_at, extra) VALUES (?, ?, ?, ?, ?)",
+                    rows,
+                )
+                self._conn.execute(
+                    "INSERT INTO meta (key, value) VALUES (?, ?)",
+                    (marker, str(len(rows))),
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return len(rows)
+
+
+class Mem0NoteStore:
+    """Legacy backend: the ``mem0_mcp`` JSON file (rewritten on every add)."""
+
+    backend = "mem0"
+
+    def __init__(self) -> None:
+        """Wrap ``mem0_mcp``; raise ``RuntimeError`` when it is not installed."""
+        if _mem0_store is None:
+            raise RuntimeError(MEM0_MISSING)
+        self._store = _mem0_store
+
+    def add(self, title: str, content: str, tags: Iterable[str] = ()) -> Dict[str, Any]:
+        """Append a note through ``mem0_mcp``."""
+        tag_list = parse_tags(tags)
+        self._store.add_note(title or "(untitled)", content or "", tag_list)
+        return {
+            "title": title or "(untitled)",
+            "content": content or "",
+            "tags": tag_list,
+        }
+
+    def add_many(self, records: List[NoteRecord]) -> int:
+        """Add notes one by one; ``mem0_mcp`` has no batch write."""
+        for title, content, tags in records:
+            self._store.add_note(title, content, tags)
+        return len(records)
+
+    def list_titles(self) -> List[str]:
+        """Return note titles."""
+        return [
+            n.get("title", "(untitled)")
+            for n in self._store.load_mem().get("notes", [])
+        ]
+
+    def dump(self) -> Dict[str, Any]:
+        """Return the whole mem0 document."""
+        return cast(Dict[str, Any], self._store.load_mem())
+
+    def page(
+        self,
+        cursor: Optional[int] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+        *,
+        titles_only: bool = False,
+    ) -> Dict[str, Any]:
+        """Slice of the mem0 document; the cursor is a list position."""
+        start, limit = cursor or 0, max(1, int(limit))
+        notes = self._store.load_mem().get("notes", [])
+        chunk = notes[start : start + limit]
+        if titles_only:
+            chunk = [n.get("title", "(untitled)") for n in chunk]
+        end = start + limit
+        return {"notes": chunk, "next_cursor": end if end < len(notes) else None}
+
+    def count(self) -> int:
+        """Return the number of notes."""
+        return len(self._store.load_mem().get("notes", []))
+
+    def search(
+        self,
+        query: str = "",
+        *,
+        tags: Iterable[str] = (),
+        match_all: bool = True,
+        limit: int = 20,
+        offset: int = 0,
+    ) -> Dict[str, Any]:
+        """Linear scan of the JSON document (no index on this backend)."""
+        words = [w.lower() for w in _TOKEN_RE.findall(query or "")]
+        wanted = {t.lower() for t in parse_tags(tags)}
+        hits = []
+        for i, n in enumerate(self._store.load_mem().get("notes", [])):
+            note_tags = {str(t).lower() for t in parse_tags(n.get("tags"))}
+            if wanted and not (
+                wanted <= note_tags if match_all else wanted & note_tags
+            ):
+                continue
+            title = str(n.get("title", "")).lower()
+            text = f"{title} {str(n.get('content', '')).lower()} {' '.join(note_tags)}"
+            if not all(w in text for w in words):
+                continue
+            score = float(sum(3 * title.count(w) + text.count(w) for w in words))
+            hits.append(
+                {
+                    "id": i,
+                    "title": n.get("title", "(untitled)"),
+                    "tags": sorted(note_tags),
+                    "created_at": n.get("created_at"),
+                    "score": score,
+                    "snippet": str(n.get("content", ""))[:120],
+                }
+            )
+        hits.sort(key=lambda h: -h["score"])
+        page = hits[offset : offset + limit]
+        nxt = offset + len(page)
+        return {
+            "total": len(hits),
+            "results": page,
+            "next_offset": nxt if nxt < len(hits) else None,
+        }
+
+
+def default_db_path() -> Path:
+    """Return the default database path, the same from any working directory.
+
+    ``mem0.sqlite3`` next to ``MEM0_PATH`` when that is set, otherwise in the
+    logs directory (``LOGS_DIR``, default ``logs/`` at the repository root),
+    so the API server and the dashboard share one store.
+    """
+    legacy = os.getenv("MEM0_PATH")
+    if legacy:
+        return Path(legacy).resolve().with_name("mem0.sqlite3")
+    return default_logs_dir().resolve() / "mem0.sqlite3"
+
+
+_stores: Dict[str, NoteStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_note_store(settings: Optional[Settings] = None) -> NoteStore:
+    """Return the configured note store (``NOTES_BACKEND``: sqlite | mem0).
+
+    Raises:
+        RuntimeError: if the mem0 backend is selected but not installed.
+    """
+    cfg = settings or Settings.load()
+    if cfg.notes_backend == "mem0":
+        return Mem0NoteStore()
+    path = str(Path(cfg.notes_db_path) if cfg.notes_db_path else default_db_path())
+    store = _stores.get(path)
+    if store is None:
+        with _stores_lock:
+            store = _stores.get(path)
+            if store is None:
+                store = _stores[path] = SqliteNoteStore(
+                    path, legacy_json=_legacy_json_path()
+                )
+    return store
@@ -0,0 +1,384 @@
+"""Opt-in per-node profiling for graph runs.
+
+A run is profiled when its ``Context`` carries ``profile`` (``cprofile`` or
+``sample``) or when ``PROFILE_MODE`` is set; ``PROFILE_NODES`` restricts it to
+some nodes and ``PROFILE_RATE`` to a fraction of invocations.
+
+- ``cprofile`` traces every call and writes ``<ts>-<node>-<id>.pstats``.
+- ``sample`` polls the node's thread stack every ``PROFILE_INTERVAL_MS`` and
+  writes flame-graph compatible collapsed stacks (``.collapsed``). Time an
+  async node spends awaiting is counted under ``(suspended)``.
+
+Profiles go to ``<logs dir>/profiles`` (``LOGS_DIR``, default ``logs/`` at the
+repository root), where the dashboard Logs section lists and summarizes them.
+Only one profile is captured at a time; concurrent nodes run unprofiled. For
+async nodes the file is written from a worker thread so the event loop is not
+blocked on disk I/O.
+
+``cprofile`` hooks the event-loop thread, not the coroutine: while an async
+node awaits, whatever else the loop runs (other nodes, callbacks) is profiled
+too. Use ``sample`` to separate the node's own work from time spent suspended.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import cProfile
+import functools
+import inspect
+import logging
+import os
+import pstats
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from types import CodeType, FrameType
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+from agent.config import Settings
+
+log = logging.getLogger(__name__)
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+MODES = ("cprofile", "sample")
+SUSPENDED = "(suspended)"
+
+
+def default_logs_dir() -> Path:
+    """Return ``LOGS_DIR`` or the ``logs`` folder next to the project directory."""
+    env = os.getenv("LOGS_DIR")
+    if env:
+        return Path(env)
+    return Path(__file__).resolve().parents[3] / "logs"
+
+
+def profiles_dir(logs_dir: Optional[Union[str, Path]] = None) -> Path:
+    """Return the directory profiles are written to."""
+    return Path(logs_dir) if logs_dir else default_logs_dir() / "profiles"
+
+
+@dataclass(frozen=True)
+class ProfileConfig:
+    """Process-wide defaults; a run's ``Context["profile"]`` overrides ``mode``."""
+
+    mode: Optional[str] = None
+    nodes: FrozenSet[str] = frozenset()
+    rate: float = 1.0
+    interval_s: float = 0.005
+    out_dir: Optional[Path] = None
+
+    @staticmethod
+    def from_settings(cfg: Settings) -> ProfileConfig:
+        """Build a config from the ``PROFILE_*`` settings."""
+        mode = cfg.profile_mode if cfg.profile_mode in MODES else None
+        return ProfileConfig(
+            mode=mode,
+            nodes=frozenset(
+                n.strip() for n in cfg.profile_nodes.split(",") if n.strip()
+            ),
+            rate=min(1.0, max(0.0, cfg.profile_rate)),
+            interval_s=max(0.0005, cfg.profile_interval_ms / 1000.0),
+            out_dir=Path(cfg.profile_dir) if cfg.profile_dir else None,
+        )
+
+
+_config: Optional[ProfileConfig] = None
+_config_lock = threading.Lock()
+_active = threading.Lock()  # held while a profile is being captured
+
+
+def get_profile_config() -> ProfileConfig:
+    """Return the process-wide profiling config, built from ``Settings``."""
+    global _config
+    if _config is None:
+        with _config_lock:
+            if _config is None:
+                _config = ProfileConfig.from_settings(Settings.load())
+    return _config
+
+
+def configure_profiling(config: Optional[ProfileConfig] = None) -> None:
+    """Install ``config`` (``None`` re-reads ``Settings``)."""
+    global _config
+    with _config_lock:
+        _config = config
+
+
+def _mode_for(node: str, runtime: Any) -> Optional[str]:
+    cfg = get_profile_config()
+    ctx = getattr(runtime, "context", None) or {}
+    mode = ctx.get("profile") if isinstance(ctx, dict) else None
+    mode = mode or cfg.mode
+    if mode not in MODES:
+        return None
+    if cfg.nodes and node not in cfg.nodes:
+        return None
+    if cfg.rate < 1.0 and random.random() >= cfg.rate:
+        return None
+    return mode
+
+
+def _frame_label(code: CodeType) -> str:
+    where = f"{os.path.basename(code.co_filename)}:{code.co_firstlineno}"
+    return f"{code.co_name} ({where})".replace(";", ":")
+
+
+class _StackSampler:
+    """Background thread sampling one thread's stack below the profiling wrapper."""
+
+    def __init__(self, thread_id: int, interval_s: float) -> None:
+        self.thread_id = thread_id
+        self.interval_s = interval_s
+        self.stacks: Counter[str] = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="profile-sampler", daemon=True
+        )
+
+    def _stack(self, frame: Optional[FrameType]) -> Optional[str]:
+        labels: List[str] = []
+        while frame is not None:
+            if frame.f_code is _CAPTURE_EXIT:
+                return None  # shutting the sampler down, not node work
+            if frame.f_code in _BOUNDARY_CODES:
+                labels.reverse()
+                return ";".join(labels) or SUSPENDED
+            labels.append(_frame_label(frame.f_code))
+            frame = frame.f_back
+        return SUSPENDED  # wrapper not on the stack: the node is awaiting
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_s):
+            stack = self._stack(sys._current_frames().get(self.thread_id))
+            if stack is not None:
+                self.stacks[stack] += 1
+
+    def __enter__(self) -> _StackSampler:
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self._stop.set()
+        self._thread.join()
+
+
+class _Capture:
+    """Capture one node invocation; ``write`` saves the profile afterwards."""
+
+    def __init__(self, node: str, mode: str) -> None:
+        self.node = node
+        self.mode = mode
+        self.path: Optional[Path] = None
+        self._prof: Optional[cProfile.Profile] = None
+        self._sampler: Optional[_StackSampler] = None
+
+    def __enter__(self) -> _Capture:
+        if self.mode == "cprofile":
+            self._prof = cProfile.Profile()
+            self._prof.enable()
+        else:
+            self._sampler = _StackSampler(
+                threading.get_ident(), get_profile_config().interval_s
+            ).__enter__()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        if self._prof is not None:
+            self._prof.disable()
+        if self._sampler is not None:
+            self._sampler.__exit__()
+
+    def write(self) -> None:
+        """Write the captured profile under ``profiles_dir``; failures are logged."""
+        out = profiles_dir(get_profile_config().out_dir)
+        stem = f"{time.strftime('%Y%m%d-%H%M%S')}-{self.node}-{uuid.uuid4().hex[:8]}"
+        try:
+            out.mkdir(parents=True, exist_ok=True)
+            if self._prof is not None:
+                self.path = out / f"{stem}.pstats"
+                self._prof.dump_stats(str(self.path))
+            elif self._sampler is not None:
+                self.path = out / f"{stem}.collapsed"
+                with self.path.open("w", encoding="utf-8") as fh:
+                    for stack, count in self._sampler.stacks.most_common():
+                        fh.write(f"{stack} {count}\n")
+            log.info(
+                "profile_written",
+                extra={"node": self.node, "mode": self.mode, "path": str(self.path)},
+            )
+        except OSError as e:
+            log.warning(
+                "profile_write_failed", extra={"node": self.node, "error": str(e)}
+            )
+
+
+def _runtime_of(args: Any, kwargs: Dict[str, Any]) -> Any:
+    return kwargs.get("runtime", args[1] if len(args) > 1 else None)
+
+
+def profiled(node: str) -> Callable[[F], F]:
+    """Decorate a graph node so selected invocations are profiled.
+
+    Unselected calls cost one config lookup; signatures are preserved so
+    LangGraph still injects ``runtime``.
+    """
+
+    def decorate(fn: F) -> F:
+        if inspect.iscoroutinefunction(fn):
+
+            @functools.wraps(fn)
+            async def aprofiled(*args: Any, **kwargs: Any) -> Any:
+                mode = _mode_for(node, _runtime_of(args, kwargs))
+                if mode is None or not _active.acquire(blocking=False):
+                    return await fn(*args, **kwargs)
+                capture = _Capture(node, mode)
+                try:
+                    with capture:
+                        return await fn(*args, **kwargs)
+                finally:
+                    _active.release()
+                    await asyncio.to_thread(capture.write)
+
+            return aprofiled  # type: ignore[return-value]
+
+        @functools.wraps(fn)
+        def sprofiled(*args: Any, **kwargs: Any) -> Any:
+            mode = _mode_for(node, _runtime_of(args, kwargs))
+            if mode is None or not _active.acquire(blocking=False):
+                return fn(*args, **kwargs)
+            capture = _Capture(node, mode)
+            try:
+                with capture:
+                    return fn(*args, **kwargs)
+            finally:
+                _active.release()
+                capture.write()
+
+        return sprofiled  # type: ignore[return-value]
+
+    return decorate
+
+
+# Every ``profiled`` wrapper shares these code objects; the sampler cuts stacks
+# there so event-loop frames above the node are left out.
+def _wrapper_codes() -> FrozenSet[CodeType]:
+    return frozenset(
+        {profiled("_")(_async_probe).__code__, profiled("_")(_sync_probe).__code__}
+    )
+
+
+# Only the wrapper's code object is used; the probe itself never runs.
+async def _async_probe() -> None:  # pragma: no cover
+    return None
+
+
+# Only the wrapper's code object is used; the probe itself never runs.
+def _sync_probe() -> None:  # pragma: no cover
+    return None
+
+
+_BOUNDARY_CODES = _wrapper_codes()
+_CAPTURE_EXIT = _Capture.__exit__.__code__
+
+
+# ---- reading profiles (dashboard) ----
+def list_profiles(directory: Optional[Union[str, Path]] = None) -> List[Dict[str, Any]]:
+    """Return captured profiles, newest first, with node/mode parsed from the name."""
+    root = Path(directory) if directory else profiles_dir(get_profile_config().out_dir)
+    if not root.is_dir():
+        return []
+    out: List[Dict[str, Any]] = []
+    for p in root.iterdir():
+        if p.suffix not in (".pstats", ".collapsed") or not p.is_file():
+            continue
+        st = p.stat()
+        parts = p.stem.split("-")
+        node = "-".join(parts[2:-1]) if len(parts) > 3 else p.stem
+        out.append(
+            {
+                "path": p,
+                "node": node,
+                "mode": "cprofile" if p.suffix == ".pstats" else "sample",
+                "size": st.st_size,
+                "mtime": st.st_mtime,
+            }
+        )
+    out.sort(key=lambda r: r["mtime"], reverse=True)
+    return out
+
+
+def _top_pstats(path: Path, top: int, sort: str) -> List[Dict[str, Any]]:
+    stats = pstats.Stats(str(path))
+    rows = []
+    for (filename, line, func), (cc, nc, tt, ct, _callers) in stats.stats.items():  # type: ignore[attr-defined]
+        rows.append(
+            {
+                "function": f"{func} ({os.path.basename(filename)}:{line})",
+                "ncalls": nc,
+                "tottime_s": round(tt, 6),
+                "cumtime_s": round(ct, 6),
+            }
+        )
+    key = "tottime_s" if sort == "tottime" else "cumtime_s"
+    rows.sort(key=lambda r: r[key], reverse=True)
+    return rows[:top]
+
+
+def _iter_collapsed(path: Path) -> Iterator[Tuple[List[str], int]]:
+    with path.open(encoding="utf-8") as fh:
+        for line in fh:
+            stack, _, count = line.rstrip("\n").rpartition(" ")
+            if stack and count.isdigit():
+                yield stack.split(";"), int(count)
+
+
+def _top_collapsed(path: Path, top: int, sort: str) -> List[Dict[str, Any]]:
+    own: Counter[str] = Counter()
+    total: Counter[str] = Counter()
+    samples = 0
+    for frames, count in _iter_collapsed(path):
+        samples += count
+        own[frames[-1]] += count
+        for f in set(frames):
+            total[f] += count
+    ranking = own if sort == "tottime" else total
+    return [
+        {
+            "function": f,
+            "self_samples": own[f],
+            "total_samples": total[f],
+            "self_pct": round(100.0 * own[f] / samples, 1) if samples else 0.0,
+            "total_pct": round(100.0 * total[f] / samples, 1) if samples else 0.0,
+        }
+        for f, _ in ranking.most_common(top)
+    ]
+
+
+def summarize_profile(
+    path: Union[str, Path], *, top: int = 20, sort: str = "cumtime"
+) -> List[Dict[str, Any]]:
+    """Return the top-``top`` functions of a ``.pstats`` or ``.collapsed`` profile.
+
+    ``sort`` is ``cumtime`` (inclusive time / samples) or ``tottime`` (own).
+    """
+    p = Path(path)
+    if p.suffix == ".pstats":
+        return _top_pstats(p, top, sort)
+    return _top_collapsed(p, top, sort)
@@ -0,0 +1,204 @@
+"""Client-side rate limiting and quota tracking for The Odds API.
+
+``TokenBucket`` hands out reservations under a short lock and sleeps outside
+it, so the same bucket can be shared by threads and asyncio tasks.
+``QuotaTracker`` follows the ``x-requests-remaining`` / ``x-requests-used``
+headers and slows the bucket down as the remaining quota runs low.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from typing import Any, Callable, Dict, Mapping, Optional
+
+from agent.config import Settings
+
+
+class TokenBucket:
+    """Token bucket refilled at ``rate`` tokens/s up to ``burst`` tokens."""
+
+    def __init__(
+        self, rate: float, burst: int, *, clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        """Start full; ``clock`` is injectable for tests."""
+        self.rate = max(rate, 1e-6)
+        self.burst = max(burst, 1)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._tokens = float(self.burst)
+        self._updated = clock()
+
+    def _reserve(self) -> float:
+        """Take one token, possibly on credit; return how long to wait for it."""
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(
+                self.burst, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            self._tokens -= 1.0
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def set_rate(self, rate: float) -> None:
+        """Change the refill rate; tokens accrued so far are kept."""
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(
+                self.burst, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            self.rate = max(rate, 1e-6)
+
+    def acquire(self) -> float:
+        """Block the calling thread until a token is available; return the wait."""
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def aacquire(self) -> float:
+        """Await a token without blocking the event loop; return the wait."""
+        wait = self._reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+
+class QuotaTracker:
+    """Latest quota state reported by the upstream in response headers."""
+
+    def __init__(self) -> None:
+        """Start with no quota information."""
+        self._lock = threading.Lock()
+        self.remaining: Optional[int] = None
+        self.used: Optional[int] = None
+        self.last_cost: Optional[int] = None
+        self.updated_at: Optional[float] = None
+
+    def update(self, headers: Mapping[str, str]) -> bool:
+        """Record quota headers; return ``True`` if any were present."""
+
+        def _int(name: str) -> Optional[int]:
+            raw = headers.get(name)
+            try:
+                return int(float(raw)) if raw is not None else None
+            except ValueError:
+                return None
+
+        remaining = _int("x-requests-remaining")
+        used = _int("x-requests-used")
+        last = _int("x-requests-last")
+        if remaining is None and used is None:
+            return False
+        with self._lock:
+            self.remaining = remaining if remaining is not None else self.remaining
+            self.used = used if used is not None else self.used
+            self.last_cost = last if last is not None else self.last_cost
+            self.updated_at = time.time()
+        return True
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the quota state as a plain dict."""
+        with self._lock:
+            return {
+                "remaining": self.remaining,
+                "used": self.used,
+                "last_cost": self.last_cost,
+                "updated_at": self.updated_at,
+            }
+
+
+class RateLimiter:
+    """Token bucket paced by the upstream's remaining quota.
+
+    Below ``slow_below`` remaining requests the refill rate is scaled down
+    linearly (never under ``min_fraction`` of ``rate``); below ``reserve``
+    low-priority work should be shed or deferred.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int,
+        *,
+        slow_below: int = 100,
+        reserve: int = 20,
+        min_fraction: float = 0.05,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Pace at ``rate`` requests/s with bursts of ``burst`` until quota runs low."""
+        self.base_rate = rate
+        self.slow_below = slow_below
+        self.reserve = reserve
+        self.min_fraction = min_fraction
+        self.bucket = TokenBucket(rate, burst, clock=clock)
+        self.quota = QuotaTracker()
+
+    def acquire(self) -> float:
+        """Wait for permission to send one request (thread-safe)."""
+        return self.bucket.acquire()
+
+    async def aacquire(self) -> float:
+        """Wait for permission to send one request (asyncio-safe)."""
+        return await self.bucket.aacquire()
+
+    def observe(self, headers: Mapping[str, str]) -> None:
+        """Update quota from response headers and re-pace the bucket."""
+        if not self.quota.update(headers):
+            return
+        remaining = self.quota.remaining
+        if remaining is None or self.slow_below <= 0 or remaining >= self.slow_below:
+            self.bucket.set_rate(self.base_rate)
+            return
+        fraction = max(self.min_fraction, remaining / self.slow_below)
+        self.bucket.set_rate(self.base_rate * fraction)
+
+    def should_shed(self, priority: str = "normal") -> bool:
+        """Return ``True`` when work of ``priority`` should be deferred."""
+        remaining = self.quota.remaining
+        if remaining is None:
+            return False
+        if remaining <= 0:
+            return priority != "high"
+        return priority == "low" and remaining < self.reserve
+
+    def state(self) -> Dict[str, Any]:
+        """Return quota plus current pacing, for dashboards and graph runs."""
+        out = self.quota.snapshot()
+        out.update(
+            {
+                "rate_per_s": self.bucket.rate,
+                "base_rate_per_s": self.base_rate,
+                "reserve": self.reserve,
+            }
+        )
+        return out
+
+
+_odds_limiter: Optional[RateLimiter] = None
+_limiter_lock = threading.Lock()
+
+
+def get_odds_limiter() -> RateLimiter:
+    """Return the process-wide limiter for The Odds API, built from ``Settings``."""
+    global _odds_limiter
+    if _odds_limiter is None:
+        with _limiter_lock:
+            if _odds_limiter is None:
+                cfg = Settings.load()
+                _odds_limiter = RateLimiter(
+                    cfg.odds_rate_per_s,
+                    cfg.odds_burst,
+                    slow_below=cfg.odds_quota_slow_below,
+                    reserve=cfg.odds_quota_reserve,
+                )
+    return _odds_limiter
+
+
+def configure_odds_limiter(limiter: Optional[RateLimiter] = None) -> None:
+    """Install ``limiter`` process-wide; ``None`` rebuilds it from ``Settings``."""
+    global _odds_limiter
+    with _limiter_lock:
+        _odds_limiter = limiter
@@ -0,0 +1,297 @@
+"""Retry policy and per-host circuit breakers for upstream calls.
+
+``RetryPolicy`` decides whether a failure is worth retrying and how long to
+wait: ``Retry-After`` when the upstream sends one, otherwise exponential
+backoff with full jitter. ``CircuitBreaker`` stops calling a host that keeps
+failing and lets a single probe through after a cool-down.
+"""
+
+from __future__ import annotations
+
+import email.utils
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, FrozenSet, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from agent.config import Settings
+
+RETRYABLE_STATUSES: FrozenSet[int] = frozenset({408, 425, 429, 500, 502, 503, 504})
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling a host whose circuit is open."""
+
+    def __init__(self, host: str, retry_in_s: float) -> None:
+        """Name the ``host`` and how long until it may be probed again."""
+        super().__init__(f"circuit open for {host}; retry in {retry_in_s:.1f}s")
+        self.host = host
+        self.retry_in_s = retry_in_s
+
+
+def parse_retry_after(
+    value: Optional[str], *, now: Optional[float] = None
+) -> Optional[float]:
+    """Parse a ``Retry-After`` header (delta-seconds or HTTP-date) into seconds."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when is None:
+        return None
+    return max(0.0, when.timestamp() - (time.time() if now is None else now))
+
+
+def _status_of(exc: BaseException) -> Optional[int]:
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code
+    return None
+
+
+@dataclass
+class RetryPolicy:
+    """Classify failures and compute the wait before the next attempt."""
+
+    base_delay_s: float = 0.25
+    max_delay_s: float = 8.0
+    max_retry_after_s: float = 60.0
+    retry_statuses: FrozenSet[int] = RETRYABLE_STATUSES
+    rng: random.Random = field(default_factory=random.Random, repr=False)
+
+    def is_retryable(self, exc: BaseException) -> bool:
+        """Return ``True`` for timeouts, connection errors and transient statuses."""
+        if isinstance(exc, CircuitOpenError):
+            return False
+        status = _status_of(exc)
+        if status is not None:
+            return status in self.retry_statuses
+        return isinstance(exc, httpx.TransportError)
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff for zero-based ``attempt``."""
+        cap = min(self.max_delay_s, self.base_delay_s * (2**attempt))
+        return self.rng.uniform(0.0, cap)
+
+    def delay(self, attempt: int, exc: BaseException) -> float:
+        """Seconds to wait before retrying after ``exc``."""
+        if isinstance(exc, httpx.HTTPStatusError):
+            retry_after = parse_retry_after(exc.response.headers.get("retry-after"))
+            if retry_after is not None:
+                return min(retry_after, self.max_retry_after_s)
+        return self.backoff(attempt)
+
+    @staticmethod
+    def from_settings(cfg: Settings) -> RetryPolicy:
+        """Build a policy from ``Settings``."""
+        return RetryPolicy(
+            base_delay_s=cfg.http_backoff_base_s,
+            max_delay_s=cfg.http_backoff_max_s,
+            max_retry_after_s=cfg.http_retry_after_max_s,
+        )
+
+
+def is_breaker_failure(exc: BaseException) -> bool:
+    """Return ``True`` if ``exc`` says the host itself is unhealthy.
+
+    Client errors (4xx) and rate limiting mean the host answered, so they do
+    not count against the circuit.
+    """
+    status = _status_of(exc)
+    if status is not None:
+        return status >= 500
+    return isinstance(exc, httpx.TransportError)
+
+
+class CircuitBreaker:
+    """Closed / open / half-open breaker for one upstream host."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        host: str,
+        *,
+        failure_threshold: int = 5,
+        reset_timeout_s: float = 30.0,
+        half_open_max_calls: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Open after ``failure_threshold`` consecutive host failures.
+
+        After ``reset_timeout_s`` up to ``half_open_max_calls`` probes are let
+        through; the first result closes or re-opens the circuit.
+        """
+        self.host = host
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout_s = reset_timeout_s
+        self.half_open_max_calls = max(1, half_open_max_calls)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+        self._counters: Dict[str, int] = {
+            "successes": 0,
+            "failures": 0,
+            "rejected": 0,
+            "opened": 0,
+        }
+
+    @property
+    def state(self) -> str:
+        """Current state, moving open -> half-open once the cool-down elapsed."""
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        if (
+            self._state == self.OPEN
+            and self._clock() - self._opened_at >= self.reset_timeout_s
+        ):
+            self._state = self.HALF_OPEN
+            self._probes = 0
+        return self._state
+
+    def before_call(self) -> bool:
+        """Raise ``CircuitOpenError`` unless a call to the host is allowed now.
+
+        Returns ``True`` when the call took a half-open probe slot; the caller
+        must then record a result or ``release_probe()``.
+        """
+        with self._lock:
+            state = self._current_state()
+            if state == self.CLOSED:
+                return False
+            if state == self.HALF_OPEN and self._probes < self.half_open_max_calls:
+                self._probes += 1
+                return True
+            self._counters["rejected"] += 1
+            retry_in = max(
+                0.0, self.reset_timeout_s - (self._clock() - self._opened_at)
+            )
+        raise CircuitOpenError(self.host, retry_in)
+
+    def release_probe(self) -> None:
+        """Give back a probe slot whose call ended without a result (e.g. cancelled)."""
+        with self._lock:
+            if self._state == self.HALF_OPEN and self._probes > 0:
+                self._probes -= 1
+
+    def record_success(self) -> None:
+        """Close the circuit after a successful call."""
+        with self._lock:
+            self._counters["successes"] += 1
+            self._failures = 0
+            self._state = self.CLOSED
+
+    def record_failure(self, exc: Optional[BaseException] = None) -> None:
+        """Count a failed call; non-host failures only release a probe slot."""
+        with self._lock:
+            if exc is not None and not is_breaker_failure(exc):
+                if self._state == self.HALF_OPEN:
+                    self._state = self.CLOSED
+                    self._failures = 0
+                return
+            self._counters["failures"] += 1
+            self._failures += 1
+            if (
+                self._state == self.HALF_OPEN
+                or self._failures >= self.failure_threshold
+            ):
+                if self._state != self.OPEN:
+                    self._counters["opened"] += 1
+                self._state = self.OPEN
+                self._opened_at = self._clock()
+
+    def metrics(self) -> Dict[str, Any]:
+        """Return state and counters for this breaker."""
+        with self._lock:
+            out: Dict[str, Any] = dict(self._counters)
+            out["state"] = self._current_state()
+            out["consecutive_failures"] = self._failures
+        return out
+
+
+class BreakerRegistry:
+    """One ``CircuitBreaker`` per upstream host."""
+
+    def __init__(
+        self, *, failure_threshold: int = 5, reset_timeout_s: float = 30.0
+    ) -> None:
+        """Create breakers on demand with these thresholds."""
+        self.failure_threshold = failure_threshold
+        self.reset_timeout_s = reset_timeout_s
+        self._lock = threading.Lock()
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    def get(self, url: str) -> CircuitBreaker:
+        """Return the breaker for ``url``'s host."""
+        host = urlsplit(url).netloc.lower()
+        with self._lock:
+            breaker = self._breakers.get(host)
+            if breaker is None:
+                breaker = self._breakers[host] = CircuitBreaker(
+                    host,
+                    failure_threshold=self.failure_threshold,
+                    reset_timeout_s=self.reset_timeout_s,
+                )
+            return breaker
+
+    def metrics(self) -> Dict[str, Dict[str, Any]]:
+        """Return ``{host: breaker metrics}``."""
+        with self._lock:
+            breakers = list(self._breakers.values())
+        return {b.host: b.metrics() for b in breakers}
+
+
+_policy: Optional[RetryPolicy] = None
+_breakers: Optional[BreakerRegistry] = None
+_lock = threading.Lock()
+
+
+def get_retry_policy() -> RetryPolicy:
+    """Return the process-wide retry policy, built from ``Settings``."""
+    global _policy
+    if _policy is None:
+        with _lock:
+            if _policy is None:
+                _policy = RetryPolicy.from_settings(Settings.load())
+    return _policy
+
+
+def get_breakers() -> BreakerRegistry:
+    """Return the process-wide breaker registry, built from ``Settings``."""
+    global _breakers
+    if _breakers is None:
+        with _lock:
+            if _breakers is None:
+                cfg = Settings.load()
+                _breakers = BreakerRegistry(
+                    failure_threshold=cfg.breaker_failure_threshold,
+                    reset_timeout_s=cfg.breaker_reset_s,
+                )
+    return _breakers
+
+
+def configure_retries(
+    policy: Optional[RetryPolicy] = None, breakers: Optional[BreakerRegistry] = None
+) -> None:
+    """Install ``policy``/``breakers``; ``None`` rebuilds them from ``Settings``."""
+    global _policy, _breakers
+    with _lock:
+        _policy = policy
+        _breakers = breakers
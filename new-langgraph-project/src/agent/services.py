@@ -1,101 +1,419 @@
 from __future__ import annotations
 
+import asyncio
 import logging
-from typing import Any, Dict, Optional
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple, cast
 
 import httpx
 
+from agent.cache import get_cache, get_validators, normalize_key
+from agent.clients import get_async_client, get_client
+from agent.columnar import ColumnarMarkets
+from agent.config import Settings
+from agent.jsonparse import iter_items, loads
+from agent.metrics import get_metrics, timed
+from agent.ratelimit import RateLimiter, get_odds_limiter
+from agent.retry import get_breakers, get_retry_policy
 
 log = logging.getLogger(__name__)
 
+# Read once at import (ODDS_API_BASE / ESPN_API_BASE); the request builders look
+# these up at call time, so they can also be reassigned in-process.
+_upstreams = Settings.load()
+ODDS_API_BASE = _upstreams.odds_api_base
+ESPN_API_BASE = _upstreams.espn_api_base
 
-def _with_retries(client: httpx.Client, method: str, url: str, *, retries: int = 2, **kw: Any) -> httpx.Response:
-    last_err: Optional[Exception] = None
+
+def _attempt_status(e: BaseException) -> str:
+    return str(e.response.status_code) if isinstance(e, httpx.HTTPStatusError) else type(e).__name__
+
+
+def _record_attempt(endpoint: str, attempt: int, status: str, elapsed: float) -> None:
+    metrics = get_metrics()
+    if not metrics.enabled:
+        return
+    metrics.histogram("upstream_request_seconds", "Upstream HTTP latency per attempt.", ("endpoint", "status")).observe(
+        elapsed, endpoint=endpoint, status=status
+    )
+    metrics.counter("upstream_requests_total", "Upstream HTTP attempts.", ("endpoint", "status", "attempt")).inc(
+        endpoint=endpoint, status=status, attempt=attempt
+    )
+
+
+def _with_retries(client: httpx.Client, method: str, url: str, *, retries: int = 2, limiter: Optional[RateLimiter] = None, endpoint: str = "other", **kw: Any) -> httpx.Response:
+    policy = get_retry_policy()
+    breaker = get_breakers().get(url)
     for attempt in range(retries + 1):
+        probe = breaker.before_call()  # fail fast while the host's circuit is open
+        start = time.perf_counter()  # restarted once the limiter lets the request through
         try:
+            if limiter is not None:
+                limiter.acquire()
+            start = time.perf_counter()
             resp = client.request(method, url, **kw)
-            resp.raise_for_status()
+            if limiter is not None:
+                limiter.observe(resp.headers)
+            if resp.status_code != 304:  # Not Modified answers a conditional GET
+                resp.raise_for_status()
+        except Exception as e:
+            _record_attempt(endpoint, attempt, _attempt_status(e), time.perf_counter() - start)
+            breaker.record_failure(e)
+            if attempt >= retries or not policy.is_retryable(e):
+                raise
+            delay = policy.delay(attempt, e)
+            log.warning("http_retry", extra={"attempt": attempt, "url": url, "delay_s": round(delay, 3), "error": type(e).__name__})
+            time.sleep(delay)
+        except BaseException:
+            if probe:  # cancelled or interrupted: no result to record
+                breaker.release_probe()
+            raise
+        else:
+            _record_attempt(endpoint, attempt, str(resp.status_code), time.perf_counter() - start)
+            breaker.record_success()
             return resp
-        except Exception as e:  # pragma: no cover
-            last_err = e
-            log.warning("http_retry", extra={"attempt": attempt, "url": url})
-    assert last_err is not None
-    raise last_err
+    raise AssertionError("unreachable")  # pragma: no cover
 
 
-def fetch_odds_events(api_key: str, sport_key: str, region: str = "us", timeout: float = 20.0, retries: int = 2) -> Dict[str, Any]:
-    url = f"https://api.the-odds-api.com/v4/sports/{sport_key}/events"
-    params = {"apiKey": api_key, "regions": region, "dateFormat": "iso"}
-    with httpx.Client(timeout=timeout) as client:
-        resp = _with_retries(client, "GET", url, retries=retries, params=params)
-        data = resp.json()
-    # Minimal normalization
-    events = []
-    for e in data or []:
-        events.append(
-            {
-                "id": e.get("id", ""),
-                "sport_key": e.get("sport_key"),
-                "commence_time": e.get("commence_time"),
-                "home_team": e.get("home_team"),
-                "away_team": e.get("away_team"),
-            }
-        )
-    return {"events": events}
-
-
-def fetch_odds_markets(api_key: str, sport_key: str, event_id: str, markets: str = "h2h,spreads,totals", region: str = "us", timeout: float = 20.0, retries: int = 2) -> Dict[str, Any]:
-    url = f"https://api.the-odds-api.com/v4/sports/{sport_key}/events/{event_id}/odds"
-    params = {"apiKey": api_key, "regions": region, "markets": markets, "dateFormat": "iso"}
-    with httpx.Client(timeout=timeout) as client:
-        resp = _with_retries(client, "GET", url, retries=retries, params=params)
-        data = resp.json()
-    out_markets = []
-    for bk in (data or {}).get("bookmakers", []) or []:
-        title = bk.get("title") or bk.get("key")
-        for mk in bk.get("markets", []) or []:
-            out_markets.append(
+async def _awith_retries(client: httpx.AsyncClient, method: str, url: str, *, retries: int = 2, limiter: Optional[RateLimiter] = None, endpoint: str = "other", **kw: Any) -> httpx.Response:
+    policy = get_retry_policy()
+    breaker = get_breakers().get(url)
+    for attempt in range(retries + 1):
+        probe = breaker.before_call()
+        start = time.perf_counter()
+        try:
+            if limiter is not None:
+                await limiter.aacquire()
+            start = time.perf_counter()
+            resp = await client.request(method, url, **kw)
+            if limiter is not None:
+                limiter.observe(resp.headers)
+            if resp.status_code != 304:
+                resp.raise_for_status()
+        except Exception as e:
+            _record_attempt(endpoint, attempt, _attempt_status(e), time.perf_counter() - start)
+            breaker.record_failure(e)
+            if attempt >= retries or not policy.is_retryable(e):
+                raise
+            delay = policy.delay(attempt, e)
+            log.warning("http_retry", extra={"attempt": attempt, "url": url, "delay_s": round(delay, 3), "error": type(e).__name__})
+            await asyncio.sleep(delay)
+        except BaseException:
+            if probe:  # cancelled or interrupted: no result to record
+                breaker.release_probe()
+            raise
+        else:
+            _record_attempt(endpoint, attempt, str(resp.status_code), time.perf_counter() - start)
+            breaker.record_success()
+            return resp
+    raise AssertionError("unreachable")  # pragma: no cover
+
+
+# ---- request builders / normalizers (shared by sync and async fetchers) ----
+def _odds_events_request(api_key: str, sport_key: str, region: str) -> Tuple[str, Dict[str, Any]]:
+    url = f"{ODDS_API_BASE}/sports/{sport_key}/events"
+    return url, {"apiKey": api_key, "regions": region, "dateFormat": "iso"}
+
+
+def _odds_markets_request(api_key: str, sport_key: str, event_id: str, markets: str, region: str) -> Tuple[str, Dict[str, Any]]:
+    url = f"{ODDS_API_BASE}/sports/{sport_key}/events/{event_id}/odds"
+    return url, {"apiKey": api_key, "regions": region, "markets": markets, "dateFormat": "iso"}
+
+
+def _espn_scoreboard_url(league_path: str) -> str:
+    return f"{ESPN_API_BASE}/{league_path}"
+
+
+def _project_event(e: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "id": e.get("id", ""),
+        "sport_key": e.get("sport_key"),
+        "commence_time": e.get("commence_time"),
+        "home_team": e.get("home_team"),
+        "away_team": e.get("away_team"),
+    }
+
+
+def _project_bookmaker(bk: Dict[str, Any]) -> List[Dict[str, Any]]:
+    title = bk.get("title") or bk.get("key")
+    return [
+        {
+            "bookmaker": title,
+            "market": mk.get("key"),
+            "outcomes": [
+                {"name": o.get("name"), "price": o.get("price"), "point": o.get("point")}
+                for o in mk.get("outcomes", []) or []
+            ],
+        }
+        for mk in bk.get("markets", []) or []
+    ]
+
+
+def _project_game(ev: Dict[str, Any]) -> Dict[str, Any]:
+    competitions = ev.get("competitions", []) or []
+    status = (competitions[0].get("status", {}) or {}).get("type", {}).get("description") if competitions else None
+    comp_list = []
+    if competitions:
+        for c in competitions[0].get("competitors", []) or []:
+            comp_list.append(
                 {
-                    "bookmaker": title,
-                    "market": mk.get("key"),
-                    "outcomes": [
-                        {"name": o.get("name"), "price": o.get("price"), "point": o.get("point")}
-                        for o in mk.get("outcomes", []) or []
-                    ],
+                    "name": (c.get("team", {}) or {}).get("displayName"),
+                    "score": c.get("score"),
+                    "homeAway": c.get("homeAway"),
                 }
             )
+    return {
+        "id": ev.get("id"),
+        "date": ev.get("date"),
+        "name": ev.get("name"),
+        "shortName": ev.get("shortName"),
+        "status": status,
+        "competitors": comp_list,
+    }
+
+
+# Normalizer over an already-decoded document.
+def _normalize_markets(data: Any) -> Dict[str, Any]:
+    data = data or {}
+    out_markets: List[Dict[str, Any]] = []
+    for bk in data.get("bookmakers", []) or []:
+        out_markets.extend(_project_bookmaker(bk))
     return {"event_id": data.get("id"), "sport_key": data.get("sport_key"), "markets": out_markets}
 
 
+# Parsers over raw response bodies: only the projected fields are kept, and
+# large event lists are decoded one element at a time (see agent.jsonparse).
+def _parse_events(raw: bytes) -> Dict[str, Any]:
+    return {"events": [_project_event(e) for e in iter_items(raw, "item")]}
+
+
+def _parse_markets(raw: bytes) -> Dict[str, Any]:
+    # A single event's odds document is small; bookmakers are all needed anyway.
+    return _normalize_markets(loads(raw))
+
+
+def _parse_scoreboard(raw: bytes) -> Dict[str, Any]:
+    return {"games": [_project_game(ev) for ev in iter_items(raw, "events.item")]}
+
+
+# ---- conditional GET (ETag / Last-Modified) ----
+Parser = Callable[[bytes], Dict[str, Any]]
+
+
+def _get_normalized(url: str, params: Optional[Mapping[str, Any]], parse: Parser, *, retries: int, timeout: float, limiter: Optional[RateLimiter] = None, endpoint: str = "other") -> Dict[str, Any]:
+    validators = get_validators()
+    key = normalize_key(url, params)
+    headers = validators.headers(key) if validators is not None else {}
+    resp = _with_retries(get_client(url), "GET", url, retries=retries, limiter=limiter, endpoint=endpoint, params=params, timeout=timeout, headers=headers)
+    if resp.status_code == 304 and validators is not None:
+        found, value = validators.not_modified(key)
+        if found:
+            return cast(Dict[str, Any], value)
+        # Validator evicted meanwhile: fetch the full body once more.
+        resp = _with_retries(get_client(url), "GET", url, retries=retries, limiter=limiter, endpoint=endpoint, params=params, timeout=timeout)
+    start = time.perf_counter()
+    value = parse(resp.content)
+    get_metrics().histogram("normalize_seconds", "Decode and projection time per response.", ("endpoint",)).observe(
+        time.perf_counter() - start, endpoint=endpoint
+    )
+    if validators is not None:
+        validators.remember(key, resp.headers, value)
+    return value
+
+
+async def _aget_normalized(url: str, params: Optional[Mapping[str, Any]], parse: Parser, *, retries: int, timeout: float, limiter: Optional[RateLimiter] = None, endpoint: str = "other") -> Dict[str, Any]:
+    validators = get_validators()
+    key = normalize_key(url, params)
+    headers = validators.headers(key) if validators is not None else {}
+    resp = await _awith_retries(get_async_client(url), "GET", url, retries=retries, limiter=limiter, endpoint=endpoint, params=params, timeout=timeout, headers=headers)
+    if resp.status_code == 304 and validators is not None:
+        found, value = validators.not_modified(key)
+        if found:
+            return cast(Dict[str, Any], value)
+        resp = await _awith_retries(get_async_client(url), "GET", url, retries=retries, limiter=limiter, endpoint=endpoint, params=params, timeout=timeout)
+    start = time.perf_counter()
+    value = parse(resp.content)
+    get_metrics().histogram("normalize_seconds", "Decode and projection time per response.", ("endpoint",)).observe(
+        time.perf_counter() - start, endpoint=endpoint
+    )
+    if validators is not None:
+        validators.remember(key, resp.headers, value)
+    return value
+
+
+# ---- cache wrappers ----
+def _cached(endpoint: str, url: str, params: Optional[Mapping[str, Any]], fetch: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+    cache = get_cache()
+    if cache is None:
+        return fetch()
+    return cast(Dict[str, Any], cache.get_or_fetch(endpoint, normalize_key(url, params), fetch))
+
+
+async def _acached(endpoint: str, url: str, params: Optional[Mapping[str, Any]], fetch: Callable[[], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+    cache = get_cache()
+    if cache is None:
+        return await fetch()
+    return cast(Dict[str, Any], await cache.aget_or_fetch(endpoint, normalize_key(url, params), fetch))
+
+
+# ---- sync fetchers ----
+@timed("fetch_seconds", "Fetcher latency including cache.", endpoint="odds_events")
+def fetch_odds_events(api_key: str, sport_key: str, region: str = "us", timeout: float = 20.0, retries: int = 2) -> Dict[str, Any]:
+    url, params = _odds_events_request(api_key, sport_key, region)
+
+    def _fetch() -> Dict[str, Any]:
+        return _get_normalized(url, params, _parse_events, retries=retries, timeout=timeout, limiter=get_odds_limiter(), endpoint="odds_events")
+
+    return _cached("odds_events", url, params, _fetch)
+
+
+@timed("fetch_seconds", "Fetcher latency including cache.", endpoint="odds_markets")
+def fetch_odds_markets(api_key: str, sport_key: str, event_id: str, markets: str = "h2h,spreads,totals", region: str = "us", timeout: float = 20.0, retries: int = 2, columnar: bool = False) -> Dict[str, Any]:
+    url, params = _odds_markets_request(api_key, sport_key, event_id, markets, region)
+
+    def _fetch() -> Dict[str, Any]:
+        return _get_normalized(url, params, _parse_markets, retries=retries, timeout=timeout, limiter=get_odds_limiter(), endpoint="odds_markets")
+
+    data = _cached("odds_markets", url, params, _fetch)
+    return ColumnarMarkets.from_markets(data).to_json() if columnar else data
+
+
+@timed("fetch_seconds", "Fetcher latency including cache.", endpoint="espn_scoreboard")
 def fetch_espn_scoreboard(league_path: str, timeout: float = 20.0, retries: int = 2) -> Dict[str, Any]:
-    base = "https://site.api.espn.com/apis/site/v2/sports"
-    url = f"{base}/{league_path}"
-    with httpx.Client(timeout=timeout) as client:
-        resp = _with_retries(client, "GET", url, retries=retries)
-        data = resp.json()
-    games = []
-    for ev in (data or {}).get("events", []) or []:
-        competitions = ev.get("competitions", []) or []
-        status = (competitions[0].get("status", {}) or {}).get("type", {}).get("description") if competitions else None
-        comp_list = []
-        if competitions:
-            for c in competitions[0].get("competitors", []) or []:
-                comp_list.append(
-                    {
-                        "name": (c.get("team", {}) or {}).get("displayName"),
-                        "score": c.get("score"),
-                        "homeAway": c.get("homeAway"),
-                    }
-                )
-        games.append(
-            {
-                "id": ev.get("id"),
-                "date": ev.get("date"),
-                "name": ev.get("name"),
-                "shortName": ev.get("shortName"),
-                "status": status,
-                "competitors": comp_list,
-            }
-        )
-    return {"games": games}
+    url = _espn_scoreboard_url(league_path)
+
+    def _fetch() -> Dict[str, Any]:
+        return _get_normalized(url, None, _parse_scoreboard, retries=retries, timeout=timeout, endpoint="espn_scoreboard")
+
+    return _cached("espn_scoreboard", url, None, _fetch)
+
+
+# ---- async fetchers (used by the graph nodes; never block the event loop) ----
+@timed("fetch_seconds", "Fetcher latency including cache.", endpoint="odds_events")
+async def afetch_odds_events(api_key: str, sport_key: str, region: str = "us", timeout: float = 20.0, retries: int = 2) -> Dict[str, Any]:
+    """Async ``fetch_odds_events`` over the shared pooled client."""
+    url, params = _odds_events_request(api_key, sport_key, region)
+
+    async def _fetch() -> Dict[str, Any]:
+        return await _aget_normalized(url, params, _parse_events, retries=retries, timeout=timeout, limiter=get_odds_limiter(), endpoint="odds_events")
+
+    return await _acached("odds_events", url, params, _fetch)
+
+
+@timed("fetch_seconds", "Fetcher latency including cache.", endpoint="odds_markets")
+async def afetch_odds_markets(api_key: str, sport_key: str, event_id: str, markets: str = "h2h,spreads,totals", region: str = "us", timeout: float = 20.0, retries: int = 2, columnar: bool = False) -> Dict[str, Any]:
+    """Async ``fetch_odds_markets``; ``columnar=True`` returns the columnar shape."""
+    url, params = _odds_markets_request(api_key, sport_key, event_id, markets, region)
+
+    async def _fetch() -> Dict[str, Any]:
+        return await _aget_normalized(url, params, _parse_markets, retries=retries, timeout=timeout, limiter=get_odds_limiter(), endpoint="odds_markets")
+
+    data = await _acached("odds_markets", url, params, _fetch)
+    return ColumnarMarkets.from_markets(data).to_json() if columnar else data
+
+
+@timed("fetch_seconds", "Fetcher latency including cache.", endpoint="espn_scoreboard")
+async def afetch_espn_scoreboard(league_path: str, timeout: float = 20.0, retries: int = 2) -> Dict[str, Any]:
+    """Async ``fetch_espn_scoreboard`` over the shared pooled client."""
+    url = _espn_scoreboard_url(league_path)
+
+    async def _fetch() -> Dict[str, Any]:
+        return await _aget_normalized(url, None, _parse_scoreboard, retries=retries, timeout=timeout, endpoint="espn_scoreboard")
+
+    return await _acached("espn_scoreboard", url, None, _fetch)
+
+
+# ---- batched markets (bounded fan-out, per-event errors) ----
+def _unique(ids: Iterable[str]) -> List[str]:
+    return list(dict.fromkeys(i for i in ids if i))
+
+
+def iter_odds_markets(api_key: str, sport_key: str, event_ids: Iterable[str], markets: str = "h2h,spreads,totals", region: str = "us", timeout: float = 20.0, retries: int = 2, concurrency: int = 8) -> Iterator[Dict[str, Any]]:
+    """Fetch markets for many events on a bounded thread pool.
+
+    Yields ``{"event_id", "result"}`` or ``{"event_id", "error"}`` in
+    completion order; one failing event never aborts the batch.
+    """
+    ids = _unique(event_ids)
+    if not ids:
+        return
+    with ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(ids)))) as pool:
+        futures = {
+            pool.submit(fetch_odds_markets, api_key, sport_key, eid, markets=markets, region=region, timeout=timeout, retries=retries): eid
+            for eid in ids
+        }
+        for fut in as_completed(futures):
+            eid = futures[fut]
+            try:
+                yield {"event_id": eid, "result": fut.result()}
+            except Exception as e:
+                yield {"event_id": eid, "error": f"{type(e).__name__}: {e}"}
+
+
+async def aiter_odds_markets(api_key: str, sport_key: str, event_ids: Iterable[str], markets: str = "h2h,spreads,totals", region: str = "us", timeout: float = 20.0, retries: int = 2, concurrency: int = 8) -> AsyncIterator[Dict[str, Any]]:
+    """Async counterpart of ``iter_odds_markets``; a semaphore caps in-flight requests."""
+    ids = _unique(event_ids)
+    sem = asyncio.Semaphore(max(1, concurrency))
+
+    async def _one(eid: str) -> Dict[str, Any]:
+        async with sem:
+            try:
+                data = await afetch_odds_markets(api_key, sport_key, eid, markets=markets, region=region, timeout=timeout, retries=retries)
+                return {"event_id": eid, "result": data}
+            except Exception as e:
+                return {"event_id": eid, "error": f"{type(e).__name__}: {e}"}
+
+    tasks = [asyncio.ensure_future(_one(eid)) for eid in ids]
+    try:
+        for fut in asyncio.as_completed(tasks):
+            yield await fut
+    finally:
+        for t in tasks:
+            t.cancel()
+
+
+def _collect_batch(items: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    results: Dict[str, Any] = {}
+    errors: Dict[str, str] = {}
+    for item in items:
+        if "error" in item:
+            errors[item["event_id"]] = item["error"]
+        else:
+            results[item["event_id"]] = item["result"]
+    return {"results": results, "errors": errors}
+
+
+def fetch_odds_markets_batch(api_key: str, sport_key: str, event_ids: Iterable[str], markets: str = "h2h,spreads,totals", region: str = "us", timeout: float = 20.0, retries: int = 2, concurrency: int = 8) -> Dict[str, Any]:
+    """Fetch markets for many events; returns ``{"results": {...}, "errors": {...}}``."""
+    return _collect_batch(iter_odds_markets(api_key, sport_key, event_ids, markets=markets, region=region, timeout=timeout, retries=retries, concurrency=concurrency))
+
+
+async def afetch_odds_markets_batch(api_key: str, sport_key: str, event_ids: Iterable[str], markets: str = "h2h,spreads,totals", region: str = "us", timeout: float = 20.0, retries: int = 2, concurrency: int = 8) -> Dict[str, Any]:
+    """Async counterpart of ``fetch_odds_markets_batch``."""
+    items = [
+        item
+        async for item in aiter_odds_markets(api_key, sport_key, event_ids, markets=markets, region=region, timeout=timeout, retries=retries, concurrency=concurrency)
+    ]
+    return _collect_batch(items)
+
+
+def odds_quota() -> Dict[str, Any]:
+    """Return The Odds API quota and pacing as last seen by the limiter."""
+    return get_odds_limiter().state()
+
+
+def should_defer_odds(priority: str = "normal") -> bool:
+    """Return ``True`` when an Odds API fetch of ``priority`` should be deferred."""
+    return get_odds_limiter().should_shed(priority)
+
+
+def breaker_metrics() -> Dict[str, Dict[str, Any]]:
+    """Return circuit breaker state and counters per upstream host."""
+    return get_breakers().metrics()
+
 
+def cache_stats() -> Dict[str, int]:
+    """Return response cache counters (empty when caching is disabled)."""
+    cache = get_cache()
+    return cache.stats() if cache is not None else {}
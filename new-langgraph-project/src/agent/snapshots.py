@@ -0,0 +1,244 @@
+"""Append-only line-movement store for normalized odds markets.
+
+Each ``record`` call writes a snapshot header and only the outcomes whose
+price changed since the previous snapshot of the same event (outcomes that
+disappeared get a ``removed`` row). An outcome is identified by bookmaker,
+market, name and point, so alternate lines are tracked separately and a moved
+line shows up as the old point removed and the new one added. Any point in
+time can be rebuilt by taking the latest delta per outcome at or before that
+time.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from agent.columnar import ColumnarMarkets
+from agent.config import Settings
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    id INTEGER PRIMARY KEY,
+    event_id TEXT NOT NULL,
+    sport_key TEXT,
+    taken_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_snapshots_event ON snapshots (event_id, taken_at);
+CREATE TABLE IF NOT EXISTS outcome_deltas (
+    snapshot_id INTEGER NOT NULL REFERENCES snapshots (id),
+    event_id TEXT NOT NULL,
+    bookmaker TEXT NOT NULL,
+    market TEXT NOT NULL,
+    name TEXT NOT NULL,
+    price REAL,
+    point REAL,
+    removed INTEGER NOT NULL DEFAULT 0,
+    taken_at REAL NOT NULL
+);
+DROP INDEX IF EXISTS ix_deltas_key;
+CREATE INDEX IF NOT EXISTS ix_deltas_outcome ON outcome_deltas (event_id, bookmaker, market, name, point, taken_at);
+CREATE INDEX IF NOT EXISTS ix_deltas_time ON outcome_deltas (event_id, taken_at);
+"""
+
+OutcomeKey = Tuple[str, str, str, Optional[float]]  # bookmaker, market, name, point
+OutcomeValue = Optional[float]  # price
+
+
+def _flatten(markets: Dict[str, Any]) -> Dict[OutcomeKey, OutcomeValue]:
+    if markets.get("format") == "columnar":
+        markets = ColumnarMarkets.from_json(markets).to_markets()
+    out: Dict[OutcomeKey, OutcomeValue] = {}
+    for mk in markets.get("markets", []) or []:
+        for o in mk.get("outcomes", []) or []:
+            key = (
+                mk.get("bookmaker") or "",
+                mk.get("market") or "",
+                o.get("name") or "",
+                o.get("point"),
+            )
+            out[key] = o.get("price")
+    return out
+
+
+def _outcome_order(
+    item: Tuple[OutcomeKey, OutcomeValue],
+) -> Tuple[str, str, str, bool, float]:
+    b, m, n, pt = item[0]
+    return b, m, n, pt is not None, pt or 0.0
+
+
+class SnapshotStore:
+    """SQLite-backed delta store; safe to share between threads."""
+
+    def __init__(self, path: Union[str, Path]) -> None:
+        """Open (creating if needed) the database at ``path``; ``:memory:`` works too."""
+        self.path = Path(path)
+        if str(path) != ":memory:":
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            str(path), check_same_thread=False, isolation_level=None
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        # Last known state per event, so diffs do not re-read the table.
+        self._latest: Dict[str, Dict[OutcomeKey, OutcomeValue]] = {}
+
+    def close(self) -> None:
+        """Close the underlying connection."""
+        with self._lock:
+            self._conn.close()
+
+    def _state(
+        self, event_id: str, at: Optional[float] = None
+    ) -> Dict[OutcomeKey, OutcomeValue]:
+        sql = (
+            "SELECT bookmaker, market, name, point, price, removed FROM outcome_deltas d "
+            "WHERE event_id = ? {cond} AND rowid = ("
+            " SELECT max(rowid) FROM outcome_deltas x WHERE x.event_id = d.event_id AND x.bookmaker = d.bookmaker"
+            " AND x.market = d.market AND x.name = d.name AND x.point IS d.point {xcond})"
+        )
+        if at is None:
+            rows = self._conn.execute(sql.format(cond="", xcond=""), (event_id,))
+        else:
+            rows = self._conn.execute(
+                sql.format(cond="AND taken_at <= ?", xcond="AND x.taken_at <= ?"),
+                (event_id, at, at),
+            )
+        return {(b, m, n, pt): p for b, m, n, pt, p, removed in rows if not removed}
+
+    def record(
+        self, markets: Dict[str, Any], *, taken_at: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """Append a snapshot of ``markets`` (dict or columnar shape); return counts."""
+        event_id = markets.get("event_id")
+        if not event_id:
+            raise ValueError("markets snapshot has no event_id")
+        ts = time.time() if taken_at is None else taken_at
+        current = _flatten(markets)
+        with self._lock:
+            previous = self._latest.get(event_id)
+            if previous is None:
+                previous = self._state(event_id)
+            changed = [(k, v) for k, v in current.items() if previous.get(k) != v]
+            removed = [k for k in previous if k not in current]
+            cur = self._conn.cursor()
+            cur.execute("BEGIN")
+            try:
+                cur.execute(
+                    "INSERT INTO snapshots (event_id, sport_key, taken_at) VALUES (?, ?, ?)",
+                    (event_id, markets.get("sport_key"), ts),
+                )
+                snapshot_id = cur.lastrowid
+                cur.executemany(
+                    "INSERT INTO outcome_deltas (snapshot_id, event_id, bookmaker, market, name, price, point, removed, taken_at)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    [
+                        (snapshot_id, event_id, b, m, n, price, pt, 0, ts)
+                        for (b, m, n, pt), price in changed
+                    ]
+                    + [
+                        (snapshot_id, event_id, b, m, n, None, pt, 1, ts)
+                        for b, m, n, pt in removed
+                    ],
+                )
+                cur.execute("COMMIT")
+            except BaseException:
+                cur.execute("ROLLBACK")
+                self._latest.pop(event_id, None)
+                raise
+            self._latest[event_id] = current
+        return {
+            "snapshot_id": snapshot_id,
+            "event_id": event_id,
+            "changed": len(changed),
+            "removed": len(removed),
+            "unchanged": len(current) - len(changed),
+        }
+
+    def history(
+        self,
+        event_id: str,
+        *,
+        bookmaker: Optional[str] = None,
+        market: Optional[str] = None,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+    ) -> List[Dict[str, Any]]:
+        """Return delta rows for an event, oldest first, filtered by book/market/time."""
+        sql = "SELECT taken_at, bookmaker, market, name, price, point, removed FROM outcome_deltas WHERE event_id = ?"
+        args: List[Any] = [event_id]
+        for col, val in (("bookmaker", bookmaker), ("market", market)):
+            if val is not None:
+                sql += f" AND {col} = ?"
+                args.append(val)
+        if start is not None:
+            sql += " AND taken_at >= ?"
+            args.append(start)
+        if end is not None:
+            sql += " AND taken_at <= ?"
+            args.append(end)
+        sql += " ORDER BY taken_at, rowid"
+        with self._lock:
+            rows = self._conn.execute(sql, args).fetchall()
+        return [
+            {
+                "taken_at": t,
+                "bookmaker": b,
+                "market": m,
+                "name": n,
+                "price": p,
+                "point": pt,
+                "removed": bool(r),
+            }
+            for t, b, m, n, p, pt, r in rows
+        ]
+
+    def state_at(self, event_id: str, at: Optional[float] = None) -> Dict[str, Any]:
+        """Rebuild the normalized markets dict for ``event_id`` as of ``at``."""
+        with self._lock:
+            state = self._state(event_id, at)
+            row = self._conn.execute(
+                "SELECT sport_key FROM snapshots WHERE event_id = ? ORDER BY taken_at DESC LIMIT 1",
+                (event_id,),
+            ).fetchone()
+        grouped: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+        for (b, m, n, pt), p in sorted(state.items(), key=_outcome_order):
+            grouped.setdefault((b, m), []).append({"name": n, "price": p, "point": pt})
+        return {
+            "event_id": event_id,
+            "sport_key": row[0] if row else None,
+            "markets": [
+                {"bookmaker": b, "market": m, "outcomes": outs}
+                for (b, m), outs in grouped.items()
+            ],
+        }
+
+
+_store: Optional[SnapshotStore] = None
+_store_lock = threading.Lock()
+
+
+def get_snapshot_store() -> Optional[SnapshotStore]:
+    """Return the store at ``SNAPSHOT_DB_PATH``; ``None`` when not configured."""
+    global _store
+    if _store is None:
+        path = Settings.load().snapshot_db_path
+        if not path:
+            return None
+        with _store_lock:
+            if _store is None:
+                _store = SnapshotStore(path)
+    return _store
+
+
+def configure_snapshot_store(store: Optional[SnapshotStore]) -> None:
+    """Install ``store`` process-wide (``None`` re-reads ``SNAPSHOT_DB_PATH``)."""
+    global _store
+    with _store_lock:
+        _store = store
@@ -1,17 +1,48 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Any, Dict, Optional, TypedDict
+import asyncio
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, TypedDict
 
 from langgraph.graph import StateGraph
 from langgraph.runtime import Runtime
 
 from agent.config import Settings
-from agent.services import fetch_odds_events, fetch_odds_markets, fetch_espn_scoreboard
+from agent.metrics import get_metrics, timed
+from agent.profiling import profiled
+from agent.services import (
+    afetch_espn_scoreboard,
+    afetch_odds_events,
+    afetch_odds_markets,
+    aiter_odds_markets,
+    odds_quota,
+    should_defer_odds,
+)
+from agent.snapshots import get_snapshot_store
 
 
 class Context(TypedDict, total=False):
     settings: Settings
+    profile: str  # "cprofile" or "sample" profiles this run (agent.profiling)
+
+
+def _settings(runtime: Runtime[Context]) -> Settings:
+    # Context is None when a run is invoked without one.
+    return (runtime.context or {}).get("settings") or Settings.load()
+
+
+def _deferred(priority: str) -> Optional[Dict[str, Any]]:
+    # Shed Odds API work when the remaining quota is too low for its priority.
+    if not should_defer_odds(priority):
+        return None
+    return {"result": {"deferred": True, "reason": "odds quota low", "priority": priority, "quota": odds_quota()}}
+
+
+async def _record_snapshot(data: Dict[str, Any]) -> None:
+    # Line-movement history, only when SNAPSHOT_DB_PATH is configured.
+    store = get_snapshot_store()
+    if store is not None and data.get("event_id"):
+        await asyncio.to_thread(store.record, data)
 
 
 # Events task
@@ -19,14 +50,20 @@ class Context(TypedDict, total=False):
 class EventsState:
     sport_key: str
     region: str = "us"
+    priority: str = "normal"  # low | normal | high
     result: Optional[dict] = None
 
 
+@timed("graph_node_seconds", "Graph node run time.", node="events_node")
+@profiled("events_node")
 async def events_node(state: EventsState, runtime: Runtime[Context]) -> Dict[str, Any]:
-    cfg = runtime.context.get("settings") or Settings.load()
+    cfg = _settings(runtime)
     if not cfg.odds_api_key:
         return {"result": {"error": "ODDS_API_KEY not set"}}
-    data = fetch_odds_events(cfg.odds_api_key, state.sport_key, region=state.region, timeout=cfg.http_timeout_s, retries=cfg.http_retries)
+    deferred = _deferred(state.priority)
+    if deferred is not None:
+        return deferred
+    data = await afetch_odds_events(cfg.odds_api_key, state.sport_key, region=state.region, timeout=cfg.http_timeout_s, retries=cfg.http_retries)
     return {"result": data}
 
 
@@ -45,14 +82,21 @@ class MarketsState:
     event_id: str
     markets: str = "h2h,spreads,totals"
     region: str = "us"
+    priority: str = "normal"  # low | normal | high
+    columnar: bool = False  # parallel-array result (agent.columnar)
     result: Optional[dict] = None
 
 
+@timed("graph_node_seconds", "Graph node run time.", node="markets_node")
+@profiled("markets_node")
 async def markets_node(state: MarketsState, runtime: Runtime[Context]) -> Dict[str, Any]:
-    cfg = runtime.context.get("settings") or Settings.load()
+    cfg = _settings(runtime)
     if not cfg.odds_api_key:
         return {"result": {"error": "ODDS_API_KEY not set"}}
-    data = fetch_odds_markets(
+    deferred = _deferred(state.priority)
+    if deferred is not None:
+        return deferred
+    data = await afetch_odds_markets(
         cfg.odds_api_key,
         state.sport_key,
         state.event_id,
@@ -60,7 +104,9 @@ async def markets_node(state: MarketsState, runtime: Runtime[Context]) -> Dict[s
         region=state.region,
         timeout=cfg.http_timeout_s,
         retries=cfg.http_retries,
+        columnar=state.columnar,
     )
+    await _record_snapshot(data)
     return {"result": data}
 
 
@@ -72,6 +118,60 @@ markets_graph = (
 )
 
 
+# Markets batch task (full slate in one run)
+@dataclass
+class MarketsBatchState:
+    """Markets for several events of one sport, fetched with bounded fan-out."""
+
+    sport_key: str
+    event_ids: List[str] = field(default_factory=list)
+    markets: str = "h2h,spreads,totals"
+    region: str = "us"
+    priority: str = "normal"  # low | normal | high
+    result: Optional[Dict[str, Any]] = None
+
+
+@timed("graph_node_seconds", "Graph node run time.", node="markets_batch_node")
+@profiled("markets_batch_node")
+async def markets_batch_node(state: MarketsBatchState, runtime: Runtime[Context]) -> Dict[str, Any]:
+    """Fetch markets for every id in ``event_ids``, streaming each as it completes."""
+    cfg = _settings(runtime)
+    if not cfg.odds_api_key:
+        return {"result": {"error": "ODDS_API_KEY not set"}}
+    deferred = _deferred(state.priority)
+    if deferred is not None:
+        return deferred
+    results: Dict[str, Any] = {}
+    errors: Dict[str, str] = {}
+    total = len({eid for eid in state.event_ids if eid})
+    # Each event is streamed (stream_mode="custom") as soon as it completes.
+    async for item in aiter_odds_markets(
+        cfg.odds_api_key,
+        state.sport_key,
+        state.event_ids,
+        markets=state.markets,
+        region=state.region,
+        timeout=cfg.http_timeout_s,
+        retries=cfg.http_retries,
+        concurrency=cfg.odds_batch_concurrency,
+    ):
+        if "error" in item:
+            errors[item["event_id"]] = item["error"]
+        else:
+            results[item["event_id"]] = item["result"]
+            await _record_snapshot(item["result"])
+        runtime.stream_writer({**item, "done": len(results) + len(errors), "total": total})
+    return {"result": {"results": results, "errors": errors}}
+
+
+markets_batch_graph = (
+    StateGraph(MarketsBatchState, context_schema=Context)
+    .add_node(markets_batch_node)
+    .add_edge("__start__", "markets_batch_node")
+    .compile(name="Markets Batch Task")
+)
+
+
 # Sports data task
 @dataclass
 class SportsDataState:
@@ -79,9 +179,11 @@ class SportsDataState:
     result: Optional[dict] = None
 
 
+@timed("graph_node_seconds", "Graph node run time.", node="sports_data_node")
+@profiled("sports_data_node")
 async def sports_data_node(state: SportsDataState, runtime: Runtime[Context]) -> Dict[str, Any]:
-    cfg = runtime.context.get("settings") or Settings.load()
-    data = fetch_espn_scoreboard(state.league_path, timeout=cfg.http_timeout_s, retries=cfg.http_retries)
+    cfg = _settings(runtime)
+    data = await afetch_espn_scoreboard(state.league_path, timeout=cfg.http_timeout_s, retries=cfg.http_retries)
     return {"result": data}
 
 
@@ -91,3 +193,24 @@ sports_data_graph = (
     .add_edge("__start__", "sports_data_node")
     .compile(name="Sports Data Task")
 )
+
+
+# Metrics exposition
+@dataclass
+class MetricsState:
+    """Output of the metrics graph."""
+
+    result: Optional[str] = None
+
+
+async def metrics_node(state: MetricsState, runtime: Runtime[Context]) -> Dict[str, Any]:
+    """Return this server process's metrics in Prometheus text format."""
+    return {"result": get_metrics().render()}
+
+
+metrics_graph = (
+    StateGraph(MetricsState, context_schema=Context)
+    .add_node(metrics_node)
+    .add_edge("__start__", "metrics_node")
+    .compile(name="Metrics")
+)
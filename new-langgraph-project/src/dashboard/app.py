@@ -3,11 +3,19 @@ import os
 import sys
 import time
 import webbrowser
+from collections import deque
 from pathlib import Path
-from typing import List
+from typing import TYPE_CHECKING, List
 
 import streamlit as st
 
+if TYPE_CHECKING:
+    from agent.logfiles import LogFile
+
+# Streamlit keeps download payloads in memory (``data`` must be bytes/str on the
+# supported >=1.36 range), so larger logs are only offered as a labelled tail export.
+LOG_DOWNLOAD_MAX_BYTES = 32 * 1024 * 1024
+
 
 def load_langgraph_config(base: Path) -> dict:
     cfg_path = base / "langgraph.json"
@@ -152,6 +160,8 @@ def main() -> None:
                     return "{\n  \"sport_key\": \"basketball_nba\",\n  \"region\": \"us\"\n}"
                 if gid == "markets":
                     return "{\n  \"sport_key\": \"basketball_nba\",\n  \"event_id\": \"<fill-event-id>\",\n  \"markets\": \"h2h,spreads,totals\",\n  \"region\": \"us\"\n}"
+                if gid == "markets_batch":
+                    return "{\n  \"sport_key\": \"basketball_nba\",\n  \"event_ids\": [\"<event-id-1>\", \"<event-id-2>\"],\n  \"markets\": \"h2h,spreads,totals\",\n  \"region\": \"us\"\n}"
                 if gid == "sports_data":
                     return "{\n  \"league_path\": \"basketball/nba/scoreboard\"\n}"
                 # mem0 graphs (template)
@@ -159,6 +169,10 @@ def main() -> None:
                     return "{}"
                 if gid == "mem_add":
                     return "{\n  \"title\": \"Sample\",\n  \"content\": \"Hello from dashboard\",\n  \"tags\": \"demo,notes\"\n}"
+                if gid == "mem_bulk_add":
+                    return "{\n  \"notes\": [\n    {\"title\": \"One\", \"content\": \"first\", \"tags\": \"demo\"},\n    {\"title\": \"Two\", \"content\": \"second\", \"tags\": [\"demo\", \"bulk\"]}\n  ],\n  \"path\": \"\",\n  \"batch_size\": 500\n}"
+                if gid == "mem_search":
+                    return "{\n  \"query\": \"hello\",\n  \"tags\": \"\",\n  \"match\": \"all\",\n  \"limit\": 20\n}"
             except Exception:
                 pass
             return "{}"
@@ -222,15 +236,15 @@ def main() -> None:
         console_log = logs_dir / "codex_console.log"
         registry_path = logs_dir / "process_registry.json"
 
-        # Global process registry (avoid touching session_state inside threads)
-        if "_next_job_id" not in st.session_state:
-            st.session_state._next_job_id = 1
-        # Module-level registry for running processes
+        # Single append-only writer (rotation, per-job logs, job ids) shared by all sessions
+        from agent.console import get_console_jobs, get_console_log
+
+        console = get_console_log(console_log)
+
+        # Process-wide job registry: each job's process plus a bounded buffer of its output
+        # (lives in agent.console, so it survives Streamlit reruns)
         global _CONSOLE_PROCS
-        try:
-            _CONSOLE_PROCS
-        except NameError:
-            _CONSOLE_PROCS = {}
+        _CONSOLE_PROCS = get_console_jobs()
         # Module-level registry for named long-running processes (to prevent duplicates)
         global _NAMED_PROCS, _NAMED_JOBS
         try:
@@ -242,30 +256,14 @@ def main() -> None:
         except NameError:
             _NAMED_JOBS = {}
 
-        # Persistent registry helpers
-        def _read_registry() -> dict:
-            try:
-                return json.loads(registry_path.read_text(encoding="utf-8")) if registry_path.exists() else {}
-            except Exception:
-                return {}
-
-        def _write_registry(data: dict) -> None:
-            try:
-                registry_path.write_text(json.dumps(data, indent=2), encoding="utf-8")
-            except Exception:
-                pass
-
-        def _update_registry(name: str, info: dict) -> None:
-            data = _read_registry()
-            data[name] = info
-            _write_registry(data)
+        # Persistent registry of named processes: in-memory copy behind a lock, debounced
+        # atomic writes, dead PIDs dropped on first load (agent.console.ProcessRegistry)
+        from agent.console import get_process_registry
 
-        def _remove_registry(name: str) -> None:
-            data = _read_registry()
-            if name in data:
-                data.pop(name, None)
-                _write_registry(data)
+        registry = get_process_registry(registry_path)
 
+        import codecs
+        import locale
         import threading
         import subprocess
         import datetime as _dt
@@ -287,7 +285,7 @@ def main() -> None:
             _NAMED_JOBS.pop(name, None)
             # Fallback to registry PID stop if needed
             try:
-                reg = _read_registry().get(name) or {}
+                reg = registry.get(name) or {}
                 pid = reg.get("pid")
                 if pid:
                     try:
@@ -296,53 +294,58 @@ def main() -> None:
                         pass
             except Exception:
                 pass
-            _remove_registry(name)
+            registry.remove(name)
 
         def spawn_ps(cmd: str, cwd: str | None = None, name: str | None = None):
-            job_id = st.session_state._next_job_id
-            st.session_state._next_job_id += 1
             ts = _dt.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            header = f"\n===== [{ts}] JOB {job_id} START =====\nCWD: {cwd or repo_root}\nCMD: {cmd}\n"
-            console_log.write_text((console_log.read_text(encoding="utf-8") if console_log.exists() else "") + header, encoding="utf-8")
+            job_id = console.start_job()
+            console.write(f"\n===== [{ts}] JOB {job_id} START =====\nCWD: {cwd or repo_root}\nCMD: {cmd}\n", job_id)
+            job = _CONSOLE_PROCS.start(job_id, cmd=cmd, name=name)
 
             def _run():
-                with open(console_log, "a", encoding="utf-8", newline="") as lf:
-                    try:
-                        # Ensure singleton per named process
-                        if name:
-                            stop_named(name)
-                        p = subprocess.Popen(
-                            ["powershell", "-NoProfile", "-Command", cmd],
-                            cwd=cwd or str(repo_root),
-                            stdout=subprocess.PIPE,
-                            stderr=subprocess.STDOUT,
-                            bufsize=1,
-                            universal_newlines=True,
-                        )
-                        _CONSOLE_PROCS[job_id] = p
-                        if name:
-                            _NAMED_PROCS[name] = p
-                            _NAMED_JOBS[name] = job_id
-                            _update_registry(name, {
-                                "pid": getattr(p, "pid", None),
-                                "cmd": cmd,
-                                "cwd": cwd or str(repo_root),
-                                "started_at": ts,
-                            })
-                        for line in p.stdout:  # type: ignore[arg-type]
-                            lf.write(line)
-                        rc = p.wait()
-                        lf.write(f"\n[exit {rc}]\n")
-                    except Exception as e:  # pragma: no cover
-                        lf.write(f"\n[error] {e}\n")
-                    finally:
-                        lf.write(f"===== JOB {job_id} END =====\n")
-                        lf.flush()
-                        _CONSOLE_PROCS.pop(job_id, None)
-                        if name and _NAMED_JOBS.get(name) == job_id:
-                            _NAMED_PROCS.pop(name, None)
-                            _NAMED_JOBS.pop(name, None)
-                            _remove_registry(name)
+                rc = None
+                # Read raw chunks so output without a trailing newline (prompts, progress) shows up too
+                decoder = codecs.getincrementaldecoder(locale.getpreferredencoding(False))(errors="replace")
+
+                def _emit(text: str) -> None:
+                    done = _CONSOLE_PROCS.append(job, text)
+                    if done:
+                        console.write("\n".join(done) + "\n", job_id)
+
+                try:
+                    # Ensure singleton per named process
+                    if name:
+                        stop_named(name)
+                    p = subprocess.Popen(
+                        ["powershell", "-NoProfile", "-Command", cmd],
+                        cwd=cwd or str(repo_root),
+                        stdout=subprocess.PIPE,
+                        stderr=subprocess.STDOUT,
+                        bufsize=0,
+                    )
+                    job.proc = p
+                    if name:
+                        _NAMED_PROCS[name] = p
+                        _NAMED_JOBS[name] = job_id
+                        registry.set(name, {
+                            "pid": getattr(p, "pid", None),
+                            "cmd": cmd,
+                            "cwd": cwd or str(repo_root),
+                            "started_at": ts,
+                        })
+                    for chunk in iter(lambda: p.stdout.read(65536), b""):  # type: ignore[union-attr]
+                        _emit(decoder.decode(chunk))
+                    _emit(decoder.decode(b"", final=True))
+                    rc = p.wait()
+                except Exception as e:  # pragma: no cover
+                    _emit(f"\n[error] {e}\n")
+                finally:
+                    rest = _CONSOLE_PROCS.finish(job, rc)
+                    console.end_job(job_id, (rest + "\n" if rest else "") + (f"\n[exit {rc}]\n" if rc is not None else "") + f"===== JOB {job_id} END =====\n")
+                    if name and _NAMED_JOBS.get(name) == job_id:
+                        _NAMED_PROCS.pop(name, None)
+                        _NAMED_JOBS.pop(name, None)
+                        registry.remove(name)
 
             t = threading.Thread(target=_run, daemon=True)
             t.start()
@@ -362,12 +365,11 @@ def main() -> None:
                     spawn_ps(cmd.strip(), cwd=workdir.strip() or None)
         with c4:
             if st.button("Stop All Running"):
-                for p in list(_CONSOLE_PROCS.values()):
+                for job in _CONSOLE_PROCS.running():
                     try:
-                        p.kill()
+                        job.proc.kill()
                     except Exception:
                         pass
-                _CONSOLE_PROCS.clear()
                 _NAMED_PROCS.clear()
                 _NAMED_JOBS.clear()
 
@@ -431,7 +433,7 @@ def main() -> None:
             c.metric(label, "UP" if ok else "DOWN")
 
         st.caption("Tracked processes")
-        reg = _read_registry()
+        reg = registry.snapshot()  # memory, not disk
         if not reg:
             st.write("None")
         else:
@@ -443,22 +445,69 @@ def main() -> None:
                 "started_at": [reg[k].get("started_at") for k in reg.keys()],
             })
 
+        # Show running jobs
+        running = _CONSOLE_PROCS.running()
+        if running:
+            st.caption("Running jobs:")
+            for job in running:
+                st.write(f"JOB {job.job_id} (PID {job.pid or '?'}) running… {job.nbytes // 1024} KiB buffered")
+
+        st.divider()
+        st.caption("Console Output (auto-refresh)")
+        refresh = st.number_input("Refresh (s)", min_value=0, max_value=30, value=2, step=1)
+        lines = st.number_input("Tail lines", min_value=100, max_value=10000, value=1000, step=100)
+        job_ids = sorted(set(console.job_ids()[-50:]) | {jid for jid, _ in _CONSOLE_PROCS.items()})
+        job_sel = st.selectbox("Job", ["All jobs"] + [f"JOB {j}" for j in reversed(job_ids)], key="console-job")
+        if refresh > 0:
+            st.autorefresh(interval=int(refresh * 1000), key="console-refresh")
+        sel_id = None if job_sel == "All jobs" else int(job_sel.split()[-1])
+        view_path = console_log if sel_id is None else console.job_path(sel_id)
+        tail = None
+        if sel_id is not None and sel_id in _CONSOLE_PROCS:
+            # In-memory view: only lines after this session's cursor are copied on each refresh
+            views = st.session_state.setdefault("_job_views", {})
+            view = views.pop(sel_id, None) or {"next": 0, "lines": deque(maxlen=10000)}
+            views[sel_id] = view
+            while len(views) > 8:
+                views.pop(next(iter(views)))
+            res = _CONSOLE_PROCS.read(sel_id, view["next"])
+            if res["gap"]:
+                view["lines"].append(f"… {res['gap']} earlier lines dropped from the buffer …")
+            view["lines"].extend(res["lines"])
+            view["next"] = res["next"]
+            shown = list(view["lines"])[-int(lines):]
+            if res["partial"]:
+                shown.append(res["partial"])
+            tail = "\n".join(shown)
+            st.caption("running" if res["running"] else f"finished (exit {res['returncode']})")
+        elif view_path.exists():
+            # Offset-based tail: a refresh reads only what the jobs appended since the last one
+            from agent.logtail import cached_tailer
+
+            tail = cached_tailer(st.session_state.setdefault("_console_tailers", {}), view_path).text(int(lines))
+        if tail is not None:
+            st.text_area("", value=tail, height=600, label_visibility="collapsed")
+            # Also render content as an HTML <pre> with a test id for headless Playwright
+            try:
+                import html as _html
+                escaped = _html.escape(tail)
+            except Exception:
+                escaped = tail
+            st.markdown(f"<pre data-testid=\"console-output\">{escaped}</pre>", unsafe_allow_html=True)
+            st.markdown('<div data-testid="btn-refresh-now"></div>', unsafe_allow_html=True)
+            st.button("Refresh Now", key="console-refresh-now")
+        else:
+            st.info("No console output yet. Run a command to start logging.")
+
     elif section == "Mem0":
-        st.subheader("Mem0 (file-backed memory store)")
+        st.subheader("Mem0 (note store)")
         try:
             import importlib.metadata as md
             ver = md.version("mem0-mcp")
         except Exception:
             ver = "not installed"
-        st.caption(f"Package: mem0-mcp {ver}")
-
-        # Try to import store helpers
-        try:
-            from mem0_mcp import store as mem0_store  # type: ignore
-            mem0_ok = True
-        except Exception as e:
-            mem0_ok = False
-            st.error(f"mem0_mcp not available: {e}. Install D:\\mem0 or pip install mem0-mcp.")
+        backend = os.getenv("NOTES_BACKEND", "sqlite")
+        st.caption(f"Backend: {backend} • Package: mem0-mcp {ver}")
 
         # Allow setting MEM0_PATH for this session
         import os as _os
@@ -474,30 +523,61 @@ def main() -> None:
                     if "MEM0_PATH" in _os.environ:
                         _os.environ.pop("MEM0_PATH")
                     st.info("MEM0_PATH cleared; using default mem0.json in cwd")
+
+        # Note store (agent.notes): SQLite by default, imports MEM0_PATH's JSON once
+        try:
+            from agent.notes import get_note_store, parse_tags
+
+            note_store = get_note_store()
+            notes_ok = True
+        except Exception as e:
+            notes_ok = False
+            st.error(f"Note store not available: {e}")
+
         with colp2:
-            if mem0_ok and st.button("Show Resolved Path"):
-                try:
-                    st.write(str(mem0_store.MEM_PATH))
-                except Exception as e:
-                    st.warning(f"Unable to resolve: {e}")
+            if notes_ok and st.button("Show Resolved Path"):
+                st.write(str(getattr(note_store, "path", _os.getenv("MEM0_PATH") or "mem0.json")))
 
         st.divider()
-        if mem0_ok:
-            c1, c2, c3 = st.columns([1,1,1])
+        if notes_ok:
+            # Browse page by page (keyset cursors) so large stores never load at once
+            cursors = st.session_state.setdefault("_notes_cursors", [None])
+            c1, c2, c3, c4 = st.columns([1,1,1,1])
+            with c3:
+                show_content = st.checkbox("Show content", value=False, key="notes-show-content")
+            with c4:
+                page_size = int(st.number_input("Page size", min_value=10, max_value=1000, value=50, step=10, key="notes-page-size"))
             with c1:
-                if st.button("List Notes"):
-                    data = mem0_store.load_mem()
-                    titles = [n.get("title", "(untitled)") for n in data.get("notes", [])]
-                    if not titles:
-                        st.info("No notes yet.")
-                    else:
-                        st.write({"notes": titles})
+                if st.button("◀ Prev", disabled=len(cursors) < 2):
+                    cursors.pop()
+            page = note_store.page(cursors[-1], page_size, titles_only=not show_content)
             with c2:
-                if st.button("Dump JSON"):
-                    data = mem0_store.load_mem()
-                    st.code(json.dumps(data, indent=2), language="json")
-            with c3:
-                st.write("")
+                if st.button("Next ▶", disabled=page["next_cursor"] is None):
+                    cursors.append(page["next_cursor"])
+                    page = note_store.page(cursors[-1], page_size, titles_only=not show_content)
+            st.caption(f"{note_store.count()} notes • page {len(cursors)}")
+            if not page["notes"]:
+                st.info("No notes yet.")
+            elif show_content:
+                st.json(page["notes"])
+            else:
+                st.write({"notes": page["notes"]})
+
+            st.subheader("Search Notes")
+            sq1, sq2, sq3 = st.columns([3,2,1])
+            with sq1:
+                search_q = st.text_input("Query", value="", key="notes-search-q")
+            with sq2:
+                search_tags = st.text_input("Tags filter (comma separated)", value="", key="notes-search-tags")
+            with sq3:
+                search_match = st.selectbox("Match", ["all", "any"], key="notes-search-match")
+            if search_q or search_tags:
+                res = note_store.search(search_q, tags=parse_tags(search_tags), match_all=search_match == "all", limit=50)
+                st.caption(f"{res['total']} matches")
+                for hit in res["results"]:
+                    st.markdown(f"**{hit['title']}** · {', '.join(hit['tags'])}")
+                    if hit.get("snippet"):
+                        st.caption(hit["snippet"])
 
             st.subheader("Add Note")
             nt1, nt2 = st.columns([1,3])
@@ -508,69 +588,32 @@ def main() -> None:
             tags = st.text_input("Tags (comma separated)", value="")
             if st.button("Save Note"):
                 try:
-                    tag_list = [t.strip() for t in (tags or "").split(",") if t.strip()]
-                    mem0_store.add_note(title or "(untitled)", content or "", tag_list)
+                    note_store.add(title or "(untitled)", content or "", parse_tags(tags))
                     st.success("Note saved.")
                 except Exception as e:
                     st.error(f"Failed to save: {e}")
 
-        # Show running jobs
-        if _CONSOLE_PROCS:
-            st.caption("Running jobs:")
-            for jid, proc in list(_CONSOLE_PROCS.items()):
-                st.write(f"JOB {jid} (PID {getattr(proc, 'pid', '?')}) running…")
-
-        st.divider()
-        st.caption("Console Output (auto-refresh)")
-        refresh = st.number_input("Refresh (s)", min_value=0, max_value=30, value=2, step=1)
-        lines = st.number_input("Tail lines", min_value=100, max_value=10000, value=1000, step=100)
-        if refresh > 0:
-            st.autorefresh(interval=int(refresh * 1000), key="console-refresh")
-        if console_log.exists():
-            content = console_log.read_text(encoding="utf-8")
-            tail = "\n".join(content.splitlines()[-int(lines):])
-            st.text_area("", value=tail, height=600, label_visibility="collapsed")
-            # Also render content as an HTML <pre> with a test id for headless Playwright
-            try:
-                import html as _html
-                escaped = _html.escape(tail)
-            except Exception:
-                escaped = tail
-            st.markdown(f"<pre data-testid=\"console-output\">{escaped}</pre>", unsafe_allow_html=True)
-            st.markdown('<div data-testid="btn-refresh-now"></div>', unsafe_allow_html=True)
-            st.button("Refresh Now", key="console-refresh-now")
-        else:
-            st.info("No console output yet. Run a command to start logging.")
-
     else:
         # Logs section (consolidated Output Viewer)
         st.subheader("Logs")
 
-        def find_log_files(root: Path, patterns: List[str] = None, max_files: int = 200) -> List[Path]:
-            patterns = patterns or ["*.log"]
-            found: List[Path] = []
-            for pat in patterns:
-                for p in root.rglob(pat):
-                    try:
-                        if p.is_file():
-                            found.append(p)
-                    except Exception:
-                        continue
-                    if len(found) >= max_files:
-                        return sorted(found)
-            return sorted(found)
+        def find_log_files(root: Path) -> "List[LogFile]":
+            # Shared, cached catalog (skips venvs/VCS; LOG_CATALOG_ROOTS/EXCLUDE) with size and mtime.
+            from agent.logfiles import get_log_catalog
+
+            roots = None if os.getenv("LOG_CATALOG_ROOTS") else [root]
+            try:
+                return get_log_catalog(roots).files(sort="path")
+            except Exception:
+                return []
 
         def tail_lines(path: Path, n: int = 500, encoding: str = "utf-8") -> str:
+            # One incremental tailer per session and file: a refresh only reads appended bytes.
+            from agent.logtail import cached_tailer
+
+            tailer = cached_tailer(st.session_state.setdefault("_log_tailers", {}), path, encoding=encoding)
             try:
-                with path.open("rb") as f:
-                    f.seek(0, os.SEEK_END)
-                    size = f.tell()
-                    window = 256 * 1024
-                    start = max(0, size - window)
-                    f.seek(start)
-                    data = f.read().decode(encoding, errors="replace")
-                lines = data.splitlines()
-                return "\n".join(lines[-n:])
+                return tailer.text(n)
             except Exception as e:
                 return f"<error reading file: {e}>"
 
@@ -579,10 +622,13 @@ def main() -> None:
             repo_root / "sportman" / "install_verbose.log",
             repo_root / "sportman" / "server_verbose.log",
         ]
-        logs = find_log_files(repo_root)
-        options = [str(p) for p in defaults if p.exists()] + [str(p) for p in logs]
-        options = sorted(set(options))
+        logs = {str(f.path): f for f in find_log_files(repo_root)}
+        options = [str(p) for p in defaults if p.exists()] + list(logs)
+        options = sorted(set(options))  # stable order/labels so refreshes keep the selection
         sel = st.selectbox("Choose a log file", options) if options else ""
+        recent = sorted(logs.values(), key=lambda f: f.mtime, reverse=True)[:5]
+        if recent:
+            st.caption("Recently written: " + " • ".join(f"{f.path.name} ({f.size // 1024} KiB, {time.strftime('%H:%M:%S', time.localtime(f.mtime))})" for f in recent))
         manual = st.text_input("Or enter a path", value=str(defaults[0]) if defaults and defaults[0].exists() else "")
         path_str = manual or sel
         try:
@@ -608,7 +654,51 @@ def main() -> None:
             st.text_area("Output", value=content, height=600, label_visibility="collapsed", disabled=True)
             if wrap:
                 st.markdown("<style>textarea { white-space: pre-wrap !important; }</style>", unsafe_allow_html=True)
-            st.download_button("Download file", data=path.read_bytes(), file_name=path.name)
+            # Hand the file over only on request instead of reading it on every refresh.
+            if st.toggle("Prepare download", key=f"download-{path}", value=False):
+                size = path.stat().st_size
+                if size <= LOG_DOWNLOAD_MAX_BYTES:
+                    st.download_button("Download file", data=path.read_bytes(), file_name=path.name)
+                else:
+                    st.warning(
+                        f"The file is {size // 2**20} MiB, over the {LOG_DOWNLOAD_MAX_BYTES // 2**20} MiB "
+                        f"the dashboard serves in full; copy it from {path} instead."
+                    )
+                    with path.open("rb") as fh:
+                        fh.seek(size - LOG_DOWNLOAD_MAX_BYTES)
+                        tail_bytes = fh.read(LOG_DOWNLOAD_MAX_BYTES)
+                    st.download_button(
+                        f"Download last {LOG_DOWNLOAD_MAX_BYTES // 2**20} MiB only",
+                        data=tail_bytes,
+                        file_name=f"{path.stem}.tail.log",
+                    )
+
+        # Profiles captured by agent.profiling (PROFILE_MODE or Context {"profile": ...})
+        st.divider()
+        st.subheader("Profiles")
+        try:
+            from agent.profiling import list_profiles, summarize_profile
+
+            profiles = list_profiles()  # PROFILE_DIR, else <LOGS_DIR or repo logs>/profiles
+        except Exception as e:
+            profiles = []
+            st.warning(f"Profiling helpers unavailable: {e}")
+        if not profiles:
+            st.info("No profiles yet. Set PROFILE_MODE=cprofile|sample or pass context {\"profile\": \"sample\"} to a run.")
+        else:
+            labels = [f"{time.ctime(p['mtime'])} • {p['node']} • {p['mode']} • {p['size'] // 1024} KiB" for p in profiles]
+            idx = st.selectbox("Captured profiles (newest first)", range(len(profiles)), format_func=lambda i: labels[i])
+            pc1, pc2 = st.columns(2)
+            with pc1:
+                top_n = int(st.number_input("Top N", min_value=5, max_value=200, value=25, step=5, key="profile-top-n"))
+            with pc2:
+                sort = st.selectbox("Sort by", ["cumtime", "tottime"], help="Inclusive vs own time (samples for collapsed stacks)")
+            chosen = profiles[idx]
+            try:
+                st.dataframe(summarize_profile(chosen["path"], top=top_n, sort=sort), use_container_width=True)
+            except Exception as e:
+                st.error(f"Cannot read profile: {e}")
+            st.download_button("Download profile", data=chosen["path"].read_bytes(), file_name=chosen["path"].name)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,364 @@
+"""End-to-end throughput/latency benchmark against local fake upstreams (offline).
+
+Run: python tests/benchmarks/bench_e2e.py [--targets events,markets] [--concurrency 1,8,32]
+                                          [--requests 200] [--latency-ms 20] [--error-rate 0.02]
+                                          [--rate-429 0.01] [--out results.json] [--compare old.json]
+
+Starts ``fake_upstreams`` in a child process, points ``ODDS_API_BASE`` /
+``ESPN_API_BASE`` at it, then drives each target at each concurrency level.
+Graph targets (``events``, ``markets``, ``sports_data``) run through
+``ainvoke``; ``fetch_*`` targets call the sync fetchers from a thread pool.
+The response cache is off and the Odds API pacer is opened up unless
+``--cache`` / ``--pace`` are given, so every call reaches the fake server.
+
+Each row reports throughput, p50/p95/p99 latency, errors and peak RSS of this
+process (monotonic over the run). Results are written as JSON; ``--compare``
+prints deltas against an earlier file and ``--max-regression`` makes the run
+exit non-zero when throughput or p95 regress by more than that fraction.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from fake_upstreams import UpstreamConfig, UpstreamProcess, base_urls
+
+GRAPH_TARGETS = ("events", "markets", "sports_data")
+FETCH_TARGETS = ("fetch_events", "fetch_markets", "fetch_scoreboard")
+SPORT = "basketball_nba"
+LEAGUE = "basketball/nba/scoreboard"
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+
+def peak_rss_kib() -> Optional[float]:
+    """Peak resident set size of this process in KiB, if the platform exposes it."""
+    try:
+        import resource
+
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return rss / 1024 if sys.platform == "darwin" else float(rss)
+    except ImportError:  # Windows
+        try:
+            import psutil  # type: ignore
+
+            info = psutil.Process().memory_info()
+            return getattr(info, "peak_wset", info.rss) / 1024
+        except Exception:
+            return None
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return float("nan")
+    rank = max(
+        1, min(len(sorted_values), round(pct / 100.0 * len(sorted_values) + 0.5))
+    )
+    return sorted_values[rank - 1]
+
+
+def _summary(
+    target: str,
+    concurrency: int,
+    latencies: List[float],
+    errors: Dict[str, int],
+    wall: float,
+) -> Dict[str, Any]:
+    lat = sorted(latencies)
+    ok = len(lat)
+    return {
+        "target": target,
+        "concurrency": concurrency,
+        "requests": ok + sum(errors.values()),
+        "ok": ok,
+        "errors": errors,
+        "wall_s": round(wall, 4),
+        "throughput_rps": round(ok / wall, 2) if wall > 0 else 0.0,
+        "p50_ms": round(percentile(lat, 50) * 1000, 3),
+        "p95_ms": round(percentile(lat, 95) * 1000, 3),
+        "p99_ms": round(percentile(lat, 99) * 1000, 3),
+        "peak_rss_kib": peak_rss_kib(),
+    }
+
+
+def _graph_call(target: str) -> Callable[[int], Any]:
+    from agent.tasks import events_graph, markets_graph, sports_data_graph
+
+    if target == "events":
+        return lambda i: events_graph.ainvoke({"sport_key": SPORT})
+    if target == "markets":
+        return lambda i: markets_graph.ainvoke(
+            {"sport_key": SPORT, "event_id": f"evt{i:06d}"}
+        )
+    return lambda i: sports_data_graph.ainvoke({"league_path": LEAGUE})
+
+
+def _fetch_call(target: str) -> Callable[[int], Any]:
+    from agent import services
+
+    key = os.environ["ODDS_API_KEY"]
+    if target == "fetch_events":
+        return lambda i: services.fetch_odds_events(key, SPORT)
+    if target == "fetch_markets":
+        return lambda i: services.fetch_odds_markets(key, SPORT, f"evt{i:06d}")
+    return lambda i: services.fetch_espn_scoreboard(LEAGUE)
+
+
+async def _run_async(call: Callable[[int], Any], n: int, concurrency: int) -> tuple:
+    latencies: List[float] = []
+    errors: Dict[str, int] = {}
+    counter = iter(range(n))
+
+    async def worker() -> None:
+        for i in counter:
+            t0 = time.perf_counter()
+            try:
+                await call(i)
+            except Exception as e:
+                errors[type(e).__name__] = errors.get(type(e).__name__, 0) + 1
+            else:
+                latencies.append(time.perf_counter() - t0)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, errors, time.perf_counter() - start
+
+
+def _run_threads(call: Callable[[int], Any], n: int, concurrency: int) -> tuple:
+    def one(i: int) -> tuple:
+        t0 = time.perf_counter()
+        try:
+            call(i)
+        except Exception as e:
+            return None, type(e).__name__
+        return time.perf_counter() - t0, None
+
+    latencies: List[float] = []
+    errors: Dict[str, int] = {}
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for lat, err in pool.map(one, range(n)):
+            if err is None:
+                latencies.append(lat)
+            else:
+                errors[err] = errors.get(err, 0) + 1
+    return latencies, errors, time.perf_counter() - start
+
+
+def _reset_singletons() -> None:
+    # Fresh pools, breakers and pacer per scenario so runs do not leak state.
+    from agent.cache import configure_cache, configure_validators
+    from agent.clients import close_clients, configure_clients
+    from agent.ratelimit import configure_odds_limiter
+    from agent.retry import configure_retries
+
+    close_clients()
+    configure_clients()
+    configure_retries()
+    configure_odds_limiter()
+    configure_cache()
+    configure_validators()
+
+
+def run_scenario(target: str, concurrency: int, n: int, warmup: int) -> Dict[str, Any]:
+    """Run one target at one concurrency level and return its summary row."""
+    _reset_singletons()
+    if target in GRAPH_TARGETS:
+        call = _graph_call(target)
+
+        async def both() -> tuple:
+            await _run_async(call, warmup, concurrency)
+            return await _run_async(call, n, concurrency)
+
+        latencies, errors, wall = asyncio.run(both())
+    else:
+        call = _fetch_call(target)
+        _run_threads(call, warmup, concurrency)
+        latencies, errors, wall = _run_threads(call, n, concurrency)
+    return _summary(target, concurrency, latencies, errors, wall)
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            timeout=5,
+            cwd=Path(__file__).parent,
+        )
+        return out.stdout.strip() or None
+    except Exception:
+        return None
+
+
+def compare(
+    current: Dict[str, Any], baseline: Dict[str, Any], max_regression: Optional[float]
+) -> bool:
+    """Print per-row deltas; return ``False`` if any row regressed beyond ``max_regression``."""
+    old = {(r["target"], r["concurrency"]): r for r in baseline.get("results", [])}
+    ok = True
+    print(
+        f"\ncompared with {baseline.get('meta', {}).get('timestamp')} ({baseline.get('meta', {}).get('git_commit')})"
+    )
+    for row in current["results"]:
+        prev = old.get((row["target"], row["concurrency"]))
+        if prev is None:
+            continue
+        d_tp = (
+            (row["throughput_rps"] - prev["throughput_rps"]) / prev["throughput_rps"]
+            if prev["throughput_rps"]
+            else 0.0
+        )
+        d_p95 = (
+            (row["p95_ms"] - prev["p95_ms"]) / prev["p95_ms"] if prev["p95_ms"] else 0.0
+        )
+        flag = ""
+        if max_regression is not None and (
+            d_tp < -max_regression or d_p95 > max_regression
+        ):
+            flag, ok = "  REGRESSION", False
+        print(
+            f"  {row['target']:<16} c={row['concurrency']:<4} throughput {d_tp:+7.1%}  p95 {d_p95:+7.1%}{flag}"
+        )
+    return ok
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    ap.add_argument("--targets", default=",".join(GRAPH_TARGETS + FETCH_TARGETS))
+    ap.add_argument("--concurrency", default="1,8,32")
+    ap.add_argument("--requests", type=int, default=200)
+    ap.add_argument("--warmup", type=int, default=10)
+    ap.add_argument("--latency-ms", type=float, default=20.0)
+    ap.add_argument("--jitter-ms", type=float, default=5.0)
+    ap.add_argument("--error-rate", type=float, default=0.0)
+    ap.add_argument("--rate-429", type=float, default=0.0)
+    ap.add_argument("--retry-after-s", type=float, default=0.0)
+    ap.add_argument(
+        "--events", type=int, default=50, help="events per Odds API events response"
+    )
+    ap.add_argument(
+        "--bookmakers", type=int, default=15, help="bookmakers per odds response"
+    )
+    ap.add_argument("--scoreboard-events", type=int, default=15)
+    ap.add_argument(
+        "--recorded-dir",
+        default=None,
+        help="serve recorded events/markets/scoreboard.json instead",
+    )
+    ap.add_argument("--cache", action="store_true", help="keep the response cache on")
+    ap.add_argument(
+        "--pace", action="store_true", help="keep the default Odds API pacing"
+    )
+    ap.add_argument(
+        "--out",
+        default=None,
+        help="results JSON (default: tests/benchmarks/results/e2e-<ts>.json)",
+    )
+    ap.add_argument(
+        "--compare", default=None, help="earlier results JSON to diff against"
+    )
+    ap.add_argument(
+        "--max-regression",
+        type=float,
+        default=None,
+        help="e.g. 0.1 fails on >10%% regressions",
+    )
+    ap.add_argument(
+        "--verbose", action="store_true", help="show agent warnings such as http_retry"
+    )
+    args = ap.parse_args()
+    if not args.verbose:
+        logging.getLogger("agent").setLevel(logging.ERROR)
+
+    targets = [t for t in args.targets.split(",") if t]
+    unknown = set(targets) - set(GRAPH_TARGETS + FETCH_TARGETS)
+    if unknown:
+        ap.error(f"unknown targets: {sorted(unknown)}")
+    levels = [int(c) for c in args.concurrency.split(",") if c]
+    upstream = UpstreamConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        rate_429=args.rate_429,
+        retry_after_s=args.retry_after_s,
+        n_events=args.events,
+        n_bookmakers=args.bookmakers,
+        n_scoreboard_events=args.scoreboard_events,
+        recorded_dir=args.recorded_dir,
+    )
+
+    with UpstreamProcess(upstream) as server:
+        odds_base, espn_base = base_urls(server.port)
+        # Must be set before agent modules read Settings.
+        os.environ["ODDS_API_BASE"] = odds_base
+        os.environ["ESPN_API_BASE"] = espn_base
+        os.environ.setdefault("ODDS_API_KEY", "bench")
+        os.environ.setdefault("HTTP_MAX_CONNECTIONS", str(max(levels)))
+        os.environ.setdefault("HTTP_MAX_KEEPALIVE", str(max(levels)))
+        os.environ.setdefault("HTTP_BACKOFF_BASE_S", "0.01")
+        if not args.cache:
+            os.environ["CACHE_ENABLED"] = "0"
+            os.environ["HTTP_CONDITIONAL_REQUESTS"] = "0"
+        if not args.pace:
+            os.environ["ODDS_RATE_PER_S"] = "1000000"
+            os.environ["ODDS_BURST"] = "1000000"
+
+        from agent import jsonparse, services
+
+        services.ODDS_API_BASE, services.ESPN_API_BASE = odds_base, espn_base
+
+        results = []
+        for target in targets:
+            for c in levels:
+                row = run_scenario(target, c, args.requests, args.warmup)
+                results.append(row)
+                errs = sum(row["errors"].values())
+                print(
+                    f"{target:<16} c={c:<4} {row['throughput_rps']:9.1f} req/s  p50 {row['p50_ms']:8.2f}  "
+                    f"p95 {row['p95_ms']:8.2f}  p99 {row['p99_ms']:8.2f} ms  errors {errs:<4} rss {row['peak_rss_kib'] or 0:.0f} KiB"
+                )
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "git_commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "json_backend": jsonparse.backend(),
+            "upstream": vars(upstream),
+            "args": vars(args),
+        },
+        "results": results,
+    }
+    out = (
+        Path(args.out)
+        if args.out
+        else RESULTS_DIR / f"e2e-{time.strftime('%Y%m%d-%H%M%S')}.json"
+    )
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"\nwrote {out}")
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        if not compare(report, baseline, args.max_regression):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,295 @@
+"""Micro-benchmarks for the pure CPU hot paths (no I/O).
+
+Run: python tests/benchmarks/bench_micro.py [--sizes 10,100,1000,10000] [--cases markets,scoreboard,log,settings]
+                                            [--decode] [--min-time 0.2] [--repeat 5] [--out results.json]
+                                            [--compare old.json] [--max-regression 0.1]
+
+Cases:
+
+- ``normalize_markets/<n>``: ``services._normalize_markets`` over an already
+  decoded odds document with ``n`` bookmakers (the loop behind
+  ``fetch_odds_markets``).
+- ``project_scoreboard/<n>``: ``services._project_game`` over ``n`` decoded
+  scoreboard events (the loop behind ``fetch_espn_scoreboard``).
+- ``parse_markets/<n>`` / ``parse_scoreboard/<n>`` (``--decode``): the same
+  from raw bytes, decoding included.
+- ``json_formatter/plain`` / ``json_formatter/extras``: ``_JsonFormatter.format``.
+- ``settings_load``: ``Settings.load()`` with the current environment.
+
+Timing is ``timeit``-style: the loop count is auto-ranged to ``--min-time``
+and the median of ``--repeat`` rounds is reported as ops/sec (plus the best
+round). Allocation columns come from ``tracemalloc`` in a separate pass:
+``alloc_blocks`` / ``alloc_kib`` are the blocks and bytes a call leaves
+allocated (its result), ``peak_kib`` is the transient high-water mark of one
+call. Results are written as JSON next to the end-to-end ones.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import logging
+import platform
+import statistics
+import sys
+import time
+import timeit
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from bench_e2e import RESULTS_DIR, _git_commit
+from payloads import espn_scoreboard, odds_markets
+
+from agent import jsonparse, services
+from agent.config import Settings
+from agent.logs import _JsonFormatter
+
+CASES = ("markets", "scoreboard", "log", "settings")
+
+Case = Tuple[str, Callable[[], Any]]
+
+
+def _markets_cases(sizes: List[int], decode: bool) -> List[Case]:
+    out: List[Case] = []
+    for n in sizes:
+        doc = odds_markets(n)
+        out.append(
+            (f"normalize_markets/{n}", lambda doc=doc: services._normalize_markets(doc))
+        )
+        if decode:
+            raw = json.dumps(doc).encode()
+            out.append(
+                (f"parse_markets/{n}", lambda raw=raw: services._parse_markets(raw))
+            )
+    return out
+
+
+def _scoreboard_cases(sizes: List[int], decode: bool) -> List[Case]:
+    out: List[Case] = []
+    for n in sizes:
+        doc = espn_scoreboard(n)
+        events = doc["events"]
+        out.append(
+            (
+                f"project_scoreboard/{n}",
+                lambda events=events: [services._project_game(ev) for ev in events],
+            )
+        )
+        if decode:
+            raw = json.dumps(doc).encode()
+            out.append(
+                (
+                    f"parse_scoreboard/{n}",
+                    lambda raw=raw: services._parse_scoreboard(raw),
+                )
+            )
+    return out
+
+
+def _log_cases() -> List[Case]:
+    fmt = _JsonFormatter()
+    plain = logging.LogRecord(
+        "agent.services", logging.INFO, __file__, 1, "cache_hit", None, None
+    )
+    extras = logging.LogRecord(
+        "agent.services",
+        logging.WARNING,
+        __file__,
+        1,
+        "http_retry %s",
+        ("odds_markets",),
+        None,
+    )
+    extras.__dict__.update(
+        {
+            "url": "https://api.the-odds-api.com/v4/sports/basketball_nba/events",
+            "attempt": 2,
+            "status": 503,
+            "elapsed_ms": 41.7,
+        }
+    )
+    return [
+        ("json_formatter/plain", lambda: fmt.format(plain)),
+        ("json_formatter/extras", lambda: fmt.format(extras)),
+    ]
+
+
+def _settings_cases() -> List[Case]:
+    return [("settings_load", Settings.load)]
+
+
+def time_case(fn: Callable[[], Any], min_time: float, repeat: int) -> Dict[str, Any]:
+    """Return ops/sec (median and best round) for ``fn`` with an auto-ranged loop count."""
+    timer = timeit.Timer(fn)
+    number, elapsed = timer.autorange()
+    if elapsed < min_time:
+        number = max(1, int(number * min_time / max(elapsed, 1e-9)))
+    rounds = [t / number for t in timer.repeat(repeat=repeat, number=number)]
+    median = statistics.median(rounds)
+    return {
+        "loops": number,
+        "rounds": repeat,
+        "mean_us": statistics.fmean(rounds) * 1e6,
+        "median_us": median * 1e6,
+        "stdev_us": (statistics.stdev(rounds) if len(rounds) > 1 else 0.0) * 1e6,
+        "ops_per_s": 1.0 / median if median else float("inf"),
+        "best_ops_per_s": 1.0 / min(rounds) if min(rounds) else float("inf"),
+    }
+
+
+def allocs_case(fn: Callable[[], Any], calls: int) -> Dict[str, float]:
+    """Return live blocks/bytes left per call and the peak of a single call."""
+    ignore = (
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, __file__),
+    )
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot().filter_traces(ignore)
+        kept = [fn() for _ in range(calls)]
+        after = tracemalloc.take_snapshot().filter_traces(ignore)
+        diff = after.compare_to(before, "filename")
+        blocks = sum(s.count_diff for s in diff)
+        size = sum(s.size_diff for s in diff)
+        del kept
+        gc.collect()
+        tracemalloc.reset_peak()
+        base, _ = tracemalloc.get_traced_memory()
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        "alloc_blocks": max(0.0, blocks / calls),
+        "alloc_kib": max(0.0, size / calls / 1024),
+        "peak_kib": max(0.0, (peak - base) / 1024),
+    }
+
+
+def compare(
+    current: Dict[str, Any], baseline: Dict[str, Any], max_regression: Optional[float]
+) -> bool:
+    """Print per-case deltas; return ``False`` if any case regressed beyond ``max_regression``."""
+    old = {r["case"]: r for r in baseline.get("results", [])}
+    ok = True
+    print(
+        f"\ncompared with {baseline.get('meta', {}).get('timestamp')} ({baseline.get('meta', {}).get('git_commit')})"
+    )
+    for row in current["results"]:
+        prev = old.get(row["case"])
+        if prev is None:
+            continue
+        d_ops = (
+            (row["ops_per_s"] - prev["ops_per_s"]) / prev["ops_per_s"]
+            if prev["ops_per_s"]
+            else 0.0
+        )
+        d_alloc = (
+            (row["alloc_kib"] - prev["alloc_kib"]) / prev["alloc_kib"]
+            if prev["alloc_kib"]
+            else 0.0
+        )
+        flag = ""
+        if max_regression is not None and d_ops < -max_regression:
+            flag, ok = "  REGRESSION", False
+        print(f"  {row['case']:<26} ops/s {d_ops:+7.1%}  alloc {d_alloc:+7.1%}{flag}")
+    return ok
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    ap.add_argument(
+        "--sizes",
+        default="10,100,1000,10000",
+        help="bookmakers / scoreboard events per payload",
+    )
+    ap.add_argument("--cases", default=",".join(CASES))
+    ap.add_argument(
+        "--decode", action="store_true", help="also time the raw-bytes parsers"
+    )
+    ap.add_argument(
+        "--min-time", type=float, default=0.2, help="seconds per timing round"
+    )
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument(
+        "--alloc-calls",
+        type=int,
+        default=20,
+        help="calls averaged for the allocation columns",
+    )
+    ap.add_argument(
+        "--out",
+        default=None,
+        help="results JSON (default: tests/benchmarks/results/micro-<ts>.json)",
+    )
+    ap.add_argument(
+        "--compare", default=None, help="earlier results JSON to diff against"
+    )
+    ap.add_argument(
+        "--max-regression",
+        type=float,
+        default=None,
+        help="e.g. 0.1 fails on >10%% ops/sec regressions",
+    )
+    args = ap.parse_args()
+
+    selected = [c for c in args.cases.split(",") if c]
+    unknown = set(selected) - set(CASES)
+    if unknown:
+        ap.error(f"unknown cases: {sorted(unknown)}")
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+
+    results = []
+    for group in selected:
+        if group == "markets":
+            cases = _markets_cases(sizes, args.decode)
+        elif group == "scoreboard":
+            cases = _scoreboard_cases(sizes, args.decode)
+        elif group == "log":
+            cases = _log_cases()
+        else:
+            cases = _settings_cases()
+        for name, fn in cases:
+            fn()  # warm up
+            row = {"case": name, **time_case(fn, args.min_time, args.repeat)}
+            # Big payloads take long enough per call that a few calls average out.
+            row.update(allocs_case(fn, max(1, min(args.alloc_calls, row["loops"]))))
+            results.append(row)
+            print(
+                f"{name:<26} {row['ops_per_s']:12.1f} ops/s  median {row['median_us']:11.2f} us  "
+                f"alloc {row['alloc_blocks']:9.1f} blocks {row['alloc_kib']:10.2f} KiB  peak {row['peak_kib']:10.2f} KiB"
+            )
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "git_commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "json_backend": jsonparse.backend(),
+            "args": vars(args),
+        },
+        "results": results,
+    }
+    out = (
+        Path(args.out)
+        if args.out
+        else RESULTS_DIR / f"micro-{time.strftime('%Y%m%d-%H%M%S')}.json"
+    )
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"\nwrote {out}")
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        if not compare(report, baseline, args.max_regression):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,75 @@
+"""Compare parse time and peak memory of the scoreboard/markets parsers.
+
+Run: python tests/benchmarks/bench_parse.py [n_events ...]
+
+"legacy" mirrors the original code (stdlib json.loads of the whole body, then
+normalize); "projected" is what the fetchers use now (agent.jsonparse).
+"""
+
+from __future__ import annotations
+
+import json
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict
+
+from payloads import espn_scoreboard, odds_markets
+
+from agent import jsonparse, services
+
+
+def _legacy_scoreboard(raw: bytes) -> Dict[str, Any]:
+    data = json.loads(raw)
+    return {
+        "games": [
+            services._project_game(ev) for ev in (data or {}).get("events", []) or []
+        ]
+    }
+
+
+def _legacy_markets(raw: bytes) -> Dict[str, Any]:
+    return services._normalize_markets(json.loads(raw))
+
+
+def _measure(
+    fn: Callable[[bytes], Any], raw: bytes, repeat: int = 5
+) -> Dict[str, float]:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(raw)
+        best = min(best, time.perf_counter() - t0)
+    tracemalloc.start()
+    fn(raw)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"ms": best * 1000, "peak_kib": peak / 1024}
+
+
+def main(sizes: list[int]) -> None:
+    print(
+        f"decoder={jsonparse.backend()} streaming={'ijson' if jsonparse.ijson is not None else 'off'}"
+    )
+    for n in sizes:
+        raw = json.dumps(espn_scoreboard(n)).encode()
+        rows = {
+            "legacy": _measure(_legacy_scoreboard, raw),
+            "projected": _measure(services._parse_scoreboard, raw),
+        }
+        print(f"scoreboard events={n} body={len(raw) / 1024:.0f}KiB")
+        for name, r in rows.items():
+            print(f"  {name:<10} {r['ms']:8.2f} ms  peak {r['peak_kib']:9.0f} KiB")
+    for n in sizes:
+        raw = json.dumps(odds_markets(n)).encode()
+        rows = {
+            "legacy": _measure(_legacy_markets, raw),
+            "projected": _measure(services._parse_markets, raw),
+        }
+        print(f"markets bookmakers={n} body={len(raw) / 1024:.0f}KiB")
+        for name, r in rows.items():
+            print(f"  {name:<10} {r['ms']:8.2f} ms  peak {r['peak_kib']:9.0f} KiB")
+
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or [15, 100, 1000])
@@ -0,0 +1,205 @@
+"""Local stand-ins for The Odds API and ESPN's scoreboard, for offline benchmarks.
+
+One HTTP/1.1 (keep-alive) server answers both APIs:
+
+- ``/v4/sports/{sport}/events``              -> Odds API events list
+- ``/v4/sports/{sport}/events/{id}/odds``    -> Odds API event odds
+- ``/espn/{league path}``                    -> ESPN scoreboard
+
+Bodies come from ``payloads.py`` (seeded, realistic shapes) or, with
+``recorded_dir``, from recorded ``events.json`` / ``markets.json`` /
+``scoreboard.json`` files. They are serialized once at startup so the server
+costs as little CPU as possible. Latency, 5xx errors and 429s (with
+``Retry-After``) are injected per request.
+
+Run standalone: python tests/benchmarks/fake_upstreams.py --port 8765
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import multiprocessing as mp
+import random
+import threading
+import time
+from dataclasses import asdict, dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from payloads import espn_scoreboard, odds_events, odds_markets
+
+
+@dataclass
+class UpstreamConfig:
+    latency_ms: float = 20.0
+    jitter_ms: float = 5.0
+    error_rate: float = 0.0  # fraction answered with 503
+    rate_429: float = 0.0  # fraction answered with 429 + Retry-After
+    retry_after_s: float = 0.0
+    n_events: int = 50
+    n_bookmakers: int = 15
+    n_scoreboard_events: int = 15
+    recorded_dir: Optional[str] = None
+    seed: int = 0
+
+
+def _bodies(cfg: UpstreamConfig) -> Dict[str, bytes]:
+    recorded = Path(cfg.recorded_dir) if cfg.recorded_dir else None
+
+    def load(name: str, fallback: Any) -> bytes:
+        if recorded is not None and (recorded / name).is_file():
+            return (recorded / name).read_bytes()
+        return json.dumps(fallback).encode()
+
+    return {
+        "events": load("events.json", odds_events(cfg.n_events, seed=cfg.seed)),
+        "markets": load(
+            "markets.json",
+            odds_markets(cfg.n_bookmakers, event_id="{event_id}", seed=cfg.seed),
+        ),
+        "scoreboard": load(
+            "scoreboard.json", espn_scoreboard(cfg.n_scoreboard_events, seed=cfg.seed)
+        ),
+    }
+
+
+def _handler(cfg: UpstreamConfig, bodies: Dict[str, bytes]) -> type:
+    rng = random.Random(cfg.seed)
+    rng_lock = threading.Lock()
+    # The synthetic markets body is a template; split once so each request only
+    # joins bytes. Recorded bodies have no placeholder and are served as-is.
+    markets_head, templated, markets_tail = bodies["markets"].partition(b"{event_id}")
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # Headers and body are separate writes; with Nagle on, delayed ACKs add ~40 ms.
+        disable_nagle_algorithm = True
+
+        def log_message(self, *args: Any) -> None:  # keep benchmark output clean
+            return
+
+        def _send(
+            self, status: int, body: bytes, headers: Optional[Dict[str, str]] = None
+        ) -> None:
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("x-requests-remaining", "1000000")
+            self.send_header("x-requests-used", "0")
+            for k, v in (headers or {}).items():
+                self.send_header(k, v)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self) -> None:  # noqa: N802 - http.server API
+            with rng_lock:
+                delay = (
+                    max(
+                        0.0, cfg.latency_ms + rng.uniform(-cfg.jitter_ms, cfg.jitter_ms)
+                    )
+                    / 1000.0
+                )
+                roll = rng.random()
+            if delay:
+                time.sleep(delay)
+            if roll < cfg.rate_429:
+                self._send(
+                    429,
+                    b'{"message":"rate limited"}',
+                    {"Retry-After": f"{cfg.retry_after_s:g}"},
+                )
+                return
+            if roll < cfg.rate_429 + cfg.error_rate:
+                self._send(503, b'{"message":"unavailable"}')
+                return
+            path = self.path.split("?", 1)[0].rstrip("/")
+            parts = path.split("/")
+            if path.startswith("/v4/sports/") and path.endswith("/events"):
+                self._send(200, bodies["events"])
+            elif (
+                path.startswith("/v4/sports/")
+                and path.endswith("/odds")
+                and len(parts) >= 6
+            ):
+                body = (
+                    markets_head + parts[-2].encode() + markets_tail
+                    if templated
+                    else bodies["markets"]
+                )
+                self._send(200, body)
+            elif path.startswith("/espn/"):
+                self._send(200, bodies["scoreboard"])
+            else:
+                self._send(404, b'{"message":"not found"}')
+
+    return Handler
+
+
+def make_server(
+    cfg: UpstreamConfig, host: str = "127.0.0.1", port: int = 0
+) -> ThreadingHTTPServer:
+    """Return a bound (not yet serving) server; ``port=0`` picks a free port."""
+    server = ThreadingHTTPServer((host, port), _handler(cfg, _bodies(cfg)))
+    server.daemon_threads = True
+    return server
+
+
+def base_urls(port: int, host: str = "127.0.0.1") -> Tuple[str, str]:
+    """Return ``(ODDS_API_BASE, ESPN_API_BASE)`` for a server on ``port``."""
+    return f"http://{host}:{port}/v4", f"http://{host}:{port}/espn"
+
+
+def _serve(cfg_dict: Dict[str, Any], conn: Any) -> None:
+    server = make_server(UpstreamConfig(**cfg_dict))
+    conn.send(server.server_address[1])
+    server.serve_forever()
+
+
+class UpstreamProcess:
+    """Run the fake server in a child process so it does not share the client's GIL or RSS."""
+
+    def __init__(self, cfg: UpstreamConfig) -> None:
+        self.cfg = cfg
+        self.port = 0
+        self._proc: Optional[mp.Process] = None
+
+    def __enter__(self) -> "UpstreamProcess":
+        parent, child = mp.Pipe()
+        self._proc = mp.Process(
+            target=_serve, args=(asdict(self.cfg), child), daemon=True
+        )
+        self._proc.start()
+        if not parent.poll(30):
+            raise RuntimeError("fake upstream server did not start")
+        self.port = parent.recv()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        if self._proc is not None:
+            self._proc.terminate()
+            self._proc.join(5)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    ap.add_argument("--port", type=int, default=8765)
+    for name, value in asdict(UpstreamConfig()).items():
+        if name != "recorded_dir":
+            ap.add_argument(
+                f"--{name.replace('_', '-')}", type=type(value), default=value
+            )
+    ap.add_argument("--recorded-dir", default=None)
+    args = vars(ap.parse_args())
+    port = args.pop("port")
+    server = make_server(UpstreamConfig(**args), port=port)
+    odds, espn = base_urls(port)
+    print(f"ODDS_API_BASE={odds}\nESPN_API_BASE={espn}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+"""Synthetic, realistically shaped upstream payloads for benchmarks.
+
+Shapes follow The Odds API v4 and ESPN's site API closely enough that the
+normalizers see the same nesting and the same amount of unused data.
+"""
+
+from __future__ import annotations
+
+import random
+from typing import Any, Dict, List
+
+_TEAMS = [
+    "Atlanta Hawks",
+    "Boston Celtics",
+    "Brooklyn Nets",
+    "Charlotte Hornets",
+    "Chicago Bulls",
+    "Cleveland Cavaliers",
+    "Dallas Mavericks",
+    "Denver Nuggets",
+    "Detroit Pistons",
+    "Golden State Warriors",
+    "Houston Rockets",
+    "Indiana Pacers",
+    "LA Clippers",
+    "Los Angeles Lakers",
+    "Memphis Grizzlies",
+    "Miami Heat",
+    "Milwaukee Bucks",
+    "Minnesota Timberwolves",
+    "New Orleans Pelicans",
+    "New York Knicks",
+]
+_BOOKS = [
+    "draftkings",
+    "fanduel",
+    "betmgm",
+    "caesars",
+    "pointsbetus",
+    "bovada",
+    "betrivers",
+    "unibet_us",
+    "wynnbet",
+    "superbook",
+    "lowvig",
+    "betonlineag",
+    "mybookieag",
+    "betus",
+    "williamhill_us",
+]
+
+
+def odds_events(n: int, seed: int = 0) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    out = []
+    for i in range(n):
+        home, away = rng.sample(_TEAMS, 2)
+        out.append(
+            {
+                "id": f"evt{i:06d}",
+                "sport_key": "basketball_nba",
+                "sport_title": "NBA",
+                "commence_time": f"2026-10-{1 + i % 28:02d}T23:30:00Z",
+                "home_team": home,
+                "away_team": away,
+            }
+        )
+    return out
+
+
+def odds_markets(
+    n_bookmakers: int, event_id: str = "evt000000", seed: int = 0
+) -> Dict[str, Any]:
+    rng = random.Random(seed)
+    home, away = rng.sample(_TEAMS, 2)
+    bookmakers = []
+    for b in range(n_bookmakers):
+        key = _BOOKS[b % len(_BOOKS)] + ("" if b < len(_BOOKS) else f"_{b}")
+        spread = round(rng.uniform(-9, 9) * 2) / 2
+        total = round(rng.uniform(205, 240) * 2) / 2
+        markets = [
+            {
+                "key": "h2h",
+                "last_update": "2026-10-18T12:00:00Z",
+                "outcomes": [
+                    {"name": home, "price": round(rng.uniform(1.3, 3.5), 2)},
+                    {"name": away, "price": round(rng.uniform(1.3, 3.5), 2)},
+                ],
+            },
+            {
+                "key": "spreads",
+                "last_update": "2026-10-18T12:00:00Z",
+                "outcomes": [
+                    {
+                        "name": home,
+                        "price": round(rng.uniform(1.85, 1.98), 2),
+                        "point": spread,
+                    },
+                    {
+                        "name": away,
+                        "price": round(rng.uniform(1.85, 1.98), 2),
+                        "point": -spread,
+                    },
+                ],
+            },
+            {
+                "key": "totals",
+                "last_update": "2026-10-18T12:00:00Z",
+                "outcomes": [
+                    {
+                        "name": "Over",
+                        "price": round(rng.uniform(1.85, 1.98), 2),
+                        "point": total,
+                    },
+                    {
+                        "name": "Under",
+                        "price": round(rng.uniform(1.85, 1.98), 2),
+                        "point": total,
+                    },
+                ],
+            },
+        ]
+        bookmakers.append(
+            {
+                "key": key,
+                "title": key.replace("_", " ").title(),
+                "last_update": "2026-10-18T12:00:00Z",
+                "markets": markets,
+            }
+        )
+    return {
+        "id": event_id,
+        "sport_key": "basketball_nba",
+        "sport_title": "NBA",
+        "commence_time": "2026-10-18T23:30:00Z",
+        "home_team": home,
+        "away_team": away,
+        "bookmakers": bookmakers,
+    }
+
+
+def _competitor(team: str, home_away: str, rng: random.Random) -> Dict[str, Any]:
+    return {
+        "id": str(rng.randint(1, 30)),
+        "homeAway": home_away,
+        "score": str(rng.randint(80, 140)),
+        "team": {
+            "id": str(rng.randint(1, 30)),
+            "displayName": team,
+            "abbreviation": team[:3].upper(),
+            "color": "000000",
+            "logo": f"https://a.espncdn.com/i/teamlogos/nba/500/{team[:3].lower()}.png",
+            "links": [
+                {
+                    "rel": ["clubhouse", "desktop", "team"],
+                    "href": f"https://www.espn.com/nba/team/_/name/{team[:3].lower()}",
+                }
+            ]
+            * 4,
+        },
+        "linescores": [{"value": rng.randint(15, 40)} for _ in range(4)],
+        "statistics": [
+            {
+                "name": f"stat{k}",
+                "abbreviation": f"S{k}",
+                "displayValue": str(rng.random()),
+            }
+            for k in range(12)
+        ],
+        "leaders": [
+            {
+                "name": cat,
+                "leaders": [
+                    {
+                        "displayValue": str(rng.randint(5, 40)),
+                        "athlete": {
+                            "id": str(rng.randint(1, 5000)),
+                            "fullName": f"Player {rng.randint(1, 500)}",
+                            "headshot": "https://a.espncdn.com/i/headshots/nba/players/full/1.png",
+                        },
+                    }
+                ],
+            }
+            for cat in ("points", "rebounds", "assists")
+        ],
+        "records": [
+            {"name": "overall", "summary": f"{rng.randint(0, 60)}-{rng.randint(0, 60)}"}
+        ],
+    }
+
+
+def espn_scoreboard(n_events: int, seed: int = 0) -> Dict[str, Any]:
+    rng = random.Random(seed)
+    events = []
+    for i in range(n_events):
+        home, away = rng.sample(_TEAMS, 2)
+        events.append(
+            {
+                "id": str(401700000 + i),
+                "uid": f"s:40~l:46~e:{401700000 + i}",
+                "date": "2026-10-18T23:30Z",
+                "name": f"{away} at {home}",
+                "shortName": f"{away[:3].upper()} @ {home[:3].upper()}",
+                "season": {"year": 2027, "type": 2, "slug": "regular-season"},
+                "competitions": [
+                    {
+                        "id": str(401700000 + i),
+                        "venue": {
+                            "fullName": "Arena",
+                            "address": {"city": "City", "state": "ST"},
+                        },
+                        "status": {
+                            "clock": 0,
+                            "displayClock": "0.0",
+                            "period": 4,
+                            "type": {
+                                "id": "3",
+                                "name": "STATUS_FINAL",
+                                "state": "post",
+                                "completed": True,
+                                "description": "Final",
+                            },
+                        },
+                        "competitors": [
+                            _competitor(home, "home", rng),
+                            _competitor(away, "away", rng),
+                        ],
+                        "broadcasts": [{"market": "national", "names": ["ESPN"]}],
+                        "headlines": [
+                            {
+                                "description": "x" * 300,
+                                "type": "Recap",
+                                "shortLinkText": "y" * 80,
+                            }
+                        ],
+                        "odds": [
+                            {
+                                "provider": {"name": "ESPN BET"},
+                                "details": "BOS -5.5",
+                                "overUnder": 221.5,
+                            }
+                        ],
+                    }
+                ],
+                "links": [
+                    {
+                        "rel": ["summary", "desktop", "event"],
+                        "href": f"https://www.espn.com/nba/game/_/gameId/{401700000 + i}",
+                    }
+                ]
+                * 6,
+            }
+        )
+    return {
+        "leagues": [{"id": "46", "name": "National Basketball Association"}],
+        "day": {"date": "2026-10-18"},
+        "events": events,
+    }
@@ -1,6 +1,18 @@
 import pytest
 
+from agent.cache import ValidatorStore, configure_cache, configure_validators
+
 
 @pytest.fixture(scope="session")
 def anyio_backend():
     return "asyncio"
+
+
+@pytest.fixture
+def no_response_cache():
+    """Run with the response cache off and a fresh validator store, then restore the defaults."""
+    configure_cache(None)
+    configure_validators(ValidatorStore())
+    yield
+    configure_cache()
+    configure_validators()
@@ -0,0 +1,174 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from agent.cache import ResponseCache, normalize_key
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _value(v):
+    async def fetch():
+        return v
+
+    return fetch
+
+
+def test_normalize_key_sorts_params_and_drops_credentials() -> None:
+    a = normalize_key(
+        "HTTPS://Api.Example.com/v4/x", {"b": 2, "apiKey": "secret", "a": 1}
+    )
+    b = normalize_key("https://api.example.com/v4/x", {"a": 1, "b": 2})
+    assert a == b == "https://api.example.com/v4/x?a=1&b=2"
+
+
+def test_ttl_lru_and_stats() -> None:
+    clock = _Clock()
+    cache = ResponseCache(max_entries=2, ttls={"ep": 10.0}, stale_s=0.0, clock=clock)
+    calls = []
+
+    def fetch(v):
+        return lambda: calls.append(v) or v
+
+    assert cache.get_or_fetch("ep", "a", fetch("a1")) == "a1"
+    assert cache.get_or_fetch("ep", "a", fetch("a2")) == "a1"
+    cache.get_or_fetch("ep", "b", fetch("b1"))
+    cache.get_or_fetch("ep", "c", fetch("c1"))  # evicts "a"
+    clock.now = 11.0
+    assert cache.get_or_fetch("ep", "b", fetch("b2")) == "b2"
+    stats = cache.stats()
+    assert calls == ["a1", "b1", "c1", "b2"]
+    assert stats["hits"] == 1 and stats["misses"] == 4 and stats["evictions"] == 1
+
+
+def test_stale_while_revalidate_serves_old_value() -> None:
+    clock = _Clock()
+    cache = ResponseCache(ttls={"ep": 1.0}, stale_s=60.0, clock=clock)
+    cache.get_or_fetch("ep", "k", lambda: "old")
+    clock.now = 5.0
+    refreshed = threading.Event()
+
+    def refresh():
+        refreshed.set()
+        return "new"
+
+    assert cache.get_or_fetch("ep", "k", refresh) == "old"
+    assert refreshed.wait(2)
+    deadline = time.time() + 2
+    while (
+        cache.get_or_fetch("ep", "k", lambda: "x") != "new" and time.time() < deadline
+    ):
+        time.sleep(0.01)
+    assert cache.stats()["stale_hits"] >= 1
+
+
+def test_sync_single_flight() -> None:
+    cache = ResponseCache()
+    gate = threading.Event()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        gate.wait(2)
+        return "v"
+
+    results = []
+    threads = [
+        threading.Thread(
+            target=lambda: results.append(cache.get_or_fetch("ep", "k", fetch))
+        )
+        for _ in range(8)
+    ]
+    for t in threads:
+        t.start()
+    time.sleep(0.05)
+    gate.set()
+    for t in threads:
+        t.join()
+    assert results == ["v"] * 8
+    assert len(calls) == 1
+
+
+@pytest.mark.anyio
+async def test_async_single_flight() -> None:
+    cache = ResponseCache()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "v"
+
+    results = await asyncio.gather(
+        *(cache.aget_or_fetch("ep", "k", fetch) for _ in range(10))
+    )
+    assert results == ["v"] * 10
+    assert len(calls) == 1
+    assert cache.stats()["coalesced"] == 9
+
+
+@pytest.mark.anyio
+async def test_async_waiters_survive_cancelled_leader() -> None:
+    cache = ResponseCache()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "v"
+
+    leader = asyncio.ensure_future(cache.aget_or_fetch("ep", "k", fetch))
+    await asyncio.sleep(0.01)
+    waiters = [
+        asyncio.ensure_future(cache.aget_or_fetch("ep", "k", fetch)) for _ in range(3)
+    ]
+    await asyncio.sleep(0.01)
+    leader.cancel()
+    assert await asyncio.gather(*waiters) == ["v"] * 3
+    assert leader.cancelled() and len(calls) == 2  # one waiter took over the fetch
+
+
+@pytest.mark.anyio
+async def test_async_cancelled_waiter_does_not_cancel_flight() -> None:
+    cache = ResponseCache()
+
+    async def fetch():
+        await asyncio.sleep(0.05)
+        return "v"
+
+    leader = asyncio.ensure_future(cache.aget_or_fetch("ep", "k", fetch))
+    await asyncio.sleep(0.01)
+    waiter = asyncio.ensure_future(cache.aget_or_fetch("ep", "k", fetch))
+    await asyncio.sleep(0.01)
+    waiter.cancel()
+    assert await leader == "v"
+    assert waiter.cancelled()
+
+
+@pytest.mark.anyio
+async def test_async_cancelled_refresh_releases_waiters() -> None:
+    clock = _Clock()
+    cache = ResponseCache(ttls={"ep": 1.0}, stale_s=10.0, clock=clock)
+    assert await cache.aget_or_fetch("ep", "k", _value("old")) == "old"
+    clock.now = 5.0  # stale: served while a background refresh starts
+    release = asyncio.Event()
+
+    async def slow_refresh():
+        await release.wait()
+        return "never"
+
+    assert await cache.aget_or_fetch("ep", "k", slow_refresh) == "old"
+    [refresh] = cache._tasks
+    clock.now = 20.0  # expired: the next caller waits on the refresh
+    waiter = asyncio.ensure_future(cache.aget_or_fetch("ep", "k", _value("new")))
+    await asyncio.sleep(0.01)
+    refresh.cancel()
+    assert await asyncio.wait_for(waiter, 1) == "new"
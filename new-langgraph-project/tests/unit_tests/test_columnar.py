@@ -0,0 +1,59 @@
+import json
+
+import pytest
+
+from agent.columnar import ColumnarMarkets
+
+MARKETS = {
+    "event_id": "e1",
+    "sport_key": "basketball_nba",
+    "markets": [
+        {
+            "bookmaker": "A",
+            "market": "h2h",
+            "outcomes": [
+                {"name": "X", "price": 2.0, "point": None},
+                {"name": "Y", "price": 1.8, "point": None},
+            ],
+        },
+        {
+            "bookmaker": "B",
+            "market": "h2h",
+            "outcomes": [
+                {"name": "X", "price": 2.1, "point": None},
+                {"name": "Y", "price": 1.75, "point": None},
+            ],
+        },
+        {
+            "bookmaker": "B",
+            "market": "spreads",
+            "outcomes": [
+                {"name": "X", "price": 1.91, "point": -3.5},
+                {"name": "Y", "price": 1.91, "point": 3.5},
+            ],
+        },
+    ],
+}
+
+
+def test_round_trips_dict_and_json_shapes() -> None:
+    col = ColumnarMarkets.from_markets(MARKETS)
+    assert len(col) == 6 and col.bookmakers.values == ["A", "B"]
+    assert col.to_markets() == MARKETS
+    payload = json.loads(json.dumps(col.to_json()))
+    assert ColumnarMarkets.from_json(payload).to_markets() == MARKETS
+
+
+def test_best_prices_and_overround() -> None:
+    col = ColumnarMarkets.from_markets(MARKETS)
+    best = {
+        (b["market"], b["name"], b["point"]): (b["bookmaker"], b["price"])
+        for b in col.best_prices()
+    }
+    assert best[("h2h", "X", None)] == ("B", 2.1)
+    assert best[("h2h", "Y", None)] == ("A", 1.8)
+    margins = {(o["bookmaker"], o["market"]): o["overround"] for o in col.overround()}
+    assert margins[("A", "h2h")] == pytest.approx(1 / 2.0 + 1 / 1.8 - 1)
+    probs = col.implied_probabilities()
+    assert probs[0] + probs[1] == pytest.approx(1.0)
+    assert col.implied_probabilities(remove_vig=False)[0] == pytest.approx(0.5)
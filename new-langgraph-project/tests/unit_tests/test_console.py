@@ -0,0 +1,189 @@
+import json
+import os
+import threading
+
+from agent.console import ConsoleJobs, ConsoleLog, ProcessRegistry
+from agent.logtail import LogTailer
+
+
+def test_jobs_append_to_console_and_job_logs(tmp_path) -> None:
+    log = ConsoleLog(tmp_path / "console.log")
+    a = log.start_job("== A ==\n")
+    b = log.start_job("== B ==\n")
+    log.write("a1\n", a)
+    log.write("b1\n", b)
+    log.end_job(a, "end A\n")
+    log.write("late\n", a)  # closed job: console log only
+    log.close()
+    assert (a, b) == (1, 2)
+    assert (
+        tmp_path / "console.log"
+    ).read_text() == "== A ==\n== B ==\na1\nb1\nend A\nlate\n"
+    assert log.job_path(a).read_text() == "== A ==\na1\nend A\n"
+    assert log.job_path(b).read_text() == "== B ==\nb1\n"
+    # ids continue after a restart
+    assert ConsoleLog(tmp_path / "console.log").start_job() == 3
+
+
+def test_size_rotation_keeps_backups_and_tail_follows(tmp_path) -> None:
+    path = tmp_path / "console.log"
+    log = ConsoleLog(path, max_bytes=100, backups=2)
+    tailer = LogTailer(path)
+    for i in range(10):
+        log.write(f"line-{i:02d} " + "x" * 20 + "\n")  # 29 bytes: 3 per file
+        if i == 4:
+            assert tailer.read(2)[-1].startswith("line-04")
+    log.close()
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "console.log",
+        "console.log.1",
+        "console.log.2",
+    ]
+    assert all(p.stat().st_size <= 100 for p in tmp_path.iterdir())
+    assert [line[:7] for line in tailer.read(5)] == [
+        "line-09"
+    ]  # rotated: new file only
+    assert (tmp_path / "console.log.1").read_text().startswith("line-06")
+
+
+def test_concurrent_writers_never_interleave(tmp_path) -> None:
+    log = ConsoleLog(tmp_path / "console.log")
+    jobs = [log.start_job() for _ in range(4)]
+
+    def run(job_id: int) -> None:
+        for i in range(200):
+            log.write(f"{job_id}:{i}:" + "y" * 50 + "\n", job_id)
+
+    threads = [threading.Thread(target=run, args=(j,)) for j in jobs]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    log.close()
+    lines = (tmp_path / "console.log").read_text().splitlines()
+    assert len(lines) == 800 and all(line.endswith("y" * 50) for line in lines)
+    assert len(log.job_path(jobs[0]).read_text().splitlines()) == 200
+
+
+def test_old_job_logs_are_pruned(tmp_path) -> None:
+    log = ConsoleLog(tmp_path / "console.log", keep_jobs=2)
+    for _ in range(5):
+        log.end_job(log.start_job("x\n"))
+    assert sorted(p.name for p in log.jobs_dir.iterdir()) == ["3.log", "4.log", "5.log"]
+
+
+def test_job_buffer_reads_incrementally_with_partial_lines() -> None:
+    jobs = ConsoleJobs()
+    job = jobs.start(7, cmd="dir")
+    assert jobs.append(job, "one\r\ntw") == ["one"]
+    first = jobs.read(7)
+    assert first["lines"] == ["one"] and first["partial"] == "tw" and first["running"]
+    assert jobs.append(job, "o\nthree\n") == ["two", "three"]
+    second = jobs.read(7, first["next"])
+    assert (
+        second["lines"] == ["two", "three"]
+        and second["partial"] == ""
+        and second["gap"] == 0
+    )
+    jobs.append(job, "no newline")
+    assert jobs.finish(job, 0) == "no newline"
+    done = jobs.read(7, second["next"])
+    assert (
+        done["lines"] == ["no newline"]
+        and not done["running"]
+        and done["returncode"] == 0
+    )
+    assert jobs.tail(7, 2) == ["three", "no newline"]
+
+
+def test_per_job_line_cap_reports_gap() -> None:
+    jobs = ConsoleJobs(max_lines=10)
+    job = jobs.start(1)
+    jobs.append(job, "".join(f"{i}\n" for i in range(25)))
+    res = jobs.read(1, 5)
+    assert (
+        res["lines"] == [str(i) for i in range(15, 25)]
+        and res["gap"] == 10
+        and job.dropped == 15
+    )
+
+
+def test_total_cap_drops_finished_jobs_then_trims_largest() -> None:
+    jobs = ConsoleJobs(max_bytes=1000, max_lines=10_000)
+    done = jobs.start(1)
+    jobs.append(done, "d" * 99 + "\n")  # 100 chars
+    jobs.finish(done, 0)
+    quiet = jobs.start(2)
+    jobs.append(quiet, "q" * 49 + "\n")
+    chatty = jobs.start(3)
+    for _ in range(30):
+        jobs.append(chatty, "c" * 49 + "\n")
+    assert 1 not in jobs  # finished job went first
+    assert jobs.nbytes <= 1000 and jobs.nbytes == sum(j.nbytes for _, j in jobs.items())
+    assert jobs.tail(2, 5) == ["q" * 49]  # the quiet job keeps its output
+    assert chatty.dropped > 0 and [j.job_id for j in jobs.running()] == [2, 3]
+
+
+def test_keeps_only_recent_finished_jobs() -> None:
+    jobs = ConsoleJobs(keep_finished=2)
+    for i in range(4):
+        jobs.finish(jobs.start(i), 0)
+    assert [jid for jid, _ in jobs.items()] == [2, 3]
+
+
+def test_registry_reconciles_dead_pids_on_load(tmp_path) -> None:
+    path = tmp_path / "process_registry.json"
+    path.write_text(
+        json.dumps(
+            {
+                "live": {"pid": os.getpid()},
+                "dead": {"pid": 999_999_999},
+                "bad": {"pid": None},
+            }
+        )
+    )
+    registry = ProcessRegistry(path, debounce_s=0)
+    assert list(registry.snapshot()) == ["live"]
+    assert list(json.loads(path.read_text())) == ["live"]
+
+
+def test_registry_debounces_and_writes_atomically(tmp_path) -> None:
+    path = tmp_path / "process_registry.json"
+    registry = ProcessRegistry(path, debounce_s=60, is_alive=lambda pid: True)
+    registry.set("sportman", {"pid": 1, "cmd": "langgraph dev"})
+    registry.set("template", {"pid": 2})
+    registry.remove("template")
+    assert (
+        not path.exists() and registry.get("sportman")["pid"] == 1
+    )  # reads come from memory
+    registry.flush()
+    assert json.loads(path.read_text()) == {
+        "sportman": {"pid": 1, "cmd": "langgraph dev"}
+    }
+    assert [p.name for p in tmp_path.iterdir()] == [
+        "process_registry.json"
+    ]  # no temp files left
+    registry.flush()  # nothing pending: no rewrite
+    assert (
+        ProcessRegistry(path, is_alive=lambda pid: True).snapshot()
+        == registry.snapshot()
+    )
+
+
+def test_registry_concurrent_updates_lose_nothing(tmp_path) -> None:
+    path = tmp_path / "process_registry.json"
+    registry = ProcessRegistry(path, debounce_s=0.01, is_alive=lambda pid: True)
+
+    def run(i: int) -> None:
+        for j in range(50):
+            registry.set(f"job-{i}-{j}", {"pid": j})
+        registry.remove(f"job-{i}-0")
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    registry.flush()
+    assert len(registry.snapshot()) == 8 * 49
+    assert json.loads(path.read_text()) == registry.snapshot()
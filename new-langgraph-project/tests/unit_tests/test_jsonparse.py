@@ -0,0 +1,25 @@
+import json
+
+import pytest
+
+from agent import jsonparse
+
+
+@pytest.mark.parametrize("threshold", [0, 1 << 30])
+def test_iter_items_matches_full_parse(threshold: int) -> None:
+    raw = json.dumps(
+        {"events": [{"id": "1", "x": 1.5}, {"id": "2"}], "other": None}
+    ).encode()
+    items = list(jsonparse.iter_items(raw, "events.item", stream_threshold=threshold))
+    assert items == [{"id": "1", "x": 1.5}, {"id": "2"}]
+    assert (
+        list(jsonparse.iter_items(raw, "other.item", stream_threshold=threshold)) == []
+    )
+    assert list(
+        jsonparse.iter_items(b"[1, 2]", "item", stream_threshold=threshold)
+    ) == [1, 2]
+
+
+def test_loads_empty_body() -> None:
+    assert jsonparse.loads(b"") is None
+    assert jsonparse.loads(b'{"a": 1}') == {"a": 1}
@@ -0,0 +1,62 @@
+import os
+
+from agent.logfiles import LogCatalog
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _touch(path, text: str = "x\n", mtime: float = None) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+
+
+def test_skips_venvs_vcs_and_excluded_roots(tmp_path) -> None:
+    _touch(tmp_path / "server.log")
+    _touch(tmp_path / "logs" / "console.log")
+    _touch(tmp_path / "logs" / "notes.txt")
+    _touch(tmp_path / ".git" / "hooks.log")
+    _touch(tmp_path / "node_modules" / "pkg" / "npm.log")
+    _touch(tmp_path / "env311" / "pyvenv.cfg", "home = /usr\n")
+    _touch(tmp_path / "env311" / "lib" / "pip.log")
+    _touch(tmp_path / "build" / "out.log")
+    catalog = LogCatalog([tmp_path], exclude=[tmp_path / "build"])
+    names = sorted(f.path.relative_to(tmp_path).as_posix() for f in catalog.files())
+    assert names == ["logs/console.log", "server.log"]
+
+
+def test_sorted_by_recency_with_size_and_mtime(tmp_path) -> None:
+    _touch(tmp_path / "old.log", "a\n", mtime=1_000)
+    _touch(tmp_path / "sub" / "new.log", "abcd\n", mtime=2_000)
+    files = LogCatalog([tmp_path]).files()
+    assert [f.path.name for f in files] == ["new.log", "old.log"]
+    assert files[0].size == 5 and files[0].mtime == 2_000
+
+
+def test_cache_lists_only_changed_directories(tmp_path) -> None:
+    for d in ("a", "b", "c"):
+        _touch(tmp_path / d / f"{d}.log")
+    clock = _Clock()
+    catalog = LogCatalog([tmp_path], ttl_s=5.0, clock=clock)
+    assert len(catalog.files()) == 3 and catalog.scans == 4
+    _touch(tmp_path / "b" / "b2.log")
+    assert len(catalog.files()) == 3 and catalog.scans == 4  # within ttl: cached
+    clock.now = 10.0
+    _touch(tmp_path / "a" / "a.log", "grown\n" * 10)  # append: dir mtime unchanged
+    files = {f.path.name: f for f in catalog.files()}
+    assert sorted(files) == ["a.log", "b.log", "b2.log", "c.log"] and catalog.scans == 5
+    assert files["a.log"].size == 60
+
+
+def test_max_files_truncates(tmp_path) -> None:
+    for i in range(5):
+        _touch(tmp_path / f"{i}.log")
+    catalog = LogCatalog([tmp_path], max_files=3)
+    assert len(catalog.files()) == 3 and catalog.truncated
@@ -0,0 +1,88 @@
+import dataclasses
+import json
+import logging
+import queue
+
+from agent.config import Settings
+from agent.logs import (
+    BoundedQueueHandler,
+    SamplingFilter,
+    _JsonFormatter,
+    setup_json_logging,
+    stop_json_logging,
+)
+
+
+def _record(msg: str, **extra) -> logging.LogRecord:
+    rec = logging.makeLogRecord(
+        {"name": "t", "levelno": logging.WARNING, "levelname": "WARNING", "msg": msg}
+    )
+    rec.__dict__.update(extra)
+    return rec
+
+
+def test_formatter_includes_extras() -> None:
+    out = json.loads(
+        _JsonFormatter().format(
+            _record("http_retry", attempt=2, url="https://x", delay_s=0.5)
+        )
+    )
+    assert out == {
+        "level": "WARNING",
+        "name": "t",
+        "message": "http_retry",
+        "attempt": 2,
+        "url": "https://x",
+        "delay_s": 0.5,
+    }
+
+
+def test_bounded_queue_drop_policies() -> None:
+    q: queue.Queue = queue.Queue(maxsize=2)
+    h = BoundedQueueHandler(q, policy="drop_new")
+    for i in range(4):
+        h.handle(_record(f"m{i}"))
+    assert h.dropped == 2 and [q.get_nowait().msg for _ in range(2)] == ["m0", "m1"]
+    h.handle(_record("m4"))  # room again: record plus a drop notice
+    assert q.get_nowait().msg == "m4"
+    notice = q.get_nowait()
+    assert notice.msg == "log_records_dropped" and notice.dropped == 2
+
+    q = queue.Queue(maxsize=2)
+    h = BoundedQueueHandler(q, policy="drop_oldest")
+    for i in range(3):
+        h.handle(_record(f"m{i}"))
+    assert h.dropped == 1 and [q.get_nowait().msg for _ in range(2)] == ["m1", "m2"]
+
+
+def test_queued_setup_writes_json_off_thread(capsys) -> None:
+    cfg = dataclasses.replace(Settings.load(), log_queue=True, log_queue_size=100)
+    setup_json_logging(settings=cfg)
+    try:
+        logging.getLogger("agent.test").warning(
+            "hello %s", "world", extra={"attempt": 1}
+        )
+    finally:
+        stop_json_logging()
+        logging.getLogger().handlers.clear()
+    line = json.loads(capsys.readouterr().out.strip())
+    assert line["message"] == "hello world" and line["attempt"] == 1
+
+
+def test_sampling_filter_collapses_repeats_per_key() -> None:
+    now = [0.0]
+    emitted: list = []
+    f = SamplingFilter(
+        burst=2, window_s=10.0, emit=emitted.append, clock=lambda: now[0]
+    )
+    passed = [f.filter(_record("http_retry", url="https://a")) for _ in range(5)]
+    assert passed == [True, True, False, False, False]
+    assert f.filter(
+        _record("http_retry", url="https://b")
+    )  # other host has its own budget
+    now[0] = 11.0
+    assert f.filter(_record("http_retry", url="https://a"))
+    assert len(emitted) == 1
+    summary = emitted[0]
+    assert summary.getMessage() == "suppressed 3 similar: http_retry"
+    assert summary.suppressed == 3 and summary.url == "https://a" and f.filter(summary)
@@ -0,0 +1,68 @@
+import os
+
+from agent.logtail import LogTailer, read_last_lines
+
+
+def _write(path, text: str, mode: str = "a") -> None:
+    with open(path, mode, encoding="utf-8", newline="") as fh:
+        fh.write(text)
+
+
+def test_backward_read_returns_exactly_n_long_lines(tmp_path) -> None:
+    path = tmp_path / "server.log"
+    lines = [f"{i:05d} " + "x" * 3000 for i in range(200)]
+    _write(path, "\n".join(lines) + "\n", "w")
+    with path.open("rb") as fh:
+        got, partial, at_start = read_last_lines(fh, 120, block_size=4096)
+    assert [g.decode() for g in got] == lines[-120:] and partial == b"" and not at_start
+    assert LogTailer(path, block_size=4096).read(150) == lines[-150:]
+
+
+def test_reads_only_appended_bytes_and_keeps_partial_line(tmp_path) -> None:
+    path = tmp_path / "a.log"
+    _write(path, "one\ntwo\n", "w")
+    tailer = LogTailer(path)
+    assert tailer.read(10) == ["one", "two"]
+    _write(path, "thr")
+    assert tailer.read(10) == ["one", "two", "thr"]
+    _write(path, "ee\r\nfour\n")
+    assert tailer.read(2) == ["three", "four"]
+    assert tailer.offset == path.stat().st_size
+
+
+def test_ring_buffer_is_bounded(tmp_path) -> None:
+    path = tmp_path / "a.log"
+    _write(path, "".join(f"{i}\n" for i in range(50)), "w")
+    tailer = LogTailer(path, max_lines=20)
+    tailer.read(5)
+    _write(path, "".join(f"{i}\n" for i in range(50, 100)))
+    assert tailer.read(100) == [str(i) for i in range(80, 100)]
+    assert len(tailer._lines) == 20
+
+
+def test_growing_n_walks_back_again(tmp_path) -> None:
+    path = tmp_path / "a.log"
+    _write(path, "".join(f"{i}\n" for i in range(100)), "w")
+    tailer = LogTailer(path)
+    assert tailer.read(5) == [str(i) for i in range(95, 100)]
+    assert tailer.read(30) == [str(i) for i in range(70, 100)]
+    assert tailer.read(500) == [str(i) for i in range(100)]
+
+
+def test_truncation_and_rotation_reset(tmp_path) -> None:
+    path = tmp_path / "a.log"
+    _write(path, "old-1\nold-2\n", "w")
+    tailer = LogTailer(path)
+    assert tailer.read(10) == ["old-1", "old-2"]
+    _write(path, "new\n", "w")  # truncated in place
+    assert tailer.read(10) == ["new"] and tailer.resets == 1
+    os.replace(path, tmp_path / "a.log.1")
+    _write(
+        path, "rotated-1\nrotated-2\nrotated-3\n", "w"
+    )  # new inode, larger than before
+    assert (
+        tailer.read(10) == ["rotated-1", "rotated-2", "rotated-3"]
+        and tailer.resets == 2
+    )
+    path.unlink()
+    assert tailer.read(10) == []
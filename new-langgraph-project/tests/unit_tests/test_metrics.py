@@ -0,0 +1,75 @@
+import time
+
+import httpx
+import pytest
+
+from agent.clients import configure_clients
+from agent.metrics import MetricsRegistry, configure_metrics, get_metrics, timed
+from agent.tasks import metrics_graph, sports_data_graph
+
+
+@pytest.fixture(autouse=True)
+def _fresh_registry(no_response_cache):
+    configure_metrics(MetricsRegistry())
+    yield
+    configure_metrics()
+
+
+def test_histogram_exposition() -> None:
+    reg = get_metrics()
+    h = reg.histogram("lat_seconds", "Latency.", ("endpoint",), buckets=(0.1, 1.0))
+    for v in (0.05, 0.5, 5.0):
+        h.observe(v, endpoint='a"b')
+    reg.counter("calls_total", "Calls.", ("status",)).inc(status="200")
+    text = reg.render()
+    assert 'lat_seconds_bucket{endpoint="a\\"b",le="0.1"} 1' in text
+    assert 'lat_seconds_bucket{endpoint="a\\"b",le="+Inf"} 3' in text
+    assert 'lat_seconds_count{endpoint="a\\"b"} 3' in text
+    assert (
+        "# TYPE calls_total counter" in text and 'calls_total{status="200"} 1' in text
+    )
+
+
+def test_disabled_registry_records_nothing_and_is_cheap() -> None:
+    configure_metrics(MetricsRegistry(enabled=False))
+
+    @timed("op_seconds", op="x")
+    def op() -> int:
+        return 1
+
+    n = 100_000
+    start = time.perf_counter()
+    for _ in range(n):
+        op()
+    per_call = (time.perf_counter() - start) / n
+    assert get_metrics().render() == ""
+    assert per_call < 5e-6  # generous bound for slow CI; ~0.1-0.3us locally
+
+
+def _scoreboard(request: httpx.Request) -> httpx.Response:
+    return httpx.Response(200, json={"events": []})
+
+
+@pytest.mark.anyio
+async def test_graph_run_records_node_upstream_and_normalize_metrics() -> None:
+    configure_clients(async_transport=httpx.MockTransport(_scoreboard))
+    try:
+        await sports_data_graph.ainvoke({"league_path": "basketball/nba/scoreboard"})
+    finally:
+        configure_clients()
+    reg = get_metrics()
+    assert (
+        reg.histogram("graph_node_seconds", labelnames=("node", "status")).count(
+            node="sports_data_node", status="ok"
+        )
+        == 1
+    )
+    assert (
+        reg.counter(
+            "upstream_requests_total", labelnames=("endpoint", "status", "attempt")
+        ).value(endpoint="espn_scoreboard", status="200", attempt=0)
+        == 1
+    )
+    text = (await metrics_graph.ainvoke({}))["result"]
+    assert 'normalize_seconds_count{endpoint="espn_scoreboard"} 1' in text
+    assert 'fetch_seconds_count{endpoint="espn_scoreboard",status="ok"} 1' in text
@@ -0,0 +1,167 @@
+import json
+import threading
+
+from agent.graph import (
+    mem_add_graph,
+    mem_bulk_add_graph,
+    mem_dump_graph,
+    mem_list_graph,
+    mem_search_graph,
+)
+from agent.notes import SqliteNoteStore, default_db_path, iter_pages
+
+
+def test_add_list_dump(tmp_path) -> None:
+    store = SqliteNoteStore(tmp_path / "notes.sqlite3")
+    store.add("First", "hello", "a, b")
+    store.add("", "no title", [])
+    assert store.list_titles() == ["First", "(untitled)"]
+    notes = store.dump()["notes"]
+    assert notes[0]["tags"] == ["a", "b"] and notes[0]["content"] == "hello"
+    assert store.count() == 2
+
+
+def test_migrates_legacy_json_once(tmp_path) -> None:
+    legacy = tmp_path / "mem0.json"
+    legacy.write_text(
+        json.dumps(
+            {
+                "notes": [
+                    {"title": "Old", "content": "x", "tags": ["t"], "source": "mem0"}
+                ]
+            }
+        )
+    )
+    db = tmp_path / "notes.sqlite3"
+    store = SqliteNoteStore(db, legacy_json=legacy)
+    assert store.dump()["notes"][0]["source"] == "mem0"
+    assert SqliteNoteStore(db, legacy_json=legacy).count() == 1
+    assert store.migrate_json(legacy) == 0
+
+
+def test_concurrent_writers_do_not_lose_notes(tmp_path) -> None:
+    db = tmp_path / "notes.sqlite3"
+    stores = [SqliteNoteStore(db), SqliteNoteStore(db)]  # two "processes"
+
+    def writer(i: int) -> None:
+        for j in range(50):
+            stores[i % 2].add(f"n{i}-{j}", "", [])
+
+    threads = [threading.Thread(target=writer, args=(i,)) for i in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert stores[0].count() == 200
+
+
+def test_mem_graphs_use_sqlite_backend(tmp_path, monkeypatch) -> None:
+    monkeypatch.setenv("NOTES_DB_PATH", str(tmp_path / "graph.sqlite3"))
+    monkeypatch.setenv("MEM0_PATH", str(tmp_path / "missing.json"))
+    assert (
+        mem_add_graph.invoke({"title": "T", "content": "C", "tags": "x"})["ok"] is True
+    )
+    assert mem_list_graph.invoke({})["notes"] == ["T"]
+    out = mem_search_graph.invoke({"query": "c", "tags": "x"})
+    assert out["total"] == 1 and out["results"][0]["title"] == "T"
+
+
+def test_search_ranks_and_filters_by_tags(tmp_path) -> None:
+    store = SqliteNoteStore(tmp_path / "notes.sqlite3")
+    store.add("Lakers line movement", "spread moved to -5", "nba, odds")
+    store.add("Celtics", "injury report", "nba")
+    store.add("Misc", "the lakers came up again", "misc")
+    res = store.search("laker")
+    assert res["total"] == 2 and res["results"][0]["title"] == "Lakers line movement"
+    assert [r["title"] for r in store.search(tags="NBA, odds")["results"]] == [
+        "Lakers line movement"
+    ]
+    assert store.search(tags="odds, misc", match_all=False)["total"] == 2
+    page = store.search(tags="nba", limit=1)
+    assert page["total"] == 2 and page["next_offset"] == 1
+    assert store.search('"unbalanced (query')["total"] == 0
+
+
+def test_search_index_backfills_existing_notes(tmp_path) -> None:
+    legacy = tmp_path / "mem0.json"
+    legacy.write_text(
+        json.dumps(
+            {"notes": [{"title": "Old parlay idea", "content": "x", "tags": ["t"]}]}
+        )
+    )
+    store = SqliteNoteStore(tmp_path / "notes.sqlite3", legacy_json=legacy)
+    assert store.search("parlay")["total"] == 1
+
+
+def test_keyset_pages_cover_store(tmp_path) -> None:
+    store = SqliteNoteStore(tmp_path / "notes.sqlite3")
+    for i in range(7):
+        store.add(f"n{i}", "body", [])
+    first = store.page(None, 3, titles_only=True)
+    assert first == {"notes": ["n0", "n1", "n2"], "next_cursor": 3}
+    pages = list(iter_pages(store, limit=3))
+    assert [len(p["notes"]) for p in pages] == [3, 3, 1]
+    assert (
+        pages[-1]["next_cursor"] is None and pages[0]["notes"][0]["content"] == "body"
+    )
+
+
+def test_mem_dump_graph_streams_pages(tmp_path, monkeypatch) -> None:
+    monkeypatch.setenv("NOTES_DB_PATH", str(tmp_path / "graph.sqlite3"))
+    monkeypatch.setenv("MEM0_PATH", str(tmp_path / "missing.json"))
+    for i in range(5):
+        mem_add_graph.invoke({"title": f"t{i}", "content": "c"})
+    paged = mem_list_graph.invoke({"limit": 2, "cursor": 2})
+    assert paged["notes"] == ["t2", "t3"] and paged["next_cursor"] == 4
+    chunks = [
+        c
+        for mode, c in mem_dump_graph.stream(
+            {"stream": True, "limit": 2}, stream_mode=["custom", "values"]
+        )
+        if mode == "custom"
+    ]
+    assert [c["done"] for c in chunks] == [2, 4, 5]
+    assert chunks[-1]["notes"][0]["title"] == "t4" and chunks[-1]["next_cursor"] is None
+
+
+def test_mem_bulk_add_batches_and_reports_failures(tmp_path, monkeypatch) -> None:
+    monkeypatch.setenv("NOTES_DB_PATH", str(tmp_path / "graph.sqlite3"))
+    monkeypatch.setenv("MEM0_PATH", str(tmp_path / "missing.json"))
+    jsonl = tmp_path / "notes.jsonl"
+    lines = [
+        json.dumps({"title": f"j{i}", "content": "x", "tags": "bulk"}) for i in range(5)
+    ]
+    jsonl.write_text("\n".join(lines[:2] + ["{not json", ""] + lines[2:]) + "\n")
+    notes = [{"title": "a", "content": "b", "tags": ["t"]}, "oops", {"title": ""}]
+    chunks = []
+    final = None
+    for mode, chunk in mem_bulk_add_graph.stream(
+        {"notes": notes, "path": str(jsonl), "batch_size": 3},
+        stream_mode=["custom", "values"],
+    ):
+        if mode == "custom":
+            chunks.append(chunk)
+        else:
+            final = chunk
+    assert final["added"] == 6 and final["failed"] == 3
+    assert [f["position"] for f in final["failures"]] == [1, 2, 3]
+    assert chunks[-1]["added"] == 6 and len(chunks) == 3
+    assert mem_search_graph.invoke({"tags": "bulk"})["total"] == 5
+    missing = mem_bulk_add_graph.invoke({"path": str(tmp_path / "nope.jsonl")})
+    assert "cannot read" in missing["error"]
+
+
+def test_default_db_path_is_shared_across_working_dirs(tmp_path, monkeypatch) -> None:
+    monkeypatch.delenv("MEM0_PATH", raising=False)
+    monkeypatch.delenv("LOGS_DIR", raising=False)
+    (tmp_path / "a").mkdir()
+    (tmp_path / "b").mkdir()
+    monkeypatch.chdir(tmp_path / "a")
+    first = default_db_path()
+    monkeypatch.chdir(tmp_path / "b")
+    assert default_db_path() == first and first.is_absolute()
+    assert first.parent.name == "logs"
+    monkeypatch.setenv("LOGS_DIR", "data")
+    assert default_db_path() == tmp_path / "b" / "data" / "mem0.sqlite3"
+    monkeypatch.setenv("MEM0_PATH", "notes/mem0.json")
+    assert default_db_path() == tmp_path / "b" / "notes" / "mem0.sqlite3"
@@ -0,0 +1,91 @@
+import threading
+import time
+
+import httpx
+import pytest
+
+from agent import profiling
+from agent.clients import configure_clients
+from agent.profiling import (
+    ProfileConfig,
+    configure_profiling,
+    list_profiles,
+    profiled,
+    summarize_profile,
+)
+from agent.tasks import sports_data_graph
+
+
+@pytest.fixture(autouse=True)
+def _isolated(tmp_path, no_response_cache):
+    configure_profiling(ProfileConfig(out_dir=tmp_path, interval_s=0.001))
+    yield
+    configure_profiling()
+
+
+def _scoreboard(request: httpx.Request) -> httpx.Response:
+    return httpx.Response(200, json={"events": [{"id": "1", "competitions": []}]})
+
+
+@pytest.mark.anyio
+async def test_context_selects_cprofile_for_one_run(tmp_path) -> None:
+    configure_clients(async_transport=httpx.MockTransport(_scoreboard))
+    try:
+        await sports_data_graph.ainvoke({}, context={"profile": "cprofile"})
+        assert len(list_profiles(tmp_path)) == 1
+        await sports_data_graph.ainvoke({})  # not selected: no new profile
+    finally:
+        configure_clients()
+    profiles = list_profiles(tmp_path)
+    assert (
+        len(profiles) == 1
+        and profiles[0]["node"] == "sports_data_node"
+        and profiles[0]["mode"] == "cprofile"
+    )
+    top = summarize_profile(profiles[0]["path"], top=5)
+    assert len(top) == 5 and top[0]["cumtime_s"] >= top[-1]["cumtime_s"]
+
+
+def test_sample_mode_writes_collapsed_stacks(tmp_path) -> None:
+    configure_profiling(
+        ProfileConfig(mode="sample", out_dir=tmp_path, interval_s=0.001)
+    )
+
+    def busy_leaf() -> None:
+        end = time.perf_counter() + 0.05
+        while time.perf_counter() < end:
+            pass
+
+    @profiled("busy_node")
+    def busy_node(state, runtime=None):
+        busy_leaf()
+
+    busy_node({})
+    [profile] = list_profiles(tmp_path)
+    lines = profile["path"].read_text().splitlines()
+    assert lines and all(line.startswith("busy_node (") for line in lines)
+    top = summarize_profile(profile["path"], top=3, sort="tottime")
+    assert top[0]["function"].startswith("busy_leaf") and top[0]["self_pct"] > 50
+
+
+@pytest.mark.anyio
+async def test_async_node_writes_profile_off_the_event_loop(
+    tmp_path, monkeypatch
+) -> None:
+    writers = []
+    original = profiling._Capture.write
+
+    def write(self) -> None:
+        writers.append(threading.get_ident())
+        original(self)
+
+    monkeypatch.setattr(profiling._Capture, "write", write)
+    configure_profiling(ProfileConfig(mode="cprofile", out_dir=tmp_path))
+
+    @profiled("async_node")
+    async def async_node(state):
+        return {}
+
+    await async_node({})
+    assert writers and writers[0] != threading.get_ident()
+    assert len(list_profiles(tmp_path)) == 1
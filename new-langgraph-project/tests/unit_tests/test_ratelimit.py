@@ -0,0 +1,45 @@
+import asyncio
+
+import pytest
+
+from agent.ratelimit import RateLimiter, TokenBucket
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_token_bucket_reserves_on_credit() -> None:
+    clock = _Clock()
+    bucket = TokenBucket(rate=2.0, burst=2, clock=clock)
+    assert bucket._reserve() == 0.0
+    assert bucket._reserve() == 0.0
+    assert bucket._reserve() == pytest.approx(0.5)
+    assert bucket._reserve() == pytest.approx(1.0)
+    clock.now = 10.0
+    assert bucket._reserve() == 0.0
+
+
+def test_quota_headers_slow_down_and_shed() -> None:
+    limiter = RateLimiter(10.0, 5, slow_below=100, reserve=20)
+    limiter.observe({"x-requests-remaining": "500", "x-requests-used": "10"})
+    assert limiter.bucket.rate == 10.0
+    assert not limiter.should_shed("low")
+    limiter.observe({"x-requests-remaining": "10", "x-requests-used": "500"})
+    assert limiter.bucket.rate == pytest.approx(1.0)
+    assert limiter.should_shed("low")
+    assert not limiter.should_shed("normal")
+    limiter.observe({"x-requests-remaining": "0"})
+    assert limiter.should_shed("normal") and not limiter.should_shed("high")
+    assert limiter.state()["used"] == 500
+
+
+@pytest.mark.anyio
+async def test_async_acquire_paces_tasks() -> None:
+    bucket = TokenBucket(rate=100.0, burst=1)
+    waits = await asyncio.gather(*(bucket.aacquire() for _ in range(5)))
+    assert sorted(waits)[-1] == pytest.approx(0.04, abs=0.01)
@@ -0,0 +1,130 @@
+import asyncio
+import random
+
+import httpx
+import pytest
+
+from agent import services
+from agent.clients import configure_clients
+from agent.retry import (
+    BreakerRegistry,
+    CircuitBreaker,
+    CircuitOpenError,
+    RetryPolicy,
+    configure_retries,
+    parse_retry_after,
+)
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _status_error(status: int, headers=None) -> httpx.HTTPStatusError:
+    request = httpx.Request("GET", "https://example.com/x")
+    response = httpx.Response(status, headers=headers, request=request)
+    return httpx.HTTPStatusError("boom", request=request, response=response)
+
+
+def test_classification_and_retry_after() -> None:
+    policy = RetryPolicy(rng=random.Random(0))
+    assert policy.is_retryable(_status_error(503))
+    assert policy.is_retryable(_status_error(429))
+    assert not policy.is_retryable(_status_error(404))
+    assert policy.is_retryable(httpx.ConnectTimeout("slow"))
+    assert policy.delay(0, _status_error(429, {"Retry-After": "7"})) == 7.0
+    assert parse_retry_after(
+        "Wed, 21 Oct 2015 07:28:00 GMT", now=1445412470.0
+    ) == pytest.approx(10.0)
+    for attempt in range(6):
+        assert (
+            0.0
+            <= policy.backoff(attempt)
+            <= min(policy.max_delay_s, policy.base_delay_s * 2**attempt)
+        )
+
+
+def test_breaker_opens_half_opens_and_closes() -> None:
+    clock = _Clock()
+    breaker = CircuitBreaker(
+        "h", failure_threshold=2, reset_timeout_s=10.0, clock=clock
+    )
+    breaker.record_failure(_status_error(404))
+    breaker.record_failure(_status_error(500))
+    assert breaker.state == "closed"
+    breaker.record_failure(httpx.ConnectError("down"))
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    clock.now = 11.0
+    assert breaker.state == "half_open"
+    breaker.before_call()  # the single probe
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.record_success()
+    assert breaker.metrics()["state"] == "closed"
+    assert breaker.metrics()["opened"] == 1 and breaker.metrics()["rejected"] == 2
+
+
+def test_with_retries_skips_4xx_and_fails_fast_when_open(no_response_cache) -> None:
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url.path)
+        return httpx.Response(404 if "missing" in request.url.path else 503)
+
+    configure_clients(transport=httpx.MockTransport(handler))
+    configure_retries(
+        RetryPolicy(base_delay_s=0.0),
+        BreakerRegistry(failure_threshold=3, reset_timeout_s=60.0),
+    )
+    try:
+        with pytest.raises(httpx.HTTPStatusError):
+            services.fetch_espn_scoreboard("missing", retries=3)
+        assert len(calls) == 1
+        with pytest.raises(CircuitOpenError):
+            services.fetch_espn_scoreboard("flaky", retries=5)
+        assert len(calls) == 4  # breaker opened after 3 consecutive 503s
+        with pytest.raises(CircuitOpenError):
+            services.fetch_espn_scoreboard("flaky", retries=5)
+        assert len(calls) == 4
+        assert services.breaker_metrics()["site.api.espn.com"]["state"] == "open"
+    finally:
+        configure_retries()
+        configure_clients()
+
+
+@pytest.mark.anyio
+async def test_cancelled_half_open_probe_releases_its_slot(no_response_cache) -> None:
+    calls = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url.path)
+        if len(calls) == 2:
+            await asyncio.sleep(10)  # the probe hangs until cancelled
+        return httpx.Response(503 if len(calls) == 1 else 200, json={"events": []})
+
+    configure_clients(async_transport=httpx.MockTransport(handler))
+    configure_retries(
+        RetryPolicy(base_delay_s=0.0),
+        BreakerRegistry(failure_threshold=1, reset_timeout_s=0.0),
+    )
+    try:
+        with pytest.raises(httpx.HTTPStatusError):
+            await services.afetch_espn_scoreboard("nba", retries=0)
+        assert services.breaker_metrics()["site.api.espn.com"]["state"] == "half_open"
+        probe = asyncio.ensure_future(services.afetch_espn_scoreboard("nba", retries=0))
+        await asyncio.sleep(0.01)
+        probe.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await probe
+        assert await services.afetch_espn_scoreboard("nba", retries=0) == {"games": []}
+        assert len(calls) == 3
+        assert services.breaker_metrics()["site.api.espn.com"]["state"] == "closed"
+    finally:
+        configure_retries()
+        configure_clients()
@@ -0,0 +1,159 @@
+import dataclasses
+
+import httpx
+import pytest
+
+from agent import services
+from agent.clients import aclose_clients, configure_clients, get_client
+from agent.tasks import sports_data_graph
+
+pytestmark = pytest.mark.usefixtures("no_response_cache")
+
+
+def _odds_handler(request: httpx.Request) -> httpx.Response:
+    return httpx.Response(
+        200,
+        json=[
+            {
+                "id": "e1",
+                "sport_key": "basketball_nba",
+                "home_team": "A",
+                "away_team": "B",
+            }
+        ],
+    )
+
+
+def test_pooled_client_is_shared_per_host() -> None:
+    configure_clients(transport=httpx.MockTransport(_odds_handler))
+    try:
+        a = get_client("https://api.the-odds-api.com/v4/sports")
+        b = get_client("https://api.the-odds-api.com/v4/other")
+        c = get_client("https://site.api.espn.com/apis")
+        assert a is b
+        assert a is not c
+        out = services.fetch_odds_events("k", "basketball_nba")
+        assert out["events"][0]["id"] == "e1"
+        assert get_client("https://api.the-odds-api.com/") is a
+    finally:
+        configure_clients()
+
+
+def _scoreboard_handler(request: httpx.Request) -> httpx.Response:
+    return httpx.Response(
+        200,
+        json={
+            "events": [
+                {
+                    "id": "401",
+                    "name": "B at A",
+                    "competitions": [
+                        {
+                            "status": {"type": {"description": "Final"}},
+                            "competitors": [
+                                {
+                                    "team": {"displayName": "A"},
+                                    "score": "101",
+                                    "homeAway": "home",
+                                }
+                            ],
+                        }
+                    ],
+                }
+            ]
+        },
+    )
+
+
+@pytest.mark.anyio
+async def test_sports_data_graph_uses_async_client() -> None:
+    configure_clients(async_transport=httpx.MockTransport(_scoreboard_handler))
+    try:
+        res = await sports_data_graph.ainvoke(
+            {"league_path": "basketball/nba/scoreboard"}
+        )
+        game = res["result"]["games"][0]
+        assert game["status"] == "Final"
+        assert game["competitors"][0]["score"] == "101"
+        await aclose_clients()
+    finally:
+        configure_clients()
+
+
+def test_scoreboard_304_reuses_normalized_result() -> None:
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request.headers.get("if-none-match"))
+        if request.headers.get("if-none-match") == '"v1"':
+            return httpx.Response(304)
+        resp = _scoreboard_handler(request)
+        resp.headers["ETag"] = '"v1"'
+        return resp
+
+    configure_clients(transport=httpx.MockTransport(handler))
+    try:
+        first = services.fetch_espn_scoreboard("basketball/nba/scoreboard")
+        second = services.fetch_espn_scoreboard("basketball/nba/scoreboard")
+        assert second is first
+        assert seen == [None, '"v1"']
+    finally:
+        configure_clients()
+
+
+def _markets_handler(request: httpx.Request) -> httpx.Response:
+    event_id = request.url.path.split("/")[-2]
+    if event_id == "bad":
+        return httpx.Response(404, json={"message": "not found"})
+    return httpx.Response(
+        200,
+        json={
+            "id": event_id,
+            "sport_key": "basketball_nba",
+            "bookmakers": [
+                {
+                    "title": "Book",
+                    "markets": [
+                        {"key": "h2h", "outcomes": [{"name": "A", "price": 1.9}]}
+                    ],
+                }
+            ],
+        },
+    )
+
+
+def test_markets_batch_records_per_event_errors() -> None:
+    configure_clients(transport=httpx.MockTransport(_markets_handler))
+    try:
+        out = services.fetch_odds_markets_batch(
+            "k", "basketball_nba", ["e1", "bad", "e2", "e1"], retries=0, concurrency=2
+        )
+        assert sorted(out["results"]) == ["e1", "e2"]
+        assert list(out["errors"]) == ["bad"]
+    finally:
+        configure_clients()
+
+
+@pytest.mark.anyio
+async def test_markets_batch_graph_streams_each_event() -> None:
+    from agent.config import Settings
+    from agent.tasks import markets_batch_graph
+
+    configure_clients(async_transport=httpx.MockTransport(_markets_handler))
+    settings = dataclasses.replace(Settings.load(), odds_api_key="k", http_retries=0)
+    try:
+        chunks = [
+            chunk
+            async for chunk in markets_batch_graph.astream(
+                {"sport_key": "basketball_nba", "event_ids": ["e1", "e2", "bad"]},
+                context={"settings": settings},
+                stream_mode=["custom", "values"],
+            )
+        ]
+        custom = [c for mode, c in chunks if mode == "custom"]
+        final = [c for mode, c in chunks if mode == "values"][-1]["result"]
+        assert len(custom) == 3 and custom[-1]["done"] == 3
+        assert sorted(final["results"]) == ["e1", "e2"] and "bad" in final["errors"]
+        await aclose_clients()
+    finally:
+        configure_clients()
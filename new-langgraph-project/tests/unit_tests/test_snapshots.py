@@ -0,0 +1,68 @@
+from agent.snapshots import SnapshotStore
+
+
+def _markets(price_a: float, point_b: float, with_c: bool = True) -> dict:
+    outcomes = [
+        {"name": "A", "price": price_a, "point": None},
+        {"name": "B", "price": 1.9, "point": point_b},
+    ]
+    markets = [{"bookmaker": "Book", "market": "spreads", "outcomes": outcomes}]
+    if with_c:
+        markets.append(
+            {
+                "bookmaker": "Other",
+                "market": "h2h",
+                "outcomes": [{"name": "C", "price": 2.5, "point": None}],
+            }
+        )
+    return {"event_id": "e1", "sport_key": "basketball_nba", "markets": markets}
+
+
+def test_records_only_deltas_and_rebuilds_any_point(tmp_path) -> None:
+    store = SnapshotStore(tmp_path / "snap.sqlite3")
+    first = store.record(_markets(2.0, -3.5), taken_at=100.0)
+    assert first["changed"] == 3
+    second = store.record(_markets(2.0, -3.5), taken_at=200.0)
+    assert second["changed"] == 0 and second["unchanged"] == 3
+    third = store.record(_markets(2.2, -3.5, with_c=False), taken_at=300.0)
+    assert third["changed"] == 1 and third["removed"] == 1
+
+    assert store.state_at("e1", 250.0) == store.state_at("e1", 100.0)
+    latest = store.state_at("e1")
+    assert [m["bookmaker"] for m in latest["markets"]] == ["Book"]
+    assert latest["markets"][0]["outcomes"][0]["price"] == 2.2
+
+    rows = store.history("e1", bookmaker="Book", start=150.0)
+    assert [(r["taken_at"], r["name"], r["price"]) for r in rows] == [(300.0, "A", 2.2)]
+    store.close()
+
+    # A fresh store diffs against what is on disk.
+    reopened = SnapshotStore(tmp_path / "snap.sqlite3")
+    assert (
+        reopened.record(_markets(2.2, -3.5, with_c=False), taken_at=400.0)["changed"]
+        == 0
+    )
+    reopened.close()
+
+
+def test_alternate_lines_are_kept_apart() -> None:
+    def spreads(*lines: tuple) -> dict:
+        outcomes = [
+            {"name": "A", "price": price, "point": point} for point, price in lines
+        ]
+        return {
+            "event_id": "e2",
+            "markets": [
+                {"bookmaker": "Book", "market": "spreads", "outcomes": outcomes}
+            ],
+        }
+
+    store = SnapshotStore(":memory:")
+    assert store.record(spreads((-3.5, 1.9), (-7.5, 2.6)), taken_at=1.0)["changed"] == 2
+    moved = store.record(spreads((-4.0, 1.9), (-7.5, 2.7)), taken_at=2.0)
+    assert moved["changed"] == 2 and moved["removed"] == 1 and moved["unchanged"] == 0
+    outcomes = store.state_at("e2", 1.0)["markets"][0]["outcomes"]
+    assert [(o["point"], o["price"]) for o in outcomes] == [(-7.5, 2.6), (-3.5, 1.9)]
+    outcomes = store.state_at("e2")["markets"][0]["outcomes"]
+    assert [(o["point"], o["price"]) for o in outcomes] == [(-7.5, 2.7), (-4.0, 1.9)]
+    store.close()